@@ -0,0 +1,67 @@
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List
+
+# Statement timed for each entry point, run in a fresh interpreter
+ENTRY_POINTS = {
+    "control_panel": "import control_panel",
+    "process": "import process",
+    "process --list-prompts": "import process; sys.argv = ['process.py', '--list-prompts']; process.main()",
+    # --prompt and --toggle-highlighting take the same path but rewrite control_panel.json, so are left out
+    "scraper": "import scraper",
+    "inference": "import inference",
+    "sheet_handler": "import sheet_handler",
+    "evaluate": "import evaluate",
+    "main": "import main",
+}
+
+# Modules that make startup slow; none should load on config-only paths
+HEAVY_MODULES = ("exa_py", "cerebras", "googleapiclient", "google.oauth2", "httplib2", "numpy", "pyarrow")
+
+CHILD = """
+import io, sys, json, time, contextlib
+start = time.perf_counter()
+error = None
+try:
+    with contextlib.redirect_stdout(io.StringIO()):
+        exec({statement!r})
+except BaseException as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+elapsed = time.perf_counter() - start
+heavy = sorted({{name.split('.')[0] for name in sys.modules if name.startswith({heavy!r})}})
+print(json.dumps({{"seconds": elapsed, "heavy": heavy, "error": error}}))
+"""
+
+def measure(statement: str, repeat: int) -> Dict:
+    """Time a statement in fresh interpreters and return the median run."""
+    runs = []
+    for _ in range(repeat):
+        code = CHILD.format(statement=statement, heavy=HEAVY_MODULES)
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    result = dict(runs[-1])
+    result["seconds"] = statistics.median(run["seconds"] for run in runs)
+    return result
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Measure import time of each entry point")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument("--only", nargs="+", help="Entry points to measure")
+    args = parser.parse_args(argv)
+
+    names = args.only or list(ENTRY_POINTS)
+    width = max(len(name) for name in names) + 2
+    print(f"{'entry point':<{width}}{'median ms':>10}  heavy modules loaded")
+    for name in names:
+        result = measure(ENTRY_POINTS[name], args.repeat)
+        heavy = ', '.join(result["heavy"]) or '-'
+        line = f"{name:<{width}}{result['seconds'] * 1000:>10.1f}  {heavy}"
+        if result["error"]:
+            line += f"  ({result['error']})"
+        print(line)
+
+if __name__ == "__main__":
+    main()
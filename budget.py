@@ -0,0 +1,134 @@
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional
+from control_panel import ControlPanel
+
+# Metered resources: Exa requests and their reported cost, model tokens, Sheets write requests
+RESOURCES = ("exa_calls", "exa_dollars", "llm_tokens", "sheets_writes")
+
+class BudgetExhausted(Exception):
+    """A run or daily cap leaves no room for the requested work."""
+
+class BudgetGovernor:
+    """Caps on API spend per run and per day, from budget_controls.
+
+    Usage is recorded as responses come back: Exa calls and their
+    cost_dollars, token counts from Cerebras usage, and Sheets write
+    requests. Daily totals live in SQLite so every run on the same day
+    draws from one budget. As the fullest cap fills, work is shed in the
+    order of the shed thresholds: company research first, then scoring
+    altogether. Candidates already in flight when scoring is shed still
+    finish, so a cap can be overrun by their calls.
+    """
+
+    def __init__(self, control_panel: Optional[ControlPanel] = None):
+        controls = (control_panel or ControlPanel()).config.get("budget_controls", {})
+        self.enabled = controls.get("enabled", False)
+        self.per_run = {name: cap for name, cap in controls.get("per_run", {}).items() if cap}
+        self.per_day = {name: cap for name, cap in controls.get("per_day", {}).items() if cap}
+        self.shed = controls.get("shed", {"company_research": 0.8, "scoring": 0.98})
+        self._run: Dict[str, float] = dict.fromkeys(RESOURCES, 0)
+        self._day: Dict[str, float] = {}
+        self._today = None
+        self._shedding = set()
+        self._lock = threading.Lock()
+        self.conn = None
+        if self.enabled:
+            self.conn = sqlite3.connect(controls.get("path", "budget.db"), check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage ("
+                "day TEXT NOT NULL, resource TEXT NOT NULL, amount REAL NOT NULL, PRIMARY KEY (day, resource))"
+            )
+            self.conn.commit()
+            self._load_day()
+
+    def _load_day(self):
+        """Read today's totals, including other runs'; starts over when the date changes."""
+        self._today = time.strftime('%Y-%m-%d')
+        self._day = dict.fromkeys(RESOURCES, 0)
+        self._day.update(self.conn.execute(
+            "SELECT resource, amount FROM usage WHERE day = ?", (self._today,)
+        ).fetchall())
+
+    def record(self, resource: str, amount: float = 1):
+        """Add usage to the run and today's shared total."""
+        if not self.enabled or not amount:
+            return
+        with self._lock:
+            self._run[resource] = self._run.get(resource, 0) + amount
+            if self._today != time.strftime('%Y-%m-%d'):
+                self._load_day()
+            self.conn.execute(
+                "INSERT INTO usage (day, resource, amount) VALUES (?, ?, ?) "
+                "ON CONFLICT(day, resource) DO UPDATE SET amount = amount + excluded.amount",
+                (self._today, resource, amount)
+            )
+            self._day[resource] = self.conn.execute(
+                "SELECT amount FROM usage WHERE day = ? AND resource = ?", (self._today, resource)
+            ).fetchone()[0]
+            self.conn.commit()
+
+    def record_exa(self, response):
+        """Count one Exa request and the cost it reports, if any."""
+        self.record("exa_calls")
+        cost = getattr(getattr(response, "cost_dollars", None), "total", None)
+        if cost:
+            self.record("exa_dollars", cost)
+
+    def used(self, resource: str) -> float:
+        """Fraction of the tighter of the run and daily caps that is spent."""
+        with self._lock:
+            fractions = [self._run.get(resource, 0) / self.per_run[resource]] if resource in self.per_run else []
+            if resource in self.per_day:
+                fractions.append(self._day.get(resource, 0) / self.per_day[resource])
+        return max(fractions, default=0.0)
+
+    def pressure(self) -> float:
+        """Fraction spent of the fullest cap."""
+        return max((self.used(resource) for resource in RESOURCES), default=0.0)
+
+    def allows(self, work: str) -> bool:
+        """Check whether the budget still has room for a kind of work."""
+        if not self.enabled:
+            return True
+        pressure = self.pressure()
+        if pressure < self.shed.get(work, 1.0):
+            return True
+        if work not in self._shedding:
+            self._shedding.add(work)
+            print(f"Budget {pressure:.0%} spent - shedding {work.replace('_', ' ')}")
+        return False
+
+    def check(self, work: str):
+        """Raise BudgetExhausted unless the work is allowed."""
+        if not self.allows(work):
+            raise BudgetExhausted(f"budget {self.pressure():.0%} spent - no room for {work.replace('_', ' ')}")
+
+    def stats(self) -> Dict[str, Dict]:
+        """Run and daily usage per resource, with their caps."""
+        with self._lock:
+            return {
+                resource: {
+                    "run": round(self._run.get(resource, 0), 4),
+                    "run_cap": self.per_run.get(resource),
+                    "day": round(self._day.get(resource, 0), 4),
+                    "day_cap": self.per_day.get(resource)
+                }
+                for resource in RESOURCES
+                if self._run.get(resource) or self._day.get(resource)
+            }
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+_shared_governor: Optional[BudgetGovernor] = None
+
+def get_budget(control_panel: Optional[ControlPanel] = None) -> BudgetGovernor:
+    """Get the process-wide governor, so every client draws from the same run budget."""
+    global _shared_governor
+    if _shared_governor is None:
+        _shared_governor = BudgetGovernor(control_panel)
+    return _shared_governor
@@ -0,0 +1,126 @@
+import re
+from typing import Any, Dict, List, Optional
+
+# Section headings seen in Exa's LinkedIn page text, mapped to a canonical name
+SECTION_ALIASES = {
+    'about': 'about',
+    'summary': 'about',
+    'experience': 'experience',
+    'work experience': 'experience',
+    'education': 'education',
+    'skills': 'skills',
+    'top skills': 'skills',
+    'licenses & certifications': 'certifications',
+    'certifications': 'certifications',
+    'projects': 'projects',
+    'publications': 'publications',
+    'honors & awards': 'awards',
+    'volunteering': 'volunteering',
+    'languages': 'languages',
+    'recommendations': 'recommendations',
+    'activity': 'activity',
+    'interests': 'interests',
+}
+
+# Sections kept in the prompt, in priority order; the rest is dropped
+PROFILE_SECTIONS = ['experience', 'education', 'skills', 'about', 'projects', 'publications', 'awards']
+
+HEADING_PATTERN = re.compile(r'^\s*(?:#+\s*)?([A-Za-z &]+?)\s*:?\s*$')
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count (about four characters per token)."""
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
+
+def truncate_to_budget(text: str, max_tokens: int) -> str:
+    """Cut text to a token budget, preferring line then word boundaries."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundary = cut.rfind('\n')
+    if boundary < max_chars // 2:
+        boundary = cut.rfind(' ')
+    return cut[:boundary if boundary > 0 else max_chars].rstrip() + ' …'
+
+def profile_results(profile_data: Any) -> List[Dict[str, str]]:
+    """Flatten an Exa contents response (object, dict or list) into plain dicts."""
+    if not profile_data:
+        return []
+    if isinstance(profile_data, str):
+        return [{'title': '', 'url': '', 'author': '', 'text': profile_data}]
+
+    results = profile_data.get('results', []) if isinstance(profile_data, dict) \
+        else getattr(profile_data, 'results', profile_data)
+    if not isinstance(results, (list, tuple)):
+        results = [results]
+
+    flattened = []
+    for result in results:
+        if isinstance(result, dict):
+            get = result.get
+        else:
+            get = lambda key, default=None, result=result: getattr(result, key, default)
+        flattened.append({
+            'title': get('title') or '',
+            'url': get('url') or '',
+            'author': get('author') or '',
+            'text': get('text') or ''
+        })
+    return flattened
+
+def extract_sections(text: str) -> Dict[str, str]:
+    """Split profile text into a headline plus known sections."""
+    sections: Dict[str, List[str]] = {'headline': []}
+    current = 'headline'
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        heading = HEADING_PATTERN.match(stripped)
+        name = SECTION_ALIASES.get(heading.group(1).lower()) if heading else None
+        if name:
+            current = name
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(stripped)
+    return {name: '\n'.join(lines) for name, lines in sections.items() if lines}
+
+def compact_profile(profile_data: Any, max_tokens: int) -> str:
+    """Keep headline, roles, education and skills from a profile within a token budget."""
+    parts = []
+    for result in profile_results(profile_data):
+        sections = extract_sections(result['text'])
+        headline = result['title'] or sections.get('headline', '').split('\n', 1)[0]
+        if headline:
+            parts.append(f"Headline: {headline}")
+        if result['author']:
+            parts.append(f"Name: {result['author']}")
+
+        kept = [name for name in PROFILE_SECTIONS if name in sections]
+        if not kept and sections.get('headline'):
+            # Unstructured text; keep it as is and let the budget trim it
+            parts.append(sections['headline'])
+        elif sections.get('headline'):
+            # Lines before the first section hold the current role and location
+            intro = [line.lstrip('# ') for line in sections['headline'].split('\n')[:3]]
+            parts.append("Intro: " + ' | '.join(line for line in intro if line))
+        for name in kept:
+            parts.append(f"{name.title()}:\n{sections[name]}")
+
+    return truncate_to_budget('\n'.join(parts), max_tokens)
+
+def compact_company(company_data: Optional[str], max_tokens: int) -> str:
+    """Drop repeated lines from company research and fit it to a token budget."""
+    if not company_data:
+        return ""
+    seen = set()
+    lines = []
+    for line in str(company_data).splitlines():
+        key = ' '.join(line.lower().split())
+        if key and key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return truncate_to_budget('\n'.join(lines).strip(), max_tokens)
@@ -0,0 +1,167 @@
+import math
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from control_panel import ControlPanel
+from deadline import DeadlineExceeded
+
+class AdaptiveLimiter:
+    """Concurrency limit for one upstream, tuned from observed latency.
+
+    Gradient-style: a slow moving average of latency is the baseline and a
+    fast one tracks current conditions. While they agree the limit grows by
+    about sqrt(limit) per sample; when current latency rises above the
+    baseline the limit shrinks in proportion, and a failed call cuts it by
+    backoff_ratio. Growth only happens while the limit is actually being
+    used, so an idle upstream does not drift to max_limit.
+    """
+
+    def __init__(self, name: str, initial: int = 4, min_limit: int = 1, max_limit: int = 64,
+                 smoothing: float = 0.2, tolerance: float = 1.5, backoff_ratio: float = 0.7):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.backoff_ratio = backoff_ratio
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._inflight = 0
+        self._short_rtt: Optional[float] = None
+        self._long_rtt: Optional[float] = None
+        self._cond = threading.Condition()
+        self.stats = {"samples": 0, "drops": 0, "waits": 0}
+
+    @property
+    def limit(self) -> int:
+        return max(int(self._limit), self.min_limit)
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Wait for a free slot.
+
+        Raises:
+            DeadlineExceeded: if no slot opens within timeout
+        """
+        with self._cond:
+            if self._inflight >= self.limit:
+                self.stats["waits"] += 1
+                if not self._cond.wait_for(lambda: self._inflight < self.limit, timeout):
+                    raise DeadlineExceeded(f"no {self.name} slot free within {timeout:.1f}s")
+            self._inflight += 1
+
+    def release(self, latency: Optional[float] = None, failed: bool = False):
+        """Free a slot and update the limit from the call's outcome."""
+        with self._cond:
+            inflight = self._inflight
+            self._inflight -= 1
+            if failed:
+                self.stats["drops"] += 1
+                self._limit = max(self._limit * self.backoff_ratio, self.min_limit)
+            elif latency is not None:
+                self._update(latency, inflight)
+            self._cond.notify_all()
+
+    def _update(self, latency: float, inflight: int):
+        self.stats["samples"] += 1
+        if self._short_rtt is None:
+            self._short_rtt = self._long_rtt = latency
+            return
+        self._short_rtt += (latency - self._short_rtt) * 0.5
+        self._long_rtt += (latency - self._long_rtt) * 0.01
+        # After a slow spell the baseline would keep the limit low; let it recover
+        if self._long_rtt > 2 * self._short_rtt:
+            self._long_rtt *= 0.95
+
+        # Don't grow a limit that isn't being used
+        if inflight < self._limit / 2:
+            return
+        gradient = max(0.5, min(1.0, self.tolerance * self._long_rtt / self._short_rtt))
+        target = self._limit * gradient + math.sqrt(self._limit)
+        self._limit = self._limit * (1 - self.smoothing) + target * self.smoothing
+        self._limit = min(max(self._limit, self.min_limit), self.max_limit)
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """Hold a slot for one call, timing it; an exception counts as a failure."""
+        self.acquire(timeout)
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.release(failed=True)
+            raise
+        self.release(time.monotonic() - start)
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "inflight": self._inflight,
+                "latency_ms": round((self._short_rtt or 0) * 1000, 1),
+                "baseline_ms": round((self._long_rtt or 0) * 1000, 1),
+                **self.stats
+            }
+
+class ConcurrencyController:
+    """Adaptive limiters for each upstream API, from concurrency_controls."""
+
+    def __init__(self, control_panel: Optional[ControlPanel] = None):
+        controls = (control_panel or ControlPanel()).config.get("concurrency_controls", {})
+        self.enabled = controls.get("enabled", False)
+        self._defaults = {
+            "smoothing": controls.get("smoothing", 0.2),
+            "tolerance": controls.get("tolerance", 1.5),
+            "backoff_ratio": controls.get("backoff_ratio", 0.7)
+        }
+        self._upstreams = controls.get("upstreams", {})
+        # Candidates processed at once; the per-upstream limits decide how many actually call out
+        self.max_candidates = max(controls.get("max_candidates", 16), 1)
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, name: str) -> AdaptiveLimiter:
+        with self._lock:
+            if name not in self._limiters:
+                settings = self._upstreams.get(name, {})
+                self._limiters[name] = AdaptiveLimiter(
+                    name,
+                    initial=settings.get("initial", 4),
+                    min_limit=settings.get("min", 1),
+                    max_limit=settings.get("max", 64),
+                    **self._defaults
+                )
+            return self._limiters[name]
+
+    @contextmanager
+    def slot(self, name: str, timeout: Optional[float] = None) -> Iterator[None]:
+        """Hold a slot on an upstream's limiter; a no-op when disabled."""
+        if not self.enabled:
+            yield
+            return
+        with self.limiter(name).slot(timeout):
+            yield
+
+    def wrap(self, name: str, fn, timeout: Optional[float] = None):
+        """Wrap fn so each call holds a slot, for calls run on an executor."""
+        if not self.enabled:
+            return fn
+        def limited(*args, **kwargs):
+            with self.slot(name, timeout):
+                return fn(*args, **kwargs)
+        limited.__name__ = getattr(fn, '__name__', 'call')
+        return limited
+
+    def stats(self) -> Dict[str, Dict]:
+        """Current limit, in-flight calls and latency per upstream."""
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.name: limiter.snapshot() for limiter in limiters}
+
+_shared_controller: Optional[ConcurrencyController] = None
+
+def get_concurrency(control_panel: Optional[ControlPanel] = None) -> ConcurrencyController:
+    """Get the process-wide controller, so every client shares one limit per upstream."""
+    global _shared_controller
+    if _shared_controller is None:
+        _shared_controller = ConcurrencyController(control_panel)
+    return _shared_controller
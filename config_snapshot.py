@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import itertools
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+_versions = itertools.count(1)
+
+class ConfigError(ValueError):
+    """control_panel.json failed validation."""
+
+def _freeze(value: Any) -> Any:
+    """Make nested dicts and lists read-only."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _check_color(name: str, color: Any) -> Mapping[str, float]:
+    if not isinstance(color, dict) or not all(
+        isinstance(color.get(channel), (int, float)) and 0 <= color[channel] <= 1
+        for channel in ("red", "green", "blue")
+    ):
+        raise ConfigError(f"{name} must have red, green and blue between 0 and 1")
+    return _freeze(color)
+
+@dataclass(frozen=True)
+class PromptConfig:
+    """One prompt template with its resolved output fields."""
+    name: str
+    description: str
+    text: str
+    field_format: Mapping[str, bool]
+    output_fields: Tuple[str, ...]
+    fingerprint: str
+
+    @property
+    def version(self) -> str:
+        """Name plus content hash; changes whenever the prompt text or output format does."""
+        return f"{self.name}:{self.fingerprint}"
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Validated, read-only view of control_panel.json with hot-path values pre-resolved."""
+    version: int
+    mtime: float
+    prompts: Mapping[str, PromptConfig]
+    prompt: PromptConfig
+    model: str
+    temperature: float
+    required_fields: Tuple[str, ...]
+    default_values: Mapping[str, Any]
+    email_template: bool
+    input_sheet: str
+    output_sheet: str
+    write_headers: bool
+    highlight_rows: bool
+    conditional_formatting: bool
+    highlight_color: Mapping[str, float]
+    priority_colors: Mapping[str, Mapping[str, float]]
+    scan_for_linkedin: bool
+    research_companies: bool
+    sections: Mapping[str, Mapping[str, Any]]
+
+    def get_prompt(self, name: Optional[str] = None) -> PromptConfig:
+        """Get a prompt by name, the active one by default."""
+        return self.prompts[name] if name else self.prompt
+
+def compile_config(config: Dict, mtime: float = 0.0) -> ConfigSnapshot:
+    """Validate a raw config dict and compile it into a snapshot.
+
+    Raises:
+        ConfigError: if a required section, prompt or value is missing or malformed
+    """
+    for section in ("sheet_controls", "inference_controls", "response_format", "scraping_controls"):
+        if not isinstance(config.get(section), dict):
+            raise ConfigError(f"missing section: {section}")
+    sheets = config["sheet_controls"]
+    inference = config["inference_controls"]
+    response = config["response_format"]
+    scraping = config["scraping_controls"]
+
+    prompts = {}
+    for name, data in inference.get("prompts", {}).items():
+        text = data.get("text")
+        if not isinstance(text, str):
+            raise ConfigError(f"prompt {name} has no text")
+        try:
+            text.format(profile="", company_info="")
+        except (KeyError, IndexError, ValueError) as e:
+            raise ConfigError(f"prompt {name} has an invalid placeholder: {e}")
+        field_format = data.get("output_format", {})
+        prompts[name] = PromptConfig(
+            name=name,
+            description=data.get("description", ""),
+            text=text,
+            field_format=_freeze(field_format),
+            output_fields=tuple(field for field, enabled in field_format.items() if enabled),
+            fingerprint=hashlib.sha256(
+                json.dumps({"text": text, "output_format": field_format}, sort_keys=True).encode('utf-8')
+            ).hexdigest()[:12]
+        )
+    active = inference.get("active_prompt")
+    if active not in prompts:
+        raise ConfigError(f"active prompt {active!r} is not defined")
+
+    required_fields = response.get("required_fields")
+    if not isinstance(required_fields, list) or not all(isinstance(field, str) for field in required_fields):
+        raise ConfigError("response_format.required_fields must be a list of names")
+    for key in ("input_sheet_name", "output_sheet_name"):
+        if not sheets.get(key):
+            raise ConfigError(f"sheet_controls.{key} is required")
+
+    priority_colors = {
+        priority: _check_color(f"priority_colors.{priority}", color)
+        for priority, color in sheets.get("priority_colors", {
+            "accept": {"red": 0.8, "green": 0.9, "blue": 0.8},
+            "review": {"red": 1.0, "green": 0.9, "blue": 0.6},
+            "reject": {"red": 1.0, "green": 0.8, "blue": 0.8}
+        }).items()
+    }
+
+    return ConfigSnapshot(
+        version=next(_versions),
+        mtime=mtime,
+        prompts=MappingProxyType(prompts),
+        prompt=prompts[active],
+        model=inference.get("model", "llama3.3-70b"),
+        temperature=inference.get("temperature", 0),
+        required_fields=tuple(required_fields),
+        default_values=_freeze(response.get("default_values", {})),
+        email_template=bool(response.get("email_template", True)),
+        input_sheet=sheets["input_sheet_name"],
+        output_sheet=sheets["output_sheet_name"],
+        write_headers=bool(sheets.get("write_headers")),
+        highlight_rows=bool(sheets.get("highlight_processed_rows")),
+        conditional_formatting=sheets.get("highlight_mode", "per_row") == "conditional",
+        highlight_color=_check_color("highlight_color", sheets.get("highlight_color", {
+            "red": 0.95, "green": 0.95, "blue": 0.95
+        })),
+        priority_colors=MappingProxyType(priority_colors),
+        scan_for_linkedin=bool(scraping.get("scan_for_linkedin", True)),
+        research_companies=bool(scraping.get("research_companies", True)),
+        sections=_freeze(config)
+    )
+
+class ConfigWatcher:
+    """Swaps in a new snapshot when control_panel.json's mtime changes.
+
+    poll() is cheap enough to call once per candidate: it stats the file at
+    most once per interval. start() runs the same check on a daemon thread.
+    An edit that fails validation is reported and the old snapshot is kept.
+
+    Live after a reload: the prompt, model, temperature, output fields and
+    defaults, sheet names and highlighting, compaction, validation and
+    near-duplicate thresholds, Exa timeouts and hedging, speculative
+    research and the deadline stages. Settings that build something at
+    startup - stores, caches, thread pools, client timeouts, and the
+    concurrency, budget, scheduling and prefetch controls - take a restart.
+    """
+
+    def __init__(self, control_panel, interval: float = 2.0):
+        self.control_panel = control_panel
+        self.interval = interval
+        self._next_check = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._rejected_mtime: Optional[float] = None
+
+    def poll(self) -> bool:
+        """Reload if the file changed; returns True when a new snapshot was swapped in."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.interval
+        return self.check()
+
+    def check(self) -> bool:
+        """Stat the file now and reload it if its mtime changed."""
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            path = self.control_panel.config_path
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                return False
+            if mtime in (self.control_panel.snapshot().mtime, self._rejected_mtime):
+                return False
+            try:
+                with open(path, 'r') as f:
+                    config = json.load(f)
+                self.control_panel.install(config, compile_config(config, mtime))
+            except ValueError as e:
+                # Remember the bad edit so it is not re-parsed on every poll
+                self._rejected_mtime = mtime
+                print(f"Ignoring invalid config change: {e}")
+                return False
+            print(f"Reloaded configuration (active prompt: {self.control_panel.snapshot().prompt.name})")
+            return True
+        finally:
+            self._lock.release()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """Poll on a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -1,12 +1,15 @@
 import json
 import os
 from typing import Dict, Any, Optional, Tuple
+from config_snapshot import ConfigSnapshot, compile_config
 
 class ControlPanel:
     def __init__(self, config_path: str = "control_panel.json"):
         """Initialize control panel with configuration file."""
         self.config_path = config_path
+        self._loaded_mtime = self._file_mtime()
         self.config = self._load_config()
+        self._snapshot: Optional[ConfigSnapshot] = None
         
     def _load_config(self) -> Dict:
         """Load configuration from file."""
@@ -33,12 +36,45 @@ class ControlPanel:
                 },
                 "input_sheet_name": "Sheet1",
                 "output_sheet_name": "Sheet2",
-                "write_headers": True
+                "write_headers": True,
+                "highlight_mode": "per_row",
+                "read_chunk_size": 2000,
+                "processed_marker_header": "processed",
+                "priority_colors": {
+                    "accept": {"red": 0.8, "green": 0.9, "blue": 0.8},
+                    "review": {"red": 1.0, "green": 0.9, "blue": 0.6},
+                    "reject": {"red": 1.0, "green": 0.8, "blue": 0.8}
+                }
             },
             "inference_controls": {
                 "active_prompt": "startup_ceo",
                 "model": "llama3.3-70b",
                 "temperature": 0,
+                "compaction": {
+                    "enabled": False,
+                    "profile_token_budget": 1200,
+                    "company_token_budget": 600
+                },
+                "near_duplicate": {
+                    "enabled": False,
+                    "mode": "reuse",
+                    "threshold": 0.9,
+                    "num_perm": 128,
+                    "bands": 32,
+                    "index_path": "near_duplicates.npz"
+                },
+                "response_cache": {
+                    "enabled": False,
+                    "path": "response_cache.db"
+                },
+                "evaluation": {
+                    "workers": 8
+                },
+                "validation": {
+                    "enabled": True,
+                    "max_repairs": 1,
+                    "priorities": []
+                },
                 "prompts": {
                     "startup_ceo": {
                         "description": "Look for startup CEOs and tech leaders",
@@ -72,15 +108,141 @@ class ControlPanel:
                     "priority_reasoning": "* No specific criteria met\n* Profile lacks required qualifications"
                 }
             },
+            "config_reload": {
+                "enabled": False,
+                "interval_seconds": 2
+            },
+            "deadline_controls": {
+                "candidate_seconds": 60,
+                "stages": {
+                    "linkedin": 0.4,
+                    "research": 0.3,
+                    "inference": 0.3
+                },
+                "exa_timeout": 20,
+                "cerebras_timeout": 30,
+                "sheets_timeout": 30,
+                "hedge_exa": False,
+                "hedge_percentile": 0.95,
+                "hedge_min_samples": 20
+            },
+            "server_controls": {
+                "host": "127.0.0.1",
+                "port": 8080,
+                "write_batch_size": 50,
+                "write_max_delay": 2.0,
+                "max_body_bytes": 65536
+            },
+            "ingest_controls": {
+                "queue_path": "ingest_queue.db",
+                "sheet_batch_size": 50,
+                "sheet_max_delay": 30,
+                "claim_timeout": 600,
+                "poll_interval": 2.0
+            },
+            "state_controls": {
+                "enabled": False,
+                "path": "candidate_state.db"
+            },
+            "dead_letter_controls": {
+                "enabled": False,
+                "path": "dead_letter.db",
+                "base_delay_seconds": 300,
+                "max_delay_seconds": 86400,
+                "retry_batch_size": 50,
+                "max_attempts": {
+                    "timeout": 5,
+                    "rate_limit": 8,
+                    "upstream": 5,
+                    "empty_scrape": 3
+                }
+            },
+            "concurrency_controls": {
+                "enabled": False,
+                "max_candidates": 16,
+                "smoothing": 0.2,
+                "tolerance": 1.5,
+                "backoff_ratio": 0.7,
+                "upstreams": {
+                    "exa": {"initial": 4, "min": 1, "max": 16},
+                    "cerebras": {"initial": 4, "min": 1, "max": 32}
+                }
+            },
+            "budget_controls": {
+                "enabled": False,
+                "path": "budget.db",
+                "per_run": {
+                    "exa_calls": None,
+                    "exa_dollars": None,
+                    "llm_tokens": None,
+                    "sheets_writes": None
+                },
+                "per_day": {
+                    "exa_calls": None,
+                    "exa_dollars": None,
+                    "llm_tokens": None,
+                    "sheets_writes": None
+                },
+                "shed": {
+                    "company_research": 0.8,
+                    "scoring": 0.98
+                }
+            },
+            "scheduling_controls": {
+                "enabled": False,
+                "max_pending": 20000,
+                "initial_fill": 2000,
+                "timezone": None,
+                "aging_per_candidate": 0.01,
+                "recency_half_life_days": 7,
+                "weights": {
+                    "linkedin": 2.0,
+                    "company": 1.5,
+                    "unknown": 1.0,
+                    "academic": 0.5,
+                    "free_mail": 0,
+                    "recency": 1.0
+                },
+                "title_keywords": {
+                    "founder": 3,
+                    "co-founder": 3,
+                    "ceo": 2,
+                    "cto": 2,
+                    "machine learning": 2,
+                    "ml": 1.5,
+                    "researcher": 2,
+                    "research scientist": 2,
+                    "phd": 1.5,
+                    "ai": 1,
+                    "engineer": 0.5
+                }
+            },
+            "prefetch_controls": {
+                "enabled": False,
+                "window": 8,
+                "workers": 4,
+                "max_buffer_chars": 2000000
+            },
             "scraping_controls": {
                 "scan_for_linkedin": true,
                 "research_companies": true,
+                "company_parse_min_confidence": 0.7,
+                "speculative_research": True,
+                "scrape_cache": {
+                    "enabled": False,
+                    "path": "scrape_cache.db"
+                },
                 "common_domains": [
                     "gmail.com",
                     "yahoo.com",
                     "hotmail.com",
                     "outlook.com"
-                ]
+                ],
+                "domain_classes": {
+                    "free_mail": [],
+                    "academic": [],
+                    "company": []
+                }
             }
         }
 
@@ -89,10 +251,37 @@ class ControlPanel:
         try:
             with open(self.config_path, 'w') as f:
                 json.dump(self.config, f, indent=4)
+            self.refresh_snapshot()
             print("Configuration saved successfully")
         except Exception as e:
             print(f"Error saving config: {e}")
 
+    def _file_mtime(self) -> float:
+        try:
+            return os.stat(self.config_path).st_mtime
+        except OSError:
+            return 0.0
+
+    def snapshot(self) -> ConfigSnapshot:
+        """Get the compiled, read-only view of the current config.
+
+        Raises:
+            ConfigError: if the config fails validation
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = compile_config(self.config, self._loaded_mtime)
+        return snapshot
+
+    def refresh_snapshot(self):
+        """Recompile the snapshot after changing config in place."""
+        self._snapshot = compile_config(self.config, self._file_mtime())
+
+    def install(self, config: Dict, snapshot: ConfigSnapshot):
+        """Swap in a reloaded config and its compiled snapshot."""
+        self.config = config
+        self._snapshot = snapshot
+
     def update_config(self, section: str, key: str, value: Any):
         """Update a specific configuration value."""
         if section in self.config and key in self.config[section]:
@@ -102,42 +291,43 @@ class ControlPanel:
         else:
             print(f"Invalid section or key: {section}.{key}")
 
-    def get_prompt(self) -> str:
-        """Get the active prompt template."""
-        controls = self.config["inference_controls"]
-        active_prompt = controls["active_prompt"]
-        return controls["prompts"][active_prompt]["text"]
+    def get_prompt(self, name: Optional[str] = None) -> str:
+        """Get a prompt template, the active one by default."""
+        return self.get_active_prompt_config(name)["text"]
 
     def should_highlight_rows(self) -> bool:
         """Check if row highlighting is enabled."""
-        return self.config["sheet_controls"]["highlight_processed_rows"]
+        return self.snapshot().highlight_rows
 
     def get_sheet_names(self) -> Tuple[str, str]:
         """Get configured sheet names."""
-        controls = self.config["sheet_controls"]
-        return (controls["input_sheet_name"], controls["output_sheet_name"])
+        snapshot = self.snapshot()
+        return (snapshot.input_sheet, snapshot.output_sheet)
 
     def get_required_fields(self) -> list:
         """Get list of required fields for responses."""
-        return self.config["response_format"]["required_fields"]
+        return list(self.snapshot().required_fields)
 
     def get_highlight_color(self) -> Dict:
         """Get row highlight color configuration."""
-        return self.config["sheet_controls"].get("highlight_color", {
-            "red": 0.95,
-            "green": 0.95,
-            "blue": 0.95
-        })
-
-    def get_active_prompt_config(self) -> Dict:
-        """Get active prompt configuration."""
+        return dict(self.snapshot().highlight_color)
+
+    def use_conditional_formatting(self) -> bool:
+        """Check if colours come from sheet-level conditional format rules."""
+        return self.snapshot().conditional_formatting
+
+    def get_priority_colors(self) -> Dict[str, Dict]:
+        """Get output row colours keyed by priority."""
+        return {priority: dict(color) for priority, color in self.snapshot().priority_colors.items()}
+
+    def get_active_prompt_config(self, name: Optional[str] = None) -> Dict:
+        """Get a prompt's configuration, the active one by default."""
         controls = self.config["inference_controls"]
-        active_prompt = controls["active_prompt"]
-        return controls["prompts"][active_prompt]
+        return controls["prompts"][name or controls["active_prompt"]]
 
-    def get_field_format(self) -> Dict[str, bool]:
+    def get_field_format(self, name: Optional[str] = None) -> Dict[str, bool]:
         """Get which fields should be included in output."""
-        active_config = self.get_active_prompt_config()
+        active_config = self.get_active_prompt_config(name)
         return active_config["output_format"]
 
     def list_available_prompts(self) -> Dict[str, str]:
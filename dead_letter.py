@@ -0,0 +1,215 @@
+import json
+import time
+import random
+import sqlite3
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Iterator, List, Optional
+from identity import identity_keys
+
+# Failure classes worth retrying, with the attempts allowed before giving up
+TRANSIENT_ATTEMPTS = {
+    "timeout": 5,
+    "rate_limit": 8,
+    "upstream": 5,
+    "empty_scrape": 3
+}
+
+WAITING = 'waiting'
+RETRYING = 'retrying'
+RESOLVED = 'resolved'
+EXHAUSTED = 'exhausted'
+PARKED = 'parked'
+
+class EmptyScrape(Exception):
+    """Scraping produced nothing to score; failure_class says why."""
+
+    def __init__(self, failure_class: str, message: str):
+        super().__init__(message)
+        self.failure_class = failure_class
+
+def classify_failure(error: BaseException) -> str:
+    """Map an exception to a failure class."""
+    if isinstance(error, EmptyScrape):
+        return error.failure_class
+    if isinstance(error, (FutureTimeoutError, TimeoutError)):
+        return "timeout"
+    name = type(error).__name__.lower()
+    message = str(error).lower()
+    if "ratelimit" in name or "429" in message or "rate limit" in message:
+        return "rate_limit"
+    if "timeout" in name or "timed out" in message:
+        return "timeout"
+    if isinstance(error, ConnectionError) or any(
+        marker in name for marker in ("connection", "apistatus", "internalserver", "serviceunavailable")
+    ) or any(f" {code}" in message for code in ("500", "502", "503", "504")):
+        return "upstream"
+    if isinstance(error, ValueError):
+        return "invalid_output"
+    return "unknown"
+
+class DeadLetterQueue:
+    """SQLite record of candidates that failed, with their retry schedule.
+
+    One entry per applicant, keyed by canonical identity. Transient failures
+    are retried with exponential backoff (base_delay doubling up to
+    max_delay, with jitter) until their class's attempt limit; anything else
+    waits for a person. Retries are claimed by a separate pass, never by the
+    main processing loop.
+    """
+
+    def __init__(self, db_path: str = "dead_letter.db", base_delay: float = 300, max_delay: float = 86400,
+                 max_attempts: Optional[Dict[str, int]] = None):
+        self.db_path = db_path
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = dict(TRANSIENT_ATTEMPTS, **(max_attempts or {}))
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letters ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, identity TEXT NOT NULL UNIQUE, candidate TEXT NOT NULL, "
+            "failure_class TEXT NOT NULL, error TEXT, attempts INTEGER NOT NULL, status TEXT NOT NULL, "
+            "first_failed_at REAL NOT NULL, last_failed_at REAL NOT NULL, next_retry_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS dead_letters_due ON dead_letters (status, next_retry_at)")
+        self.conn.commit()
+
+    def _identity(self, candidate: Dict) -> Optional[str]:
+        for row in [candidate] + candidate.get('duplicates', []):
+            keys = identity_keys(row)
+            if keys:
+                return keys[0]
+        return None
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds to wait before the next attempt."""
+        delay = min(self.base_delay * 2 ** max(attempts - 1, 0), self.max_delay)
+        return delay * random.uniform(0.8, 1.2)
+
+    def add(self, candidate: Dict, error: BaseException) -> Dict:
+        """Record a failure and schedule its retry if the class is transient.
+
+        Returns:
+            Dict with failure_class, attempts, status and next_retry_at
+        """
+        failure_class = classify_failure(error)
+        identity = self._identity(candidate) or f"row:{candidate.get('row_number')}"
+        now = time.time()
+        stored = {key: value for key, value in candidate.items() if key not in ('dead_letter_id', 'state_id')}
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT attempts, status FROM dead_letters WHERE identity = ?", (identity,)
+            ).fetchone()
+            # A candidate that failed again after recovering starts a new count
+            attempts = (row[0] if row and row[1] != RESOLVED else 0) + 1
+            limit = self.max_attempts.get(failure_class, 0)
+            if attempts <= limit:
+                status, next_retry_at = WAITING, now + self.backoff(attempts)
+            else:
+                # Permanent failures are parked for a person; transient ones ran out of attempts
+                status, next_retry_at = EXHAUSTED if limit else PARKED, None
+            self.conn.execute(
+                "INSERT INTO dead_letters (identity, candidate, failure_class, error, attempts, status, "
+                "first_failed_at, last_failed_at, next_retry_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(identity) DO UPDATE SET candidate = excluded.candidate, "
+                "failure_class = excluded.failure_class, error = excluded.error, attempts = excluded.attempts, "
+                "status = excluded.status, last_failed_at = excluded.last_failed_at, "
+                "next_retry_at = excluded.next_retry_at",
+                (identity, json.dumps(stored), failure_class,
+                 str(error)[:500], attempts, status, now, now, next_retry_at)
+            )
+            self.conn.commit()
+        return {'failure_class': failure_class, 'attempts': attempts, 'status': status,
+                'next_retry_at': next_retry_at}
+
+    def contains(self, candidate: Dict) -> bool:
+        """Check whether an applicant is parked here, so the main loop leaves it alone."""
+        keys = [key for row in [candidate] + candidate.get('duplicates', []) for key in identity_keys(row)]
+        if not keys:
+            return False
+        placeholders = ','.join('?' * len(keys))
+        with self._lock:
+            return self.conn.execute(
+                f"SELECT 1 FROM dead_letters WHERE identity IN ({placeholders}) AND status != ? LIMIT 1",
+                (*keys, RESOLVED)
+            ).fetchone() is not None
+
+    def claim_due(self, limit: int = 50) -> List[Dict]:
+        """Take the retries that are due, oldest first."""
+        now = time.time()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, candidate FROM dead_letters WHERE status = ? AND next_retry_at <= ? "
+                "ORDER BY next_retry_at LIMIT ?",
+                (WAITING, now, limit)
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE dead_letters SET status = ? WHERE id = ?", ((RETRYING, entry_id) for entry_id, _ in rows)
+            )
+            self.conn.commit()
+        candidates = []
+        for entry_id, candidate in rows:
+            candidate = json.loads(candidate)
+            candidate['dead_letter_id'] = entry_id
+            candidates.append(candidate)
+        return candidates
+
+    def resolve(self, entry_id: int):
+        """Mark a retried candidate as done."""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE dead_letters SET status = ?, next_retry_at = NULL WHERE id = ?", (RESOLVED, entry_id)
+            )
+            self.conn.commit()
+
+    def fail_claimed(self, entry_id: int, candidate: Dict, error: BaseException) -> Optional[Dict]:
+        """Count a retry that failed without raising; a no-op once add() has recorded the attempt."""
+        with self._lock:
+            row = self.conn.execute("SELECT status FROM dead_letters WHERE id = ?", (entry_id,)).fetchone()
+        if not row or row[0] != RETRYING:
+            return None
+        return self.add(candidate, error)
+
+    def requeue(self, entry_id: int):
+        """Return an interrupted retry to the schedule without counting an attempt."""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE dead_letters SET status = ?, next_retry_at = ? WHERE id = ? AND status = ?",
+                (WAITING, time.time(), entry_id, RETRYING)
+            )
+            self.conn.commit()
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Count entries by status, then failure class."""
+        summary: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for status, failure_class, count in self.conn.execute(
+                "SELECT status, failure_class, COUNT(*) FROM dead_letters GROUP BY status, failure_class"
+            ):
+                summary.setdefault(status, {})[failure_class] = count
+        return summary
+
+    def iter_entries(self, status: Optional[str] = None, limit: Optional[int] = None) -> Iterator[Dict]:
+        """Yield entries, most recent failure first; unresolved ones unless a status is given."""
+        query = ("SELECT identity, failure_class, error, attempts, status, next_retry_at FROM dead_letters "
+                 f"WHERE status {'=' if status else '!='} ? ORDER BY last_failed_at DESC")
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self.conn.execute(query, (status or RESOLVED,)).fetchall()
+        for identity, failure_class, error, attempts, status, next_retry_at in rows:
+            yield {'identity': identity, 'failure_class': failure_class, 'error': error,
+                   'attempts': attempts, 'status': status, 'next_retry_at': next_retry_at}
+
+    def next_due(self) -> Optional[float]:
+        """Get when the next retry falls due."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MIN(next_retry_at) FROM dead_letters WHERE status = ?", (WAITING,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,100 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Executor, FIRST_COMPLETED, TimeoutError, wait
+from typing import Callable, Dict, Optional
+from control_panel import ControlPanel
+
+class DeadlineExceeded(TimeoutError):
+    """A stage ran out of its share of the candidate's time budget."""
+
+class Deadline:
+    """Time budget for one candidate, shared out across ordered stages.
+
+    Each stage gets the remaining time in proportion to its weight among the
+    stages still to run, so time left over by a fast stage rolls forward.
+    """
+
+    def __init__(self, seconds: float, stages: Optional[Dict[str, float]] = None):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.stages = dict(stages or {})
+
+    @classmethod
+    def from_config(cls, control_panel: Optional[ControlPanel] = None) -> 'Deadline':
+        controls = (control_panel or ControlPanel()).config.get("deadline_controls", {})
+        return cls(controls.get("candidate_seconds", 60), controls.get("stages"))
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def budget(self, *stages: str) -> float:
+        """Seconds available right now to one stage, or to several run together."""
+        names = list(self.stages)
+        known = [stage for stage in stages if stage in self.stages]
+        if not known:
+            return self.remaining()
+        later = sum(self.stages[name] for name in names[min(names.index(stage) for stage in known):])
+        share = sum(self.stages[stage] for stage in known) / later if later else 1.0
+        return self.remaining() * share
+
+class LatencyTracker:
+    """Rolling window of call latencies for percentile estimates."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+def call_with_timeout(executor: Executor, timeout: float, fn: Callable, *args,
+                      hedge_after: Optional[float] = None, on_hedge: Optional[Callable] = None, **kwargs):
+    """Run fn on an executor and wait at most timeout seconds.
+
+    With hedge_after set, a duplicate request is sent once the first has
+    been outstanding that long, and whichever returns first wins. A call
+    that times out keeps its worker thread until the client gives up, so
+    callers should also set client-level timeouts.
+
+    Raises:
+        DeadlineExceeded: if no attempt finished in time
+    """
+    if timeout <= 0:
+        raise DeadlineExceeded("no time left")
+    start = time.monotonic()
+    attempts = [executor.submit(fn, *args, **kwargs)]
+
+    if hedge_after is not None and hedge_after < timeout:
+        done, _ = wait(attempts, timeout=hedge_after)
+        if not done:
+            attempts.append(executor.submit(fn, *args, **kwargs))
+            if on_hedge:
+                on_hedge()
+
+    done, _ = wait(attempts, timeout=max(timeout - (time.monotonic() - start), 0), return_when=FIRST_COMPLETED)
+    if not done:
+        for attempt in attempts:
+            attempt.cancel()
+        raise DeadlineExceeded(f"{getattr(fn, '__name__', 'call')} timed out after {timeout:.1f}s")
+
+    # Prefer a successful attempt if several finished together
+    finished = sorted(done, key=lambda attempt: attempt.exception() is not None)
+    for attempt in attempts:
+        if attempt not in done:
+            attempt.cancel()
+    return finished[0].result()
@@ -0,0 +1,90 @@
+import os
+import json
+from enum import Enum
+from typing import Dict, Iterable, Optional
+from control_panel import ControlPanel
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'domains.json')
+
+class DomainClass(Enum):
+    FREE_MAIL = "free_mail"
+    ACADEMIC = "academic"
+    COMPANY = "company"
+    UNKNOWN = "unknown"
+
+# Trie key holding a node's class; never a valid domain label
+_CLASS_KEY = ''
+
+class DomainIndex:
+    """Suffix trie over reversed domain labels; the longest matching suffix wins.
+
+    "cs.stanford.edu" walks edu -> stanford -> cs, so an "edu" entry marks it
+    academic while a more specific entry (e.g. a company on a .edu host)
+    would override it.
+    """
+
+    def __init__(self):
+        self._root: Dict = {}
+
+    def add(self, suffix: str, domain_class: DomainClass):
+        """Register a domain or suffix under a class."""
+        node = self._root
+        for label in reversed(suffix.lower().strip().strip('.').split('.')):
+            node = node.setdefault(label, {})
+        node[_CLASS_KEY] = domain_class
+
+    def add_all(self, suffixes: Iterable[str], domain_class: DomainClass):
+        for suffix in suffixes:
+            if suffix:
+                self.add(suffix, domain_class)
+
+    def classify(self, domain: Optional[str]) -> DomainClass:
+        """Get the class of the longest registered suffix of a domain."""
+        if not domain:
+            return DomainClass.UNKNOWN
+        found = DomainClass.UNKNOWN
+        node = self._root
+        for label in reversed(domain.lower().strip().strip('.').split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(_CLASS_KEY, found)
+        return found
+
+    def is_free_mail(self, domain: Optional[str]) -> bool:
+        return self.classify(domain) == DomainClass.FREE_MAIL
+
+    def is_academic(self, domain: Optional[str]) -> bool:
+        return self.classify(domain) == DomainClass.ACADEMIC
+
+    @classmethod
+    def from_config(cls, control_panel: Optional[ControlPanel] = None,
+                    data_path: str = DEFAULT_DATA_PATH) -> 'DomainIndex':
+        """Build the index from the bundled data file plus config extensions."""
+        controls = (control_panel or ControlPanel()).config.get("scraping_controls", {})
+        index = cls()
+        try:
+            with open(data_path, 'r') as f:
+                data = json.load(f)
+            index.add_all(data.get("free_mail", []), DomainClass.FREE_MAIL)
+            index.add_all(data.get("academic_suffixes", []), DomainClass.ACADEMIC)
+            index.add_all(data.get("company", []), DomainClass.COMPANY)
+        except Exception as e:
+            print(f"Error loading domain data: {e}")
+
+        # Config entries are added last so they override bundled ones
+        index.add_all(controls.get("common_domains", []), DomainClass.FREE_MAIL)
+        extra = controls.get("domain_classes", {})
+        index.add_all(extra.get("free_mail", []), DomainClass.FREE_MAIL)
+        index.add_all(extra.get("academic", []), DomainClass.ACADEMIC)
+        index.add_all(extra.get("company", []), DomainClass.COMPANY)
+        return index
+
+_shared_index: Optional[DomainIndex] = None
+
+def get_domain_index(control_panel: Optional[ControlPanel] = None) -> DomainIndex:
+    """Get the process-wide domain index, building it on first use."""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = DomainIndex.from_config(control_panel)
+    return _shared_index
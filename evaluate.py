@@ -0,0 +1,135 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from control_panel import ControlPanel
+from inference import Inference
+from response_cache import ResponseCache
+from scrape_cache import ScrapeCache
+
+Variant = Tuple[str, str]
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+def _label(variant: Variant, show_model: bool) -> str:
+    prompt, model = variant
+    return f"{prompt}@{model}" if show_model else prompt
+
+def evaluate(prompts: List[str], models: Optional[List[str]] = None, limit: Optional[int] = None,
+             workers: Optional[int] = None, control_panel: Optional[ControlPanel] = None) -> Dict:
+    """Score the cached corpus with every prompt/model pair and compare the decisions.
+
+    Args:
+        prompts: Prompt names from control_panel.json
+        models: Models to try; the configured model when omitted
+        limit: Optional number of cached applicants to use
+        workers: Concurrent model calls; defaults to evaluation.workers
+        control_panel: Shared configuration
+
+    Returns:
+        Dict with per-variant decisions and stats, and the pairwise agreement matrix
+    """
+    base = control_panel or ControlPanel()
+    inference_controls = base.config["inference_controls"]
+    unknown = [name for name in prompts if name not in inference_controls["prompts"]]
+    if unknown:
+        raise ValueError(f"Unknown prompts: {', '.join(unknown)}")
+
+    # Evaluation only needs decisions: no email drafts, no reused decisions
+    controls = copy.deepcopy(base)
+    controls.config["response_format"]["email_template"] = False
+    controls.config["inference_controls"]["near_duplicate"] = {"enabled": False}
+    controls.refresh_snapshot()
+
+    cache_controls = base.config["scraping_controls"].get("scrape_cache", {})
+    scrape_cache = ScrapeCache(cache_controls.get("path", "scrape_cache.db"))
+    corpus = list(scrape_cache.iter_scrapes(limit))
+    scrape_cache.close()
+    if not corpus:
+        print("No cached scrapes to evaluate - run the processor with scrape_cache enabled first")
+        return {}
+
+    response_cache = ResponseCache(inference_controls.get("response_cache", {}).get("path", "response_cache.db"))
+    models = models or [inference_controls.get("model", "llama3.3-70b")]
+    variants: List[Variant] = [(prompt, model) for prompt in prompts for model in models]
+    runners = {
+        variant: Inference(controls, prompt_name=variant[0], model=variant[1], response_cache=response_cache)
+        for variant in variants
+    }
+    decisions: Dict[Variant, List[str]] = {variant: [''] * len(corpus) for variant in variants}
+
+    def score(variant: Variant, idx: int) -> str:
+        scraped = corpus[idx]
+        analysis = runners[variant].analyze_candidate(
+            profile_data=scraped['linkedin_data'],
+            company_data=scraped['company_research'],
+            email=scraped['email'],
+            linkedin_url=scraped['linkedin']
+        )
+        return str(analysis.get('priority', '')).strip().lower()
+
+    workers = workers or inference_controls.get("evaluation", {}).get("workers", 8)
+    print(f"Evaluating {len(variants)} variants over {len(corpus)} applicants with {workers} workers")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(score, variant, idx): (variant, idx)
+            for idx in range(len(corpus)) for variant in variants
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            variant, idx = futures[future]
+            try:
+                decisions[variant][idx] = future.result()
+            except Exception as e:
+                print(f"Evaluation error for {variant[0]} on applicant {idx}: {e}")
+            if done % 100 == 0:
+                print(f"{done}/{len(futures)} scored")
+    response_cache.close()
+
+    report = {"corpus_size": len(corpus), "variants": {}, "agreement": {}}
+    for variant in variants:
+        stats = runners[variant].stats
+        latencies = runners[variant].latencies
+        labels = decisions[variant]
+        report["variants"][variant] = {
+            "decisions": labels,
+            "accept_rate": labels.count('accept') / len(labels),
+            "prompt_tokens": stats["prompt_tokens"],
+            "completion_tokens": stats["completion_tokens"],
+            "llm_calls": stats["llm_calls"],
+            "cache_hits": stats["cache_hits"],
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p95": _percentile(latencies, 0.95)
+        }
+    for a in variants:
+        for b in variants:
+            same = sum(x == y for x, y in zip(decisions[a], decisions[b]))
+            report["agreement"][(a, b)] = same / len(corpus)
+    return report
+
+def print_report(report: Dict):
+    """Print per-variant stats and the agreement matrix."""
+    if not report:
+        return
+    variants = list(report["variants"])
+    show_model = len({model for _, model in variants}) > 1
+    labels = [_label(variant, show_model) for variant in variants]
+    width = max(len(label) for label in labels) + 2
+
+    print(f"\n=== Evaluation over {report['corpus_size']} applicants ===")
+    print(f"{'variant':<{width}}{'accept':>8}{'tokens in':>11}{'tokens out':>11}"
+          f"{'calls':>7}{'cached':>8}{'p50 s':>8}{'p95 s':>8}")
+    for variant, label in zip(variants, labels):
+        stats = report["variants"][variant]
+        print(f"{label:<{width}}{stats['accept_rate']:>8.1%}{stats['prompt_tokens']:>11}"
+              f"{stats['completion_tokens']:>11}{stats['llm_calls']:>7}{stats['cache_hits']:>8}"
+              f"{stats['latency_p50']:>8.2f}{stats['latency_p95']:>8.2f}")
+
+    if len(variants) > 1:
+        print("\nAgreement matrix:")
+        print(' ' * width + ''.join(f"{label:>{width}}" for label in labels))
+        for a, label in zip(variants, labels):
+            row = ''.join(f"{report['agreement'][(a, b)]:>{width}.1%}" for b in variants)
+            print(f"{label:<{width}}{row}")
@@ -0,0 +1,107 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+GMAIL_DOMAINS = {'gmail.com', 'googlemail.com'}
+# Providers that deliver user+tag@ to user@; elsewhere a plus may be part of the mailbox name
+PLUS_TAG_DOMAINS = GMAIL_DOMAINS | {
+    'outlook.com', 'hotmail.com', 'live.com', 'icloud.com', 'me.com',
+    'fastmail.com', 'protonmail.com', 'proton.me'
+}
+
+def canonical_email(email: Optional[str]) -> Optional[str]:
+    """Normalize an email so aliases of one mailbox compare equal."""
+    if not email or '@' not in email:
+        return None
+    local, domain = email.strip().lower().rsplit('@', 1)
+    if domain in PLUS_TAG_DOMAINS:
+        local = local.split('+', 1)[0]
+    if domain in GMAIL_DOMAINS:
+        local = local.replace('.', '')
+        domain = 'gmail.com'
+    return f"{local}@{domain}" if local and domain else None
+
+def canonical_linkedin(url: Optional[str]) -> Optional[str]:
+    """Normalize a LinkedIn profile URL to linkedin.com/in/<slug>."""
+    if not url:
+        return None
+    match = re.search(r'linkedin\.com/in/([^/?#\s]+)', url.strip().lower())
+    return f"linkedin.com/in/{match.group(1)}" if match else None
+
+def identity_keys(candidate: Dict) -> List[str]:
+    """Get the identity keys a candidate can be matched on."""
+    keys = []
+    email = canonical_email(candidate.get('email'))
+    if email:
+        keys.append(f"email:{email}")
+    linkedin = canonical_linkedin(candidate.get('linkedin'))
+    if linkedin:
+        keys.append(f"linkedin:{linkedin}")
+    return keys
+
+class UnionFind:
+    """Disjoint sets over integer ids with path compression and union by size."""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+def group_candidates(candidates: List[Dict]) -> List[Dict]:
+    """Merge rows that share a canonical email or LinkedIn into one candidate.
+
+    The earliest row of each group is kept as the primary. It takes the first
+    email and LinkedIn found across the group, and the other rows are listed
+    under 'duplicates' so a single result can be fanned out to all of them.
+    """
+    groups = UnionFind(len(candidates))
+    first_seen: Dict[str, int] = {}
+    for idx, candidate in enumerate(candidates):
+        for key in identity_keys(candidate):
+            if key in first_seen:
+                groups.union(first_seen[key], idx)
+            else:
+                first_seen[key] = idx
+
+    members: Dict[int, List[int]] = {}
+    for idx in range(len(candidates)):
+        members.setdefault(groups.find(idx), []).append(idx)
+
+    merged = []
+    for indexes in sorted(members.values()):
+        rows = [candidates[idx] for idx in indexes]
+        primary = dict(rows[0])
+        for field in ('email', 'linkedin'):
+            if not primary.get(field):
+                value = next((row[field] for row in rows if row.get(field)), None)
+                if value:
+                    primary[field] = value
+        primary['duplicates'] = rows[1:]
+        merged.append(primary)
+    return merged
+
+def iter_grouped(candidates: Iterable[Dict], window: int) -> Iterator[Dict]:
+    """Group a candidate stream window by window to keep memory bounded."""
+    batch = []
+    for candidate in candidates:
+        batch.append(candidate)
+        if len(batch) >= window:
+            yield from group_candidates(batch)
+            batch = []
+    if batch:
+        yield from group_candidates(batch)
@@ -233,34 +233,127 @@
 
 import os
 import json
-from typing import Dict, Optional
-from cerebras.cloud.sdk import Cerebras
+import time
+import threading
+from typing import Dict, List, Mapping, Optional
 from dotenv import load_dotenv
 from control_panel import ControlPanel
+from config_snapshot import PromptConfig
+from compaction import compact_profile, compact_company, estimate_tokens
+from response_cache import ResponseCache
+from output_schema import OutputSchema
+from deadline import Deadline, DeadlineExceeded
+from concurrency import get_concurrency
+from budget import get_budget
+from domain_index import DomainClass, get_domain_index
+
+# Context from the email domain, passed to the model rather than overriding its output
+DOMAIN_HINTS = {
+    DomainClass.ACADEMIC: "The applicant's email is on an academic institution domain, so they may be a student or researcher.",
+    DomainClass.FREE_MAIL: "The applicant uses a free email provider, which says nothing about their employer."
+}
 
 load_dotenv()
 
 class Inference:
-    def __init__(self, control_panel: Optional[ControlPanel] = None):
+    def __init__(self, control_panel: Optional[ControlPanel] = None, prompt_name: Optional[str] = None,
+                 model: Optional[str] = None, response_cache: Optional[ResponseCache] = None):
+        """Set up the model client.
+
+        Args:
+            control_panel: Shared configuration
+            prompt_name: Prompt to use instead of the active one
+            model: Model to use instead of the configured one
+            response_cache: Cache of completions; built from config when omitted
+        """
+        from cerebras.cloud.sdk import Cerebras
+
         self.controls = control_panel or ControlPanel()
-        self.client = Cerebras(api_key=os.getenv("CEREBRAS_KEY"))
+        self.client = Cerebras(
+            api_key=os.getenv("CEREBRAS_KEY"),
+            timeout=self.controls.config.get("deadline_controls", {}).get("cerebras_timeout", 30)
+        )
         
+        # In-flight limit shared with every other Cerebras caller in the process
+        self.concurrency = get_concurrency(self.controls)
+        self.budget = get_budget(self.controls)
+        self.domains = get_domain_index(self.controls)
+
         # Get model settings from control panel
         inference_controls = self.controls.config["inference_controls"]
-        self.model = inference_controls.get("model", "llama3.3-70b")
-        self.temperature = inference_controls.get("temperature", 0)
+        self.prompt_name = prompt_name
+        self.model_override = model
+
+        cache_controls = inference_controls.get("response_cache", {})
+        if response_cache is None and cache_controls.get("enabled", False):
+            response_cache = ResponseCache(cache_controls.get("path", "response_cache.db"))
+        self.response_cache = response_cache
+
+        # Response validation against the prompt's expected output
+        self._schemas: Dict[tuple, OutputSchema] = {}
+
+        # Near-duplicate index of previously scored profiles; enabling it takes a restart
+        self.near_duplicates = None
+        if self.near_duplicate_controls.get("enabled"):
+            self.near_duplicates = self._load_near_duplicates()
+        self.decisions_reused = 0
+
+        # Prompt field compaction token accounting
+        self.stats = {
+            "profile_tokens_raw": 0,
+            "profile_tokens_compacted": 0,
+            "company_tokens_raw": 0,
+            "company_tokens_compacted": 0,
+            "llm_calls": 0,
+            "cache_hits": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "responses_checked": 0,
+            "responses_invalid": 0,
+            "responses_repaired": 0
+        }
+        self.latencies: List[float] = []
+        self._stats_lock = threading.Lock()
+        # The near-duplicate index is shared by concurrent callers such as the HTTP service
+        self._index_lock = threading.Lock()
+
+    @property
+    def model(self) -> str:
+        """Model in use; follows config reloads unless overridden."""
+        return self.model_override or self.controls.snapshot().model
+
+    @property
+    def temperature(self) -> float:
+        return self.controls.snapshot().temperature
+
+    # Per-call settings, read from the current snapshot so config reloads apply
+    @property
+    def validation_controls(self) -> Mapping:
+        return self.controls.snapshot().sections["inference_controls"].get("validation", {})
+
+    @property
+    def near_duplicate_controls(self) -> Mapping:
+        return self.controls.snapshot().sections["inference_controls"].get("near_duplicate", {})
+
+    @property
+    def compaction_controls(self) -> Mapping:
+        return self.controls.snapshot().sections["inference_controls"].get("compaction", {})
 
     def analyze_candidate(self, profile_data: Optional[str], company_data: Optional[str], 
-                         email: Optional[str], linkedin_url: Optional[str] = None) -> Dict:
-        """Analyze candidate and generate response."""
+                         email: Optional[str], linkedin_url: Optional[str] = None,
+                         deadline: Optional[Deadline] = None, raise_errors: bool = False) -> Dict:
+        """Analyze candidate and generate response.
+
+        Failures return the default values unless raise_errors is set, for
+        callers that route failed candidates elsewhere.
+        """
+        # Get default values from the compiled config
+        config = self.controls.snapshot()
+        defaults = dict(config.default_values)
         try:
-            # Handle empty inputs
-            profile_text = str(profile_data) if profile_data else ""
-            company_text = str(company_data) if company_data else ""
-
-            # Get default values from control panel
-            defaults = self.controls.config["response_format"]["default_values"]
-            result = defaults.copy()
+            # Handle empty inputs and compact what goes into the prompt
+            profile_text, company_text = self._prepare_inputs(profile_data, company_data)
+            result = dict(defaults)
             
             # Add contact info
             result.update({
@@ -272,11 +365,29 @@ class Inference:
             if not profile_text.strip() and not company_text.strip():
                 return result
             
-            # Get analysis using active prompt
-            analysis = self._get_analysis(profile_text, company_text)
+            # Reuse or hint from a previously scored near-duplicate profile
+            prompt = config.get_prompt(self.prompt_name)
+            match_text = f"{profile_text}\n{company_text}"
+            match = self._find_near_duplicate(match_text, prompt.version)
+            if match and self.near_duplicate_controls.get("mode", "reuse") == "reuse":
+                similarity, decision = match
+                with self._stats_lock:
+                    self.decisions_reused += 1
+                analysis = {field: decision.get(field, "") for field in prompt.output_fields}
+                analysis["priority_reasoning"] = (
+                    f"* Reused decision from near-duplicate profile (similarity {similarity:.2f})\n"
+                    f"{decision.get('priority_reasoning', '')}"
+                )
+                result["decision_source"] = "near_duplicate"
+            else:
+                # Get analysis using active prompt
+                domain_class = self.domains.classify(email.rsplit('@', 1)[1] if email and '@' in email else None)
+                analysis = self._get_analysis(profile_text, company_text, hint=match, deadline=deadline,
+                                              domain_hint=DOMAIN_HINTS.get(domain_class), raise_errors=raise_errors)
+                self._remember_decision(match_text, analysis, prompt)
             
             # Only include fields specified in output format
-            field_format = self.controls.get_field_format()
+            field_format = prompt.field_format
             for field in list(analysis.keys()):
                 if not field_format.get(field, False):
                     analysis.pop(field)
@@ -284,8 +395,7 @@ class Inference:
             result.update(analysis)
 
             # Generate email if enabled and accepted
-            if (self.controls.config["response_format"].get("email_template", True) 
-                and result['priority'] == 'accept'):
+            if config.email_template and result['priority'] == 'accept':
                 result['email_draft'] = self._generate_email(
                     name=result.get('name', 'there'),
                     company=result.get('company', 'your company'),
@@ -294,31 +404,230 @@ class Inference:
             
             return result
             
+        except DeadlineExceeded as e:
+            if raise_errors:
+                raise
+            # Out of time: the defaults stand in, flagged so the caller can tell
+            print(f"Analysis timed out: {e}")
+            return {**defaults, "partial": True}
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Analysis failed: {e}")
             return defaults
 
-    def _get_analysis(self, profile: str, company_info: str) -> Dict:
-        """Analyze candidate profile."""
+    def _get_analysis(self, profile: str, company_info: str, hint: Optional[tuple] = None,
+                      deadline: Optional[Deadline] = None, domain_hint: Optional[str] = None,
+                      raise_errors: bool = False) -> Dict:
+        """Analyze candidate profile; failures give the default values unless raise_errors is set."""
         try:
             # Get active prompt template and format
-            prompt = self.controls.get_prompt()
+            prompt = self.controls.snapshot().get_prompt(self.prompt_name).text
             prompt = prompt.format(profile=profile, company_info=company_info)
 
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a strict technical evaluator that gives specific reasons for decisions."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model,
-                response_format={"type": "json_object"},
-                temperature=self.temperature
-            )
-            
-            return json.loads(response.choices[0].message.content)
+            messages = [
+                {"role": "system", "content": "You are a strict technical evaluator that gives specific reasons for decisions."}
+            ]
+            if hint:
+                similarity, decision = hint
+                messages.append({"role": "system", "content": (
+                    f"For reference, a near-identical profile (similarity {similarity:.2f}) was previously "
+                    f"decided as '{decision.get('priority')}' because:\n{decision.get('priority_reasoning', '')}\n"
+                    "Judge this candidate on their own profile."
+                )})
+            if domain_hint:
+                messages.append({"role": "system", "content": domain_hint})
+            messages.append({"role": "user", "content": prompt})
+
+            content = self._complete(messages, deadline)
+            if not self.validation_controls.get("enabled", True):
+                return json.loads(content)
+            return self._validate_analysis(content, deadline)
+        except DeadlineExceeded:
+            raise
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Analysis error: {e}")
-            return self.controls.config["response_format"]["default_values"].copy()
+            return dict(self.controls.snapshot().default_values)
+
+    def _get_schema(self) -> OutputSchema:
+        """Get the output schema of the prompt in use."""
+        config = self.controls.snapshot()
+        prompt = config.get_prompt(self.prompt_name)
+        key = (config.version, prompt.name)
+        if key not in self._schemas:
+            # A reload invalidates every compiled schema
+            self._schemas = {key: OutputSchema.from_prompt(
+                {"text": prompt.text, "output_format": prompt.field_format},
+                priorities=self.validation_controls.get("priorities")
+            )}
+        return self._schemas[key]
+
+    def _validate_analysis(self, content: str, deadline: Optional[Deadline] = None) -> Dict:
+        """Check a response against the schema, re-asking with only the broken output."""
+        schema = self._get_schema()
+        analysis, errors = schema.check(content)
+        with self._stats_lock:
+            self.stats["responses_checked"] += 1
+            if errors:
+                self.stats["responses_invalid"] += 1
+
+        for _ in range(self.validation_controls.get("max_repairs", 1)):
+            if not errors:
+                break
+            print(f"Invalid model output ({'; '.join(errors)}) - requesting repair")
+            content = self._complete(schema.repair_messages(content, errors), deadline)
+            analysis, errors = schema.check(content)
+            if not errors:
+                with self._stats_lock:
+                    self.stats["responses_repaired"] += 1
+
+        if errors:
+            raise ValueError(f"unusable model output: {'; '.join(errors)}")
+        return analysis
+
+    def invalid_response_rate(self) -> float:
+        """Share of checked responses that failed validation before repair."""
+        checked = self.stats["responses_checked"]
+        return self.stats["responses_invalid"] / checked if checked else 0.0
+
+    def _complete(self, messages: List[Dict], deadline: Optional[Deadline] = None) -> str:
+        """Run a JSON chat completion, answered from the response cache when possible.
+
+        Token counts are recorded for cached responses too, so stats reflect
+        what a prompt costs rather than what this run spent.
+        """
+        key = None
+        if self.response_cache is not None:
+            key = ResponseCache.key(self.model, self.temperature, messages)
+            cached = self.response_cache.get(key)
+            if cached:
+                content, prompt_tokens, completion_tokens = cached
+                self._record_usage(prompt_tokens, completion_tokens, cached=True)
+                return content
+
+        options = {}
+        if deadline is not None:
+            if deadline.expired():
+                raise DeadlineExceeded("no time left for inference")
+            options["timeout"] = deadline.budget("inference")
+
+        with self.concurrency.slot("cerebras", options.get("timeout")):
+            start = time.monotonic()
+            try:
+                response = self.client.chat.completions.create(
+                    messages=messages,
+                    model=self.model,
+                    response_format={"type": "json_object"},
+                    temperature=self.temperature,
+                    **options
+                )
+            except Exception as e:
+                # The client's own timeout error means the candidate's deadline ran out
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded(f"inference timed out: {e}") from e
+                raise
+        elapsed = time.monotonic() - start
+
+        content = response.choices[0].message.content
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        self._record_usage(prompt_tokens, completion_tokens, latency=elapsed)
+        if key:
+            self.response_cache.put(key, self.model, content, prompt_tokens, completion_tokens)
+        return content
+
+    def _record_usage(self, prompt_tokens: int, completion_tokens: int,
+                      latency: Optional[float] = None, cached: bool = False):
+        with self._stats_lock:
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += completion_tokens
+            if cached:
+                self.stats["cache_hits"] += 1
+            else:
+                self.stats["llm_calls"] += 1
+                self.latencies.append(latency)
+        if not cached:
+            self.budget.record("llm_tokens", prompt_tokens + completion_tokens)
+
+    def _prepare_inputs(self, profile_data, company_data) -> tuple:
+        """Turn scraped data into prompt text, compacted to the configured budgets."""
+        profile_raw = str(profile_data) if profile_data else ""
+        company_raw = str(company_data) if company_data else ""
+
+        if not self.compaction_controls.get("enabled", False):
+            return profile_raw, company_raw
+
+        profile_text = compact_profile(profile_data, self.compaction_controls.get("profile_token_budget", 1200))
+        company_text = compact_company(company_data, self.compaction_controls.get("company_token_budget", 600))
+
+        counts = (estimate_tokens(profile_raw), estimate_tokens(profile_text),
+                  estimate_tokens(company_raw), estimate_tokens(company_text))
+        with self._stats_lock:
+            self.stats["profile_tokens_raw"] += counts[0]
+            self.stats["profile_tokens_compacted"] += counts[1]
+            self.stats["company_tokens_raw"] += counts[2]
+            self.stats["company_tokens_compacted"] += counts[3]
+        return profile_text, company_text
+
+    def _load_near_duplicates(self):
+        """Load the near-duplicate index from disk, or start an empty one."""
+        from near_duplicates import MinHashLSHIndex
+        controls = self.near_duplicate_controls
+        path = controls.get("index_path", "near_duplicates.npz")
+        # Decisions made with another prompt or model are not reused
+        prompt_version = self.controls.snapshot().get_prompt(self.prompt_name).version
+        try:
+            if os.path.exists(path):
+                index = MinHashLSHIndex.load(path, keep=lambda record: self._same_setup(record, prompt_version))
+                print(f"Loaded {len(index)} scored profiles for near-duplicate lookup")
+                return index
+        except Exception as e:
+            print(f"Error loading near-duplicate index: {e}")
+        return MinHashLSHIndex(num_perm=controls.get("num_perm", 128), bands=controls.get("bands", 32))
+
+    def _same_setup(self, record: Dict, prompt_version: str) -> bool:
+        """Check an indexed decision was made with the current prompt and model."""
+        return record.get("prompt_version") == prompt_version and record.get("model") == self.model
+
+    def _find_near_duplicate(self, text: str, prompt_version: str) -> Optional[tuple]:
+        """Find a previously scored profile above the similarity threshold, decided with the same prompt."""
+        if self.near_duplicates is None:
+            return None
+        try:
+            with self._index_lock:
+                match = self.near_duplicates.query(text, self.near_duplicate_controls.get("threshold", 0.9))
+        except Exception as e:
+            print(f"Near-duplicate lookup error: {e}")
+            return None
+        # Decisions indexed before a config reload changed the prompt or model
+        if match and not self._same_setup(match[1], prompt_version):
+            return None
+        return match
+
+    def _remember_decision(self, text: str, analysis: Dict, prompt: PromptConfig):
+        """Index a model decision, with every output field, so near-duplicates can reuse it."""
+        if self.near_duplicates is None or not analysis.get("priority"):
+            return
+        # Fallback defaults from a failed call are not real decisions
+        if analysis == self.controls.snapshot().default_values:
+            return
+        record = {field: analysis.get(field, "") for field in prompt.output_fields}
+        record.update(prompt_version=prompt.version, model=self.model)
+        with self._index_lock:
+            self.near_duplicates.add(text, record)
+
+    def save_state(self):
+        """Persist the near-duplicate index."""
+        if self.near_duplicates is None:
+            return
+        try:
+            with self._index_lock:
+                self.near_duplicates.save(self.near_duplicate_controls.get("index_path", "near_duplicates.npz"))
+        except Exception as e:
+            print(f"Error saving near-duplicate index: {e}")
 
     def _generate_email(self, name: str, company: str, profile: str) -> str:
         """Generate email from template."""
@@ -0,0 +1,178 @@
+import re
+import json
+import time
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional
+from identity import identity_keys
+from storage import CandidateStore
+
+# Signups the queue will not score again; their input rows are marked processed when appended
+SETTLED = ('done', 'duplicate', 'skipped')
+
+def parse_signup(payload: Dict) -> Dict:
+    """Flatten a form-submission payload and pull out the email and LinkedIn URL.
+
+    Accepts a flat {column: value} object, or one with the answers under
+    "fields". Values are searched the same way input sheet rows are.
+    """
+    fields = payload.get('fields') if isinstance(payload.get('fields'), dict) else payload
+    fields = {str(key): '' if value is None else str(value).strip() for key, value in fields.items()}
+    text = ' '.join(fields.values())
+    emails = re.findall(CandidateStore.EMAIL_PATTERN, text)
+    linkedin_urls = re.findall(CandidateStore.LINKEDIN_PATTERN, text)
+    return {
+        'fields': fields,
+        'email': emails[0].lower() if emails else '',
+        'linkedin': linkedin_urls[0] if linkedin_urls else ''
+    }
+
+class IngestQueue:
+    """Durable local queue of signups, deduplicated by applicant identity.
+
+    Every submission is kept so its raw row can be appended to the input
+    sheet, but only the first one per canonical email or LinkedIn is queued
+    for scoring; later ones are stored as duplicates. Claimed signups that
+    are not completed within claim_timeout (e.g. after a crash) are handed
+    out again.
+    """
+
+    def __init__(self, db_path: str = "ingest_queue.db", claim_timeout: float = 600):
+        self.db_path = db_path
+        self.claim_timeout = claim_timeout
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS signups ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT, linkedin TEXT, fields TEXT NOT NULL, "
+            "status TEXT NOT NULL, received_at REAL NOT NULL, claimed_at REAL, "
+            "input_row INTEGER, synced INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS signups_status ON signups (status, id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS signups_unsynced ON signups (synced, id)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS signup_keys ("
+            "identity TEXT PRIMARY KEY, signup_id INTEGER NOT NULL REFERENCES signups(id))"
+        )
+        self.conn.commit()
+
+    def enqueue(self, payload: Dict) -> Dict:
+        """Store a submission; committed before returning so a webhook can be acknowledged.
+
+        Returns:
+            Dict with the signup id and its status: pending, duplicate or skipped
+        """
+        signup = parse_signup(payload)
+        keys = identity_keys(signup)
+        with self._lock:
+            known = None
+            if keys:
+                placeholders = ','.join('?' * len(keys))
+                known = self.conn.execute(
+                    f"SELECT signup_id FROM signup_keys WHERE identity IN ({placeholders}) LIMIT 1", keys
+                ).fetchone()
+            status = 'skipped' if not keys else 'duplicate' if known else 'pending'
+            cursor = self.conn.execute(
+                "INSERT INTO signups (email, linkedin, fields, status, received_at) VALUES (?, ?, ?, ?, ?)",
+                (signup['email'], signup['linkedin'], json.dumps(signup['fields']), status, time.time())
+            )
+            # A duplicate may bring a key the first signup lacked; link it to the original
+            owner = known[0] if known else cursor.lastrowid
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO signup_keys (identity, signup_id) VALUES (?, ?)",
+                ((key, owner) for key in keys)
+            )
+            self.conn.commit()
+        return {'signup_id': cursor.lastrowid, 'status': status}
+
+    def claim(self, limit: int = 1) -> List[Dict]:
+        """Hand out the oldest pending signups as candidates."""
+        now = time.time()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, email, linkedin, input_row FROM signups "
+                "WHERE status = 'pending' OR (status = 'claimed' AND claimed_at < ?) ORDER BY id LIMIT ?",
+                (now - self.claim_timeout, limit)
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE signups SET status = 'claimed', claimed_at = ? WHERE id = ?",
+                ((now, row[0]) for row in rows)
+            )
+            self.conn.commit()
+        candidates = []
+        for signup_id, email, linkedin, input_row in rows:
+            candidate = {'signup_id': signup_id, 'email': email or '', 'linkedin': linkedin or ''}
+            if input_row:
+                candidate['row_number'] = input_row
+            candidates.append(candidate)
+        return candidates
+
+    def complete(self, signup_id: int):
+        """Mark a claimed signup as scored."""
+        with self._lock:
+            self.conn.execute("UPDATE signups SET status = 'done' WHERE id = ?", (signup_id,))
+            self.conn.commit()
+
+    def release(self, signup_id: int):
+        """Return a claimed signup to the queue."""
+        with self._lock:
+            self.conn.execute("UPDATE signups SET status = 'pending', claimed_at = NULL WHERE id = ?", (signup_id,))
+            self.conn.commit()
+
+    def input_row(self, signup_id: int) -> Optional[int]:
+        """Get the input sheet row a signup was appended to, if synced."""
+        with self._lock:
+            row = self.conn.execute("SELECT input_row FROM signups WHERE id = ?", (signup_id,)).fetchone()
+        return row[0] if row else None
+
+    def sync_input(self, store, target: str, batch_size: int = 50, max_delay: float = 30,
+                   force: bool = False, mark_processed: Optional[Callable[[List[Dict]], None]] = None) -> int:
+        """Append raw rows of unsynced signups to the input sheet in one call.
+
+        Waits until batch_size rows are waiting or the oldest has waited
+        max_delay seconds, unless forced. Backends that cannot append input
+        rows keep them only in the queue. Rows of signups already scored, or
+        never to be scored, are passed to mark_processed so a later pass over
+        the input does not pick them up again.
+
+        Returns:
+            Number of rows synced
+        """
+        with self._lock:
+            oldest = self.conn.execute(
+                "SELECT MIN(received_at), COUNT(*) FROM signups WHERE synced = 0"
+            ).fetchone()
+            if not oldest[1] or not force and oldest[1] < batch_size and time.time() - oldest[0] < max_delay:
+                return 0
+            rows = self.conn.execute(
+                "SELECT id, fields, status FROM signups WHERE synced = 0 ORDER BY id LIMIT ?", (max(batch_size, 1),)
+            ).fetchall()
+
+        if store.accepts_input_rows:
+            row_numbers = store.append_input_rows(target, [json.loads(fields) for _, fields, _ in rows])
+        else:
+            row_numbers = [None] * len(rows)
+        if row_numbers is None:
+            return 0
+
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE signups SET synced = 1, input_row = ? WHERE id = ?",
+                ((row_number, signup_id) for (signup_id, _, _), row_number in zip(rows, row_numbers))
+            )
+            self.conn.commit()
+
+        settled = [{'row_number': row_number} for (_, _, status), row_number in zip(rows, row_numbers)
+                   if row_number and status in SETTLED]
+        if settled and mark_processed is not None:
+            mark_processed(settled)
+        return len(rows)
+
+    def counts(self) -> Dict[str, int]:
+        """Get the number of signups by status."""
+        with self._lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM signups GROUP BY status").fetchall())
+
+    def close(self):
+        self.conn.close()
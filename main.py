@@ -5,10 +5,10 @@ import time
 from typing import Dict, Optional, List
 from enum import Enum
 from dotenv import load_dotenv
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from exa_py import Exa
 from cerebras.cloud.sdk import Cerebras
+from sheet_handler import SheetHandler, coalesce_row_ranges, column_letter
+from domain_index import DomainClass, get_domain_index
 
 load_dotenv()
 
@@ -21,34 +21,37 @@ class CustomerCategory(Enum):
 class LinkedInScraper:
     def __init__(self):
         self.exa = Exa(api_key=os.getenv('EXA_KEY'))
-        self.sheets_service = self._setup_google_sheets()
+        # Shares the handler's client and its cached sheetIds and header widths
+        self.sheet_handler = SheetHandler()
+        self.sheets_service = self.sheet_handler.service
+        self._pending_highlights = set()
+        self.domains = get_domain_index()
         
-    def _setup_google_sheets(self):
-        try:
-            credentials_json = os.getenv('GOOGLE_SHEETS_CREDENTIALS')
-            if not credentials_json:
-                raise ValueError("Missing Google Sheets credentials")
-            
-            credentials_info = json.loads(credentials_json)
-            credentials = service_account.Credentials.from_service_account_info(
-                credentials_info,
-                scopes=['https://www.googleapis.com/auth/spreadsheets']
-            )
-            return build('sheets', 'v4', credentials=credentials)
-        except Exception as e:
-            print(f"Failed to setup Google Sheets: {e}")
-            raise
-
     def _highlight_row(self, spreadsheet_id: str, row_index: int):
+        """Queue row for highlighting; sent by _flush_highlights."""
+        self._pending_highlights.add(row_index)
+        print(f"Row {row_index} queued for manual verification")
+
+    def _flush_highlights(self, spreadsheet_id: str):
+        """Highlight all queued rows with one batchUpdate of coalesced ranges."""
+        if not self._pending_highlights:
+            return
+
+        rows = self._pending_highlights
+        self._pending_highlights = set()
         try:
+            info = self.sheet_handler._get_sheet_info(spreadsheet_id, 'input')
+            if info is None:
+                raise ValueError("Input sheet 'input' not found")
+            width = len(info['header']) or info['column_count'] or 26
             requests = [{
                 'repeatCell': {
                     'range': {
-                        'sheetId': 0,
-                        'startRowIndex': row_index - 1,
-                        'endRowIndex': row_index,
+                        'sheetId': info['sheet_id'],
+                        'startRowIndex': start - 1,
+                        'endRowIndex': end,
                         'startColumnIndex': 0,
-                        'endColumnIndex': 999
+                        'endColumnIndex': width
                     },
                     'cell': {
                         'userEnteredFormat': {
@@ -61,15 +64,15 @@ class LinkedInScraper:
                     },
                     'fields': 'userEnteredFormat.backgroundColor'
                 }
-            }]
+            } for start, end in coalesce_row_ranges(rows)]
             
             self.sheets_service.spreadsheets().batchUpdate(
                 spreadsheetId=spreadsheet_id,
                 body={'requests': requests}
             ).execute()
-            print(f"Row {row_index} highlighted for manual verification")
+            print(f"{len(rows)} rows highlighted for manual verification")
         except Exception as e:
-            print(f"Failed to highlight row {row_index}: {e}")
+            print(f"Failed to highlight rows {sorted(rows)}: {e}")
 
     def _extract_domain_from_email(self, email: str) -> Optional[str]:
         """Extract domain from email address using specified regex."""
@@ -376,9 +379,12 @@ Format as JSON with keys: name, title, company, location, category, priority, pr
                 data.get('email_template', '')  # Added new column for template type
             ]
 
+            # Fail before appending if the tab is missing rather than letting Sheets guess a range
+            if self.sheet_handler._get_sheet_info(spreadsheet_id, 'output') is None:
+                raise ValueError("Output sheet 'output' not found")
             result = self.sheets_service.spreadsheets().values().append(
                 spreadsheetId=spreadsheet_id,
-                range='output!A:L',  # Updated to include new column
+                range=f"'output'!A:{column_letter(len(row))}",
                 valueInputOption='RAW',
                 insertDataOption='INSERT_ROWS',
                 body={'values': [row]}
@@ -449,7 +455,13 @@ Format as JSON with keys: name, title, company, location, category, priority, pr
 
                 # Research domain and determine category
                 domain = self._extract_domain_from_email(email) if email else None
-                domain_info = self._get_domain_info(domain) if domain else None
+                domain_class = self.domains.classify(domain)
+                if domain_class == DomainClass.ACADEMIC:
+                    domain_info = f"{domain} is an academic institution domain; the applicant may be a student or researcher"
+                elif domain_class == DomainClass.FREE_MAIL:
+                    domain_info = None
+                else:
+                    domain_info = self._get_domain_info(domain) if domain else None
                 
                 category_analysis = self._determine_category(
                     domain or '',
@@ -489,6 +501,8 @@ Format as JSON with keys: name, title, company, location, category, priority, pr
 
         except Exception as e:
             print(f"Error processing sheet: {e}")
+        finally:
+            self._flush_highlights(spreadsheet_id)
 
 def main():
     try:
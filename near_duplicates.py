@@ -0,0 +1,126 @@
+import re
+import json
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+HASH_SHIFT = np.uint64(32)
+SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+class MinHashLSHIndex:
+    """Offline MinHash signatures with banded LSH for near-duplicate lookups.
+
+    Texts are reduced to word shingles, hashed with CRC32 and compressed to
+    num_perm-wide MinHash signatures. Signatures are split into bands; texts
+    sharing any band bucket become candidates, and candidates are ranked by
+    the fraction of matching signature slots (an estimate of Jaccard
+    similarity). Only the candidate rows are compared, so lookups stay fast
+    as the index grows.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+        self._b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self.records: List[Dict] = []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _shingles(self, text: str) -> np.ndarray:
+        """Hash word shingles of normalized text."""
+        words = re.findall(r"[a-z0-9]+", text.lower())
+        if len(words) < self.shingle_size:
+            return np.empty(0, dtype=np.uint64)
+
+        # Hash each word once, then combine neighbours into shingle hashes in NumPy
+        word_hashes = np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.uint64, count=len(words))
+        count = len(words) - self.shingle_size + 1
+        shingles = word_hashes[:count].copy()
+        for offset in range(1, self.shingle_size):
+            shingles = shingles * SHINGLE_MULTIPLIER + word_hashes[offset:offset + count]
+        return np.unique(shingles)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Compute the MinHash signature of a text, or None if it is too short."""
+        hashes = self._shingles(text)
+        if not hashes.size:
+            return None
+        # Multiply-shift hashing: uint64 arithmetic wraps, the high 32 bits are kept
+        permuted = (np.outer(hashes, self._a) + self._b) >> HASH_SHIFT
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def add(self, text: str, record: Dict) -> bool:
+        """Index a text with the record to return for its near-duplicates."""
+        signature = self.signature(text)
+        if signature is None:
+            return False
+        self._append(signature, record)
+        return True
+
+    def _append(self, signature: np.ndarray, record: Dict):
+        idx = len(self.records)
+        if idx >= len(self._signatures):
+            grown = np.empty((len(self._signatures) * 2, self.num_perm), dtype=np.uint32)
+            grown[:idx] = self._signatures[:idx]
+            self._signatures = grown
+        self._signatures[idx] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(idx)
+        self.records.append(record)
+
+    def query(self, text: str, threshold: float) -> Optional[Tuple[float, Dict]]:
+        """Get the most similar indexed record at or above threshold."""
+        signature = self.signature(text)
+        if signature is None or not self.records:
+            return None
+
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        if not candidates:
+            return None
+
+        ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._signatures[ids] == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < threshold:
+            return None
+        return float(similarity[best]), self.records[ids[best]]
+
+    def save(self, path: str):
+        """Persist signatures and records to an .npz file."""
+        np.savez_compressed(
+            path,
+            signatures=self._signatures[:len(self.records)],
+            records=np.array(json.dumps(self.records)),
+            params=np.array([self.num_perm, self.bands, self.shingle_size, self.seed])
+        )
+
+    @classmethod
+    def load(cls, path: str, keep: Optional[Callable[[Dict], bool]] = None) -> 'MinHashLSHIndex':
+        """Load an index saved with save(), keeping only records keep() accepts."""
+        data = np.load(path)
+        num_perm, bands, shingle_size, seed = (int(v) for v in data['params'])
+        index = cls(num_perm, bands, shingle_size, seed)
+        for signature, record in zip(data['signatures'], json.loads(str(data['records']))):
+            if keep is None or keep(record):
+                index._append(signature, record)
+        return index
@@ -0,0 +1,154 @@
+import re
+import ast
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_PRIORITIES = ("accept", "reject")
+
+# Common model spellings of each priority
+PRIORITY_SYNONYMS = {
+    "accepted": "accept",
+    "approve": "accept",
+    "approved": "accept",
+    "yes": "accept",
+    "rejected": "reject",
+    "decline": "reject",
+    "declined": "reject",
+    "no": "reject",
+    "maybe": "review",
+    "waitlist": "review",
+    "needs review": "review"
+}
+
+TEMPLATE_KEY_PATTERN = re.compile(r'"(\w+)"\s*:')
+PRIORITY_TEMPLATE_PATTERN = re.compile(r'"priority"\s*:\s*"([^"]+)"')
+
+def extract_json_object(text: str) -> Optional[str]:
+    """Get the first balanced {...} span, ignoring code fences and surrounding prose."""
+    start = text.find('{')
+    if start < 0:
+        return None
+    depth = 0
+    in_string = None
+    escaped = False
+    for idx in range(start, len(text)):
+        char = text[idx]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == in_string:
+                in_string = None
+        elif char in '"\'':
+            in_string = char
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:idx + 1]
+    # Truncated output; close the object and let the parser decide
+    return text[start:] + '}' * depth
+
+def parse_lenient(text: Optional[str]) -> Optional[Dict]:
+    """Parse JSON, tolerating fences, prose, trailing commas and Python-style literals."""
+    if not text:
+        return None
+    try:
+        parsed = json.loads(text)
+        return parsed if isinstance(parsed, dict) else None
+    except (TypeError, ValueError):
+        pass
+
+    candidate = extract_json_object(text)
+    if not candidate:
+        return None
+    fixed = re.sub(r',\s*([}\]])', r'\1', candidate)
+    for attempt in (fixed, re.sub(r'([{,]\s*)([A-Za-z_]\w*)\s*:', r'\1"\2":', fixed)):
+        try:
+            parsed = json.loads(attempt)
+            return parsed if isinstance(parsed, dict) else None
+        except ValueError:
+            pass
+    try:
+        parsed = ast.literal_eval(fixed)
+        return parsed if isinstance(parsed, dict) else None
+    except (ValueError, SyntaxError):
+        return None
+
+class OutputSchema:
+    """Expected analysis keys and allowed priorities for one prompt."""
+
+    def __init__(self, fields: Iterable[str], priorities: Iterable[str] = DEFAULT_PRIORITIES):
+        self.fields = list(fields)
+        self.priorities = [p.lower() for p in priorities]
+
+    @classmethod
+    def from_prompt(cls, prompt_config: Dict, priorities: Optional[Iterable[str]] = None) -> 'OutputSchema':
+        """Build a schema from a prompt's output_format and the JSON template in its text."""
+        text = prompt_config.get("text", "")
+        fields = [name for name, enabled in prompt_config.get("output_format", {}).items() if enabled]
+        for name in TEMPLATE_KEY_PATTERN.findall(text):
+            if name not in fields:
+                fields.append(name)
+
+        if not priorities:
+            match = PRIORITY_TEMPLATE_PATTERN.search(text)
+            priorities = [p.strip() for p in re.split(r'[/|,]', match.group(1))] if match else DEFAULT_PRIORITIES
+        return cls(fields, [p for p in priorities if p])
+
+    def normalize_priority(self, value: Any) -> Optional[str]:
+        """Map a priority to one of the allowed values, or None."""
+        if not isinstance(value, str):
+            return None
+        cleaned = ' '.join(value.strip().strip('*.').lower().split())
+        cleaned = PRIORITY_SYNONYMS.get(cleaned, cleaned)
+        return cleaned if cleaned in self.priorities else None
+
+    def validate(self, data: Optional[Dict]) -> Tuple[Dict, List[str]]:
+        """Coerce an analysis to the schema.
+
+        Missing descriptive fields are left blank rather than filled with the
+        reject-leaning defaults; only an unusable priority counts as an error,
+        since that is what the decision needs.
+
+        Returns:
+            Tuple of cleaned analysis and a list of problems
+        """
+        if data is None:
+            return {}, ["response is not a JSON object"]
+
+        cleaned = {}
+        for name in self.fields:
+            value = data.get(name)
+            if isinstance(value, list):
+                value = '\n'.join(f"* {item}" if name.endswith("reasoning") else str(item) for item in value)
+            elif value is not None and not isinstance(value, str):
+                value = str(value)
+            cleaned[name] = value if value is not None else ""
+
+        errors = []
+        if "priority" in self.fields:
+            priority = self.normalize_priority(data.get("priority"))
+            if priority is None:
+                errors.append(f"priority {data.get('priority')!r} is not one of {', '.join(self.priorities)}")
+            else:
+                cleaned["priority"] = priority
+        return cleaned, errors
+
+    def check(self, text: Optional[str]) -> Tuple[Dict, List[str]]:
+        """Parse and validate a raw model response."""
+        return self.validate(parse_lenient(text))
+
+    def repair_messages(self, text: Optional[str], errors: List[str], max_chars: int = 2000) -> List[Dict]:
+        """Build a short re-ask holding only the broken output."""
+        return [
+            {"role": "system", "content": "You fix malformed JSON. Return only the corrected JSON object."},
+            {"role": "user", "content": (
+                f"Rewrite this output as a JSON object with keys: {', '.join(self.fields)}.\n"
+                f"\"priority\" must be exactly one of: {', '.join(self.priorities)}.\n"
+                f"Problems: {'; '.join(errors)}\n\n"
+                f"Output:\n{(text or '')[:max_chars]}"
+            )}
+        ]
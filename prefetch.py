@@ -0,0 +1,136 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from control_panel import ControlPanel
+from concurrency import get_concurrency
+from deadline import Deadline
+
+def scrape_size(scrape_result: Dict) -> int:
+    """Rough in-memory size of a scrape result, in characters of its text."""
+    return len(str(scrape_result.get('linkedin_data') or '')) + len(scrape_result.get('company_research') or '')
+
+class ScrapePrefetcher:
+    """Scrapes the next candidates in the background while earlier ones are scored.
+
+    stage() hands candidates through unchanged, keeping a window of the next
+    window candidates whose LinkedIn and company scrapes already run on a
+    small pool, each with its own scrape deadline. take() gives a candidate's
+    staged result to the scoring step. Finished results wait in memory until
+    taken or discarded; once they hold max_chars of text no new prefetches
+    start, and the candidates passed meanwhile are scraped inline as before.
+
+    With concurrency enabled, max_candidates are scored at once, so the
+    window is at least that wide. Candidates for which skip returns True,
+    such as applicants already decided, are passed through unscraped.
+    """
+
+    def __init__(self, scraper, control_panel: Optional[ControlPanel] = None,
+                 skip: Optional[Callable[[Dict], bool]] = None):
+        self.scraper = scraper
+        self.control_panel = control_panel or ControlPanel()
+        self.skip = skip
+        controls = self.control_panel.config.get("prefetch_controls", {})
+        concurrency = get_concurrency(self.control_panel)
+        in_flight = concurrency.max_candidates if concurrency.enabled else 1
+        self.window = max(controls.get("window", 8), in_flight)
+        self.max_chars = controls.get("max_buffer_chars", 2000000)
+        self._pool = ThreadPoolExecutor(max_workers=max(controls.get("workers", 4), 1),
+                                        thread_name_prefix="prefetch")
+        self._staged: Dict[int, Future] = {}
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self.stats = {"prefetched": 0, "ready": 0, "waited": 0, "not_started": 0,
+                      "skipped_known": 0, "skipped_for_memory": 0}
+
+    def _scrape(self, candidate: Dict) -> Dict:
+        result = self.scraper.scrape(
+            linkedin_url=candidate.get('linkedin', '').strip(),
+            email=candidate.get('email', '').strip(),
+            deadline=Deadline.from_config(self.control_panel)
+        )
+        with self._lock:
+            self._buffered += scrape_size(result)
+        return result
+
+    def _start(self, candidate: Dict):
+        if not candidate.get('linkedin') and not candidate.get('email'):
+            return
+        if self.skip is not None and self.skip(candidate):
+            with self._lock:
+                self.stats["skipped_known"] += 1
+            return
+        with self._lock:
+            if self._buffered >= self.max_chars:
+                self.stats["skipped_for_memory"] += 1
+                return
+            self._staged[id(candidate)] = self._pool.submit(self._scrape, candidate)
+            self.stats["prefetched"] += 1
+
+    def stage(self, candidates: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield candidates in order, keeping scrapes started for the next window of them."""
+        ahead = deque()
+        try:
+            for candidate in candidates:
+                self._start(candidate)
+                ahead.append(candidate)
+                if len(ahead) > self.window:
+                    yield ahead.popleft()
+            while ahead:
+                yield ahead.popleft()
+        finally:
+            # Candidates that will not be handed out keep no prefetch
+            for candidate in ahead:
+                self.discard(candidate)
+
+    def take(self, candidate: Dict, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Get a candidate's prefetched scrape, waiting up to timeout if it is still running.
+
+        Returns:
+            The scrape result, a partial one if it did not finish in time, or
+            None if the candidate was not prefetched or its scrape had not started
+        """
+        with self._lock:
+            future = self._staged.pop(id(candidate), None)
+        if future is None:
+            return None
+        # Still queued behind other prefetches: the caller's own thread gets there sooner
+        if future.cancel():
+            with self._lock:
+                self.stats["not_started"] += 1
+            return None
+        with self._lock:
+            self.stats["ready" if future.done() else "waited"] += 1
+        try:
+            result = future.result(timeout=timeout)
+        except TimeoutError:
+            future.add_done_callback(self._release)
+            return {"errors": ["Prefetched scrape timed out"], "partial": True}
+        with self._lock:
+            self._buffered -= scrape_size(result)
+        return result
+
+    def _release(self, future: Future):
+        if not future.cancelled() and future.exception() is None:
+            with self._lock:
+                self._buffered -= scrape_size(future.result())
+
+    def discard(self, candidate: Dict):
+        """Drop a candidate's staged scrape if it was never taken."""
+        with self._lock:
+            future = self._staged.pop(id(candidate), None)
+        if future is not None and not future.cancel():
+            future.add_done_callback(self._release)
+
+    def clear(self):
+        """Drop every staged scrape, cancelling those not yet started."""
+        with self._lock:
+            futures = list(self._staged.values())
+            self._staged.clear()
+        for future in futures:
+            if not future.cancel():
+                future.add_done_callback(self._release)
+
+    def close(self):
+        self.clear()
+        self._pool.shutdown(wait=False)
@@ -143,32 +143,112 @@
 
 import os
 import time
-from typing import Dict, Optional
-from dotenv import load_dotenv
-from scraper import DataScraper
-from sheet_handler import SheetHandler
-from inference import Inference
+import threading
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Set
 from control_panel import ControlPanel
 
-load_dotenv()
-
 class CandidateProcessor:
-    def __init__(self):
-        """Initialize processor with all components."""
+    def __init__(self, storage: str = "sheets", input_path: Optional[str] = None,
+                 output_path: Optional[str] = None):
+        """Initialize processor with all components.
+
+        Args:
+            storage: Candidate backend - sheets, csv, sqlite or parquet
+            input_path: Input file for local backends
+            output_path: Output file, database or directory for local backends
+        """
+        # Pipeline modules pull in the API SDKs; config-only commands never load them
+        from dotenv import load_dotenv
+        from scraper import DataScraper
+        from inference import Inference
+        from storage import open_store
+        from scrape_cache import ScrapeCache
+        from config_snapshot import ConfigWatcher
+
+        load_dotenv()
         self.control_panel = ControlPanel()
-        self.scraper = DataScraper()
-        self.sheets = SheetHandler(self.control_panel)
+        self.control_panel.snapshot()  # Validate the config before any work starts
+
+        # Pick up control_panel.json edits between candidates without a restart
+        reload_controls = self.control_panel.config.get("config_reload", {})
+        self.config_watcher = None
+        if reload_controls.get("enabled", False):
+            self.config_watcher = ConfigWatcher(self.control_panel, reload_controls.get("interval_seconds", 2.0))
+
+        self.scraper = DataScraper(self.control_panel)
+        self.storage = storage
+        self.sheets = open_store(storage, input_path, output_path, self.control_panel)
         self.inference = Inference(self.control_panel)
         self.sheet_id = os.getenv('SHEET_ID')
+
+        # Local copy of scrape results so prompt changes can be re-scored without Exa
+        cache_controls = self.control_panel.config["scraping_controls"].get("scrape_cache", {})
+        self.scrape_cache = None
+        if cache_controls.get("enabled", False):
+            self.scrape_cache = ScrapeCache(cache_controls.get("path", "scrape_cache.db"))
+
+        # Decisions by identity key, so later rows of the same applicant reuse them
+        self._decisions: Dict[str, Dict] = {}
+        self.duplicates_collapsed = 0
+        self.partial_results = 0
+        self.ingest_queue = None
+
+        # Candidates run in parallel under per-upstream adaptive limits; the store is not thread-safe
+        from concurrency import get_concurrency
+        self.concurrency = get_concurrency(self.control_panel)
+        self._store_lock = threading.RLock()
+
+        # Run and daily caps on Exa, token and Sheets spend; scoring stops when they run out
+        from budget import get_budget
+        self.budget = get_budget(self.control_panel)
+
+        # Backlog order by a cheap pre-scrape score instead of sheet row order
+        self.scheduler = None
+        if self.control_panel.config.get("scheduling_controls", {}).get("enabled", False):
+            from scheduler import PriorityScheduler
+            self.scheduler = PriorityScheduler(self.control_panel)
+
+        # Scrapes for the next few candidates run while the current ones are scored
+        self.prefetcher = None
+        if self.control_panel.config.get("prefetch_controls", {}).get("enabled", False):
+            from prefetch import ScrapePrefetcher
+            self.prefetcher = ScrapePrefetcher(self.scraper, self.control_panel, skip=self._needs_no_scrape)
+
+        # Durable lifecycle record; replaces re-reading the output to find finished applicants
+        state_controls = self.control_panel.config.get("state_controls", {})
+        self.state = None
+        if state_controls.get("enabled", False):
+            from state_store import CandidateState
+            self.state = CandidateState(state_controls.get("path", "candidate_state.db"))
+            self._seed_state()
+            self.sheets.attach_state(self.state)
+
+        # Failed and empty-data candidates wait here for a retry pass instead of being dropped
+        dead_letter_controls = self.control_panel.config.get("dead_letter_controls", {})
+        self.dead_letters = None
+        if dead_letter_controls.get("enabled", False):
+            from dead_letter import DeadLetterQueue
+            self.dead_letters = DeadLetterQueue(
+                dead_letter_controls.get("path", "dead_letter.db"),
+                base_delay=dead_letter_controls.get("base_delay_seconds", 300),
+                max_delay=dead_letter_controls.get("max_delay_seconds", 86400),
+                max_attempts=dead_letter_controls.get("max_attempts")
+            )
         
-        if not self.sheet_id:
+        if storage == "sheets" and not self.sheet_id:
             raise ValueError("SHEET_ID environment variable is required")
             
         print("\nProcessor initialized with configuration:")
         print(f"Active prompt: {self.control_panel.config['inference_controls']['active_prompt']}")
-        print(f"Sheet highlighting: {'enabled' if self.control_panel.should_highlight_rows() else 'disabled'}")
-        input_sheet, output_sheet = self.control_panel.get_sheet_names()
-        print(f"Using sheets: {input_sheet} → {output_sheet}")
+        print(f"Sheet highlighting: {'enabled' if self.control_panel.should_highlight_rows() else 'disabled'}"
+              f"{' (conditional formatting)' if self.control_panel.use_conditional_formatting() else ''}")
+        if storage == "sheets":
+            input_sheet, output_sheet = self.control_panel.get_sheet_names()
+            print(f"Using sheets: {input_sheet} → {output_sheet}")
+        else:
+            print(f"Using {storage} storage: {input_path} → {output_path}")
 
     def process_candidate(self, candidate_data: Dict) -> bool:
         """Process a single candidate.
@@ -187,94 +267,595 @@ class CandidateProcessor:
             print(f"\nProcessing row {row_number}")
             print(f"LinkedIn: {linkedin or 'None'}")
             print(f"Email: {email or 'None'}")
+
+            previous = self.find_decision(candidate_data)
+            if previous:
+                print("Applicant already scored this run - marking rows processed")
+                with self._store_lock:
+                    self._mark_rows_processed([candidate_data] + candidate_data.get('duplicates', []))
+                return True
             
             if not linkedin and not email:
                 print("No LinkedIn or email - marking row as processed")
-                if row_number and self.control_panel.should_highlight_rows():
-                    self.sheets.mark_row_processed(self.sheet_id, row_number)
+                if row_number and self.control_panel.snapshot().highlight_rows:
+                    with self._store_lock:
+                        self.sheets.mark_row_processed(self.sheet_id, row_number)
                 return False
 
-            # Step 1: Scrape data if enabled
-            profile_data = ""
-            company_data = ""
-            if self.control_panel.config["scraping_controls"]["scan_for_linkedin"]:
+            if self.state is not None:
+                if self.state.is_done(candidate_data):
+                    # A new row for an applicant whose decision an earlier run saved
+                    print("Applicant already saved - marking rows processed")
+                    with self._store_lock:
+                        self._mark_rows_processed([candidate_data] + candidate_data.get('duplicates', []))
+                    self.state.resolve(candidate_data)
+                    return True
+                candidate_data['state_id'] = self.state.start(candidate_data)
+
+            # Steps 1 and 2: Scrape and analyze
+            analysis = self.score_candidate(candidate_data)
+
+            # Step 3: Save results
+            print(f"\nAnalysis complete - Priority: {analysis.get('priority', 'unknown')}")
+            self._save_result(candidate_data, analysis)
+
+            return True
+
+        except Exception as e:
+            print(f"Error processing candidate: {e}")
+            if self.state is not None:
+                self.state.record_failure(candidate_data.get('state_id'), str(e))
+            if self.dead_letters is not None:
+                entry = self.dead_letters.add(candidate_data, e)
+                retry = (f"retry {time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['next_retry_at']))}"
+                         if entry['next_retry_at'] else "no retry")
+                print(f"Dead-lettered as {entry['failure_class']} (attempt {entry['attempts']}, {retry})")
+            if self.control_panel.snapshot().highlight_rows:
+                with self._store_lock:
+                    for row in [candidate_data] + candidate_data.get('duplicates', []):
+                        if row.get('row_number'):
+                            self.sheets.mark_row_processed(self.sheet_id, row['row_number'])
+            return False
+        finally:
+            # A prefetch the candidate never took, e.g. it was already decided, is let go
+            if self.prefetcher is not None:
+                self.prefetcher.discard(candidate_data)
+
+    def score_candidate(self, candidate_data: Dict) -> Dict:
+        """Scrape and analyze one candidate within its time budget, without saving."""
+        from deadline import Deadline
+        email = candidate_data.get('email', '').strip()
+        linkedin = candidate_data.get('linkedin', '').strip()
+
+        # Step 1: Scrape data if enabled, within the candidate's time budget
+        deadline = Deadline.from_config(self.control_panel)
+        profile_data = ""
+        company_data = ""
+        partial = False
+        if self.control_panel.snapshot().scan_for_linkedin:
+            scrape_result = None
+            if self.prefetcher is not None:
+                scrape_result = self.prefetcher.take(candidate_data, timeout=deadline.budget("linkedin", "research"))
+            if scrape_result is None:
                 print("\nScraping data...")
                 scrape_result = self.scraper.scrape(
                     linkedin_url=linkedin,
-                    email=email
+                    email=email,
+                    deadline=deadline
                 )
-                profile_data = scrape_result.get('linkedin_data', '')
-                company_data = scrape_result.get('company_research', '')
-            
-            # Step 2: Run analysis
-            print("\nAnalyzing candidate...")
-            analysis = self.inference.analyze_candidate(
-                profile_data=profile_data,
-                company_data=company_data,
-                email=email,
-                linkedin_url=linkedin
+            else:
+                print("\nUsing prefetched scrape")
+            profile_data = scrape_result.get('linkedin_data', '')
+            company_data = scrape_result.get('company_research', '')
+            partial = scrape_result.get('partial', False)
+            if self.scrape_cache is not None and (profile_data or company_data) and not partial:
+                self.scrape_cache.put(candidate_data, scrape_result, candidate_data.get('duplicates'))
+            if self.state is not None:
+                self.state.record_scrape(candidate_data.get('state_id'), scrape_result)
+            if self.dead_letters is not None and not profile_data and not company_data:
+                # Scoring nothing would only write a default reject
+                self._raise_empty_scrape(scrape_result, linkedin)
+
+        # Step 2: Run analysis
+        print("\nAnalyzing candidate...")
+        analysis = self.inference.analyze_candidate(
+            profile_data=profile_data,
+            company_data=company_data,
+            email=email,
+            linkedin_url=linkedin,
+            deadline=deadline,
+            raise_errors=self.dead_letters is not None
+        )
+        if partial or analysis.get('partial'):
+            # Scored on whatever arrived before the deadline, or not scored in time; flag it for review
+            with self._store_lock:
+                self.partial_results += 1
+            analysis['partial'] = True
+            analysis['priority_reasoning'] = (
+                f"* Partial data: {'scraping' if partial else 'scoring'} timed out\n"
+                + analysis.get('priority_reasoning', '')
             )
+        if self.state is not None:
+            config = self.control_panel.snapshot()
+            self.state.record_decision(candidate_data.get('state_id'), analysis, config.prompt.version, config.model)
+        return analysis
 
-            # Step 3: Save results
-            print(f"\nAnalysis complete - Priority: {analysis.get('priority', 'unknown')}")
+    def _raise_empty_scrape(self, scrape_result: Dict, linkedin: str):
+        """Raise EmptyScrape classed by why nothing came back."""
+        from dead_letter import EmptyScrape
+        errors = '; '.join(scrape_result.get('errors', []))
+        if scrape_result.get('partial'):
+            raise EmptyScrape("timeout", errors or "scraping timed out")
+        if any("failed" in error for error in scrape_result.get('errors', [])):
+            raise EmptyScrape("upstream", errors)
+        if not linkedin and scrape_result.get('domain_class') in ("free_mail", "academic"):
+            raise EmptyScrape("no_data", "no LinkedIn and no company email to research")
+        raise EmptyScrape("empty_scrape", errors or "scraping returned no data")
+
+    def find_decision(self, candidate_data: Dict) -> Optional[Dict]:
+        """Get a decision already made this run for the same applicant."""
+        from identity import identity_keys
+        for row in [candidate_data] + candidate_data.get('duplicates', []):
+            for key in identity_keys(row):
+                if key in self._decisions:
+                    return self._decisions[key]
+        return None
+
+    def _needs_no_scrape(self, candidate_data: Dict) -> bool:
+        """Check whether a candidate is already decided or has a cached scrape, so prefetching it is wasted."""
+        if self.find_decision(candidate_data):
+            return True
+        if self.state is not None and self.state.is_done(candidate_data):
+            return True
+        return self.scrape_cache is not None and self.scrape_cache.get(candidate_data) is not None
+
+    def remember_decision(self, candidate_data: Dict, analysis: Dict):
+        """Record a decision under every identity key of the candidate's rows."""
+        from identity import identity_keys
+        for row in [candidate_data] + candidate_data.get('duplicates', []):
+            for key in identity_keys(row):
+                self._decisions[key] = analysis
+
+    def _save_result(self, candidate_data: Dict, analysis: Dict):
+        """Save one output row for the applicant and mark its duplicate rows processed."""
+        rows = [candidate_data] + candidate_data.get('duplicates', [])
+        result = dict(analysis)
+        result['email'] = next((row['email'] for row in rows if row.get('email')), analysis.get('email', ''))
+        result['linkedin'] = next((row['linkedin'] for row in rows if row.get('linkedin')), analysis.get('linkedin', ''))
+        with self._store_lock:
             self.sheets.save_analysis(
                 self.sheet_id,
-                analysis,
-                input_row_number=row_number
+                result,
+                input_row_number=candidate_data.get('row_number')
             )
+            if len(rows) > 1:
+                print(f"Marking {len(rows) - 1} duplicate rows processed")
+                self.duplicates_collapsed += len(rows) - 1
+                self._mark_rows_processed(rows[1:])
+        self.remember_decision(candidate_data, analysis)
+        if self.state is not None:
+            self.state.record_saved(candidate_data.get('state_id'), published=self.storage == "sheets")
 
-            return True
+    def _mark_rows_processed(self, rows: List[Dict]):
+        """Mark input rows processed without writing output; Sheets only when highlighting."""
+        if self.storage == "sheets" and not self.control_panel.snapshot().highlight_rows:
+            return
+        for row in rows:
+            if row.get('row_number'):
+                self.sheets.mark_row_processed(self.sheet_id, row['row_number'])
 
-        except Exception as e:
-            print(f"Error processing candidate: {e}")
-            if row_number and self.control_panel.should_highlight_rows():
-                self.sheets.mark_row_processed(self.sheet_id, row_number)
-            return False
+    def _seed_state(self):
+        """Import finished applicants from the existing output the first time the state store is used."""
+        if len(self.state):
+            return
+        fields = self.control_panel.get_required_fields()
+        if self.sheets.updates_in_place:
+            rows = (row for _, row in self.sheets.iter_output_rows(self.sheet_id))
+            imported = self.state.import_results((dict(zip(fields, row)) for row in rows),
+                                                 published=self.storage == "sheets")
+        else:
+            imported = self.state.import_results((dict(zip(fields, row)) for row in self.sheets.iter_results()),
+                                                 published=False)
+        if imported:
+            print(f"Imported {imported} finished applicants into the state store")
 
-    def process_all(self, batch_size: Optional[int] = None, delay: float = 2.0):
+    def process_all(self, batch_size: Optional[int] = None, delay: Optional[float] = None):
         """Process all new candidates.
+
+        With concurrency_controls enabled, up to max_candidates run at once and
+        each upstream call waits for a slot on that upstream's adaptive limit,
+        so throughput follows whatever Exa and Cerebras can take at the moment.
         
         Args:
             batch_size: Optional number of candidates to process before stopping
-            delay: Delay between processing candidates in seconds
+            delay: Delay between starting candidates in seconds; none by default
+                with adaptive concurrency, 2 seconds otherwise
         """
+        delay = self._default_delay(delay)
+        workers = self.concurrency.max_candidates if self.concurrency.enabled else 1
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="candidate") if workers > 1 else None
+        pending: Set[Future] = set()
         try:
             total_processed = 0
             total_success = 0
+            attempted = set()
+            budget_spent = False
             
             while True:
-                candidates = self.sheets.get_candidates(self.sheet_id)
-                if not candidates:
-                    break
-                    
-                if batch_size:
-                    candidates = candidates[:batch_size]
-                
-                print(f"\nProcessing batch of {len(candidates)} candidates")
+                # Candidates stream in as input chunks are read
+                remaining = batch_size - total_processed if batch_size else None
+                candidates = self._locked_iter(self.sheets.iter_grouped_candidates(self.sheet_id))
+                if self.scheduler is not None:
+                    candidates = self.scheduler.order(candidates)
+                candidates = islice(self._unattempted(candidates, attempted), remaining)
+                if self.prefetcher is not None:
+                    candidates = self.prefetcher.stage(candidates)
+                batch_processed = 0
                 
-                for idx, candidate in enumerate(candidates, 1):
-                    print(f"\nCandidate {idx}/{len(candidates)}")
-                    success = self.process_candidate(candidate)
-                    
-                    total_processed += 1
-                    if success:
-                        total_success += 1
-                    
-                    if delay and idx < len(candidates):
+                for candidate in candidates:
+                    if not self.budget.allows("scoring"):
+                        budget_spent = True
+                        break
+
+                    if delay and batch_processed:
                         time.sleep(delay)
+                    if self.config_watcher:
+                        self.config_watcher.poll()
+
+                    batch_processed += 1
+                    total_processed += 1
+                    priority = f" (priority {candidate['priority_score']})" if 'priority_score' in candidate else ""
+                    print(f"\nCandidate {total_processed}{priority}")
+                    if pool is None:
+                        total_success += self.process_candidate(candidate)
+                        continue
+                    pending.add(pool.submit(self.process_candidate, candidate))
+                    if len(pending) >= workers:
+                        total_success += self._collect(pending, FIRST_COMPLETED)
+
+                # Every candidate of a pass finishes before its rows are read again
+                total_success += self._collect(pending, ALL_COMPLETED)
+                if budget_spent or not batch_processed:
+                    break
+
+                # Highlights and local writes are buffered and sent once per pass
+                self.sheets.flush(self.sheet_id)
                         
                 if batch_size and total_processed >= batch_size:
                     print(f"\nReached batch size limit of {batch_size}")
                     break
 
-            print(f"\nProcessing complete!")
-            print(f"Total processed: {total_processed}")
-            print(f"Successfully processed: {total_success}")
+            self._print_summary(total_processed, total_success)
 
         except KeyboardInterrupt:
             print("\nProcess interrupted by user")
         except Exception as e:
             print(f"Error in processing loop: {e}")
+        finally:
+            if pool is not None:
+                # Candidates already started are finished and saved; queued ones are dropped
+                pool.shutdown(wait=True, cancel_futures=True)
+            if self.prefetcher is not None:
+                self.prefetcher.clear()
+            self.sheets.flush(self.sheet_id)
+            self.inference.save_state()
+            if self.scrape_cache is not None:
+                self.scrape_cache.flush()
+
+    def _default_delay(self, delay: Optional[float]) -> float:
+        """Pause between candidates: none when adaptive limits pace the upstreams."""
+        if delay is not None:
+            return delay
+        return 0 if self.concurrency.enabled else 2.0
+
+    def _unattempted(self, candidates: Iterator[Dict], attempted: Set[int]) -> Iterator[Dict]:
+        """Drop candidates already tried this run or waiting in the dead-letter queue."""
+        for candidate in candidates:
+            # Rows that failed without being marked come back on the next pass
+            if candidate.get('row_number') in attempted:
+                continue
+            attempted.update(row.get('row_number') for row in [candidate] + candidate['duplicates'])
+            if self.dead_letters is not None and self.dead_letters.contains(candidate):
+                # Left for the retry pass
+                continue
+            yield candidate
+
+    def _locked_iter(self, rows: Iterator[Dict]) -> Iterator[Dict]:
+        """Read a storage iterator under the store lock, between workers' writes."""
+        while True:
+            with self._store_lock:
+                row = next(rows, None)
+            if row is None:
+                return
+            yield row
+
+    def _collect(self, pending: Set[Future], return_when: str) -> int:
+        """Wait for running candidates and count the successful ones."""
+        if not pending:
+            return 0
+        done, _ = wait(pending, return_when=return_when)
+        pending.difference_update(done)
+        return sum(1 for future in done if future.result())
+
+    def _print_summary(self, total_processed: int, total_success: int):
+        print("\nProcessing complete!")
+        print(f"Total processed: {total_processed}")
+        print(f"Successfully processed: {total_success}")
+        print(f"Duplicate rows collapsed: {self.duplicates_collapsed}")
+        if self.partial_results:
+            print(f"Partial results (deadline hit): {self.partial_results}")
+        print(f"Near-duplicate decisions reused: {self.inference.decisions_reused}")
+        scrape_stats = self.scraper.stats
+        if scrape_stats["speculative_hits"] or scrape_stats["speculative_misses"]:
+            print(f"Speculative research hit rate: {self.scraper.speculation_hit_rate():.0%} "
+                  f"({scrape_stats['speculative_hits']} kept, {scrape_stats['speculative_misses']} discarded)")
+        stats = self.inference.stats
+        if stats["responses_invalid"]:
+            print(f"Invalid model responses: {self.inference.invalid_response_rate():.1%} "
+                  f"({stats['responses_repaired']} repaired)")
+        if stats["profile_tokens_raw"] or stats["company_tokens_raw"]:
+            print(f"Profile tokens: {stats['profile_tokens_raw']} → {stats['profile_tokens_compacted']}")
+            print(f"Company tokens: {stats['company_tokens_raw']} → {stats['company_tokens_compacted']}")
+        if self.scheduler is not None and self.scheduler.stats["reordered"]:
+            print(f"Candidates moved ahead of sheet order: {self.scheduler.stats['reordered']}")
+        if self.prefetcher is not None and self.prefetcher.stats["prefetched"]:
+            prefetch_stats = self.prefetcher.stats
+            print(f"Prefetched scrapes: {prefetch_stats['prefetched']} "
+                  f"({prefetch_stats['ready']} ready when scored, {prefetch_stats['waited']} waited on, "
+                  f"{prefetch_stats['not_started']} scraped inline instead, "
+                  f"{prefetch_stats['skipped_known']} skipped as already known)")
+        if scrape_stats["research_shed"]:
+            print(f"Company research skipped for budget: {scrape_stats['research_shed']}")
+        self._print_budget(self.budget)
+        for upstream, limits in self.concurrency.stats().items():
+            print(f"{upstream} concurrency: limit {limits['limit']}, latency {limits['latency_ms']}ms "
+                  f"(baseline {limits['baseline_ms']}ms), {limits['drops']} errors, {limits['waits']} waits")
+
+    @staticmethod
+    def _print_budget(budget):
+        for resource, usage in budget.stats().items():
+            run_cap = f"/{usage['run_cap']:g}" if usage['run_cap'] else ""
+            day_cap = f"/{usage['day_cap']:g}" if usage['day_cap'] else ""
+            run = f"{usage['run']:g}{run_cap} this run, " if usage['run'] else ""
+            print(f"Budget {resource}: {run}{usage['day']:g}{day_cap} today")
+
+    def open_ingest_queue(self):
+        """Open the signup queue fed by the ingestion webhook."""
+        if self.ingest_queue is None:
+            self.ingest_queue = open_ingest_queue(self.control_panel)
+        return self.ingest_queue
+
+    def _sync_input_rows(self, force: bool = False) -> int:
+        """Append queued raw signup rows to the input sheet once a batch is ready."""
+        controls = self.control_panel.config.get("ingest_controls", {})
+        total = 0
+        while True:
+            synced = self.ingest_queue.sync_input(
+                self.sheets,
+                self.sheet_id,
+                batch_size=controls.get("sheet_batch_size", 50),
+                max_delay=controls.get("sheet_max_delay", 30),
+                force=force,
+                mark_processed=self._mark_rows_processed_locked
+            )
+            total += synced
+            # A forced sync drains everything, one append per batch
+            if not force or not synced:
+                return total
+
+    def _mark_rows_processed_locked(self, rows: List[Dict]):
+        with self._store_lock:
+            self._mark_rows_processed(rows)
+
+    def _complete_signup(self, queue, candidate: Dict):
+        """Mark a signup scored, and its input row processed if it was appended while it was claimed."""
+        queue.complete(candidate['signup_id'])
+        row_number = candidate.get('row_number') or queue.input_row(candidate['signup_id'])
+        if row_number:
+            self._mark_rows_processed_locked([{'row_number': row_number}])
+
+    def process_queue(self, batch_size: Optional[int] = None, delay: Optional[float] = None,
+                      follow: bool = False):
+        """Process signups from the ingestion queue instead of re-reading the input sheet.
+
+        Args:
+            batch_size: Optional number of candidates to process before stopping
+            delay: Delay between processing candidates in seconds
+            follow: Keep waiting for new signups once the queue is empty
+        """
+        queue = self.open_ingest_queue()
+        delay = self._default_delay(delay)
+        poll_interval = self.control_panel.config.get("ingest_controls", {}).get("poll_interval", 2.0)
+        retry_batch = self.control_panel.config.get("dead_letter_controls", {}).get("retry_batch_size", 50)
+        total_processed = 0
+        total_success = 0
+        try:
+            print(f"\nSignup queue: {queue.counts()}")
+            while not batch_size or total_processed < batch_size:
+                if not self.budget.allows("scoring"):
+                    break
+                self._sync_input_rows()
+                claimed = queue.claim(1)
+                if not claimed:
+                    if not follow:
+                        break
+                    # Idle time goes to due retries
+                    if self.dead_letters is not None and self.retry_dead_letters(limit=retry_batch):
+                        continue
+                    self.sheets.flush(self.sheet_id)
+                    time.sleep(poll_interval)
+                    continue
+
+                if delay and total_processed:
+                    time.sleep(delay)
+                if self.config_watcher:
+                    self.config_watcher.poll()
+
+                candidate = claimed[0]
+                if self.state is not None and self.state.is_done(candidate):
+                    print(f"Signup {candidate['signup_id']} was already scored - skipping")
+                    self._complete_signup(queue, candidate)
+                    continue
+                if self.dead_letters is not None and self.dead_letters.contains(candidate):
+                    print(f"Signup {candidate['signup_id']} is waiting for a retry - skipping")
+                    self._complete_signup(queue, candidate)
+                    continue
+                print(f"\nCandidate {total_processed + 1} (signup {candidate['signup_id']})")
+                try:
+                    success = self.process_candidate(candidate)
+                except BaseException:
+                    queue.release(candidate['signup_id'])
+                    raise
+                self._complete_signup(queue, candidate)
+
+                total_processed += 1
+                if success:
+                    total_success += 1
+
+            self._print_summary(total_processed, total_success)
+
+        except KeyboardInterrupt:
+            print("\nProcess interrupted by user")
+        except Exception as e:
+            print(f"Error in processing loop: {e}")
+        finally:
+            self._sync_input_rows(force=True)
+            self.sheets.flush(self.sheet_id)
+            self.inference.save_state()
+            if self.scrape_cache is not None:
+                self.scrape_cache.flush()
+
+    def retry_dead_letters(self, limit: Optional[int] = None, delay: float = 0) -> int:
+        """Retry dead-lettered candidates whose backoff has elapsed.
+
+        A candidate that fails again is rescheduled with a longer backoff, or
+        given up on once its failure class runs out of attempts.
+
+        Returns:
+            Number of candidates retried
+        """
+        if self.dead_letters is None:
+            print("Dead-letter queue is disabled")
+            return 0
+        from dead_letter import EmptyScrape
+        retried = 0
+        recovered = 0
+        batch: list = []
+        try:
+            while (not limit or retried < limit) and self.budget.allows("scoring"):
+                batch = self.dead_letters.claim_due(min(limit - retried, 50) if limit else 50)
+                if not batch:
+                    break
+                while batch and self.budget.allows("scoring"):
+                    candidate = batch[0]
+                    if delay and retried:
+                        time.sleep(delay)
+                    print(f"\nRetrying dead-lettered candidate {candidate.get('email') or candidate.get('linkedin')}")
+                    entry_id = candidate['dead_letter_id']
+                    if self.process_candidate(candidate):
+                        self.dead_letters.resolve(entry_id)
+                        recovered += 1
+                    else:
+                        # Failures that raised were already recorded; this catches the rest
+                        self.dead_letters.fail_claimed(
+                            entry_id, candidate, EmptyScrape("no_data", "retry produced no result")
+                        )
+                    batch.pop(0)
+                    retried += 1
+        except KeyboardInterrupt:
+            print("\nRetries interrupted by user")
+        finally:
+            for candidate in batch:
+                self.dead_letters.requeue(candidate['dead_letter_id'])
+            self.sheets.flush(self.sheet_id)
+        if retried:
+            print(f"\nRetried {retried} dead-lettered candidates, {recovered} recovered")
+        return retried
+
+    def rescore(self, batch_size: Optional[int] = None, write_every: int = 200):
+        """Re-run inference on cached scrapes and update output rows in place.
+
+        Args:
+            batch_size: Optional number of rows to re-score before stopping
+            write_every: Number of re-scored rows sent per batched update
+        """
+        if self.scrape_cache is None:
+            print("Scrape cache is disabled - nothing to re-score")
+            return
+        if not self.sheets.updates_in_place:
+            print(f"Cannot re-score: {type(self.sheets).__name__} does not support in-place updates")
+            return
+
+        # Decisions made under the previous prompt must not be reused
+        self.inference.near_duplicates = None
+        fields = self.control_panel.get_required_fields()
+        updates: Dict[int, Dict] = {}
+        rescored = 0
+        missing = 0
+        current = 0
+        config = self.control_panel.snapshot()
+        prompt_version = config.prompt.version
+        try:
+            for position, row in self.sheets.iter_output_rows(self.sheet_id):
+                if batch_size and rescored >= batch_size or not self.budget.allows("scoring"):
+                    break
+                record = dict(zip(fields, row))
+                if self.state is not None:
+                    # Resume an interrupted re-score without redoing finished rows
+                    known = self.state.get(record)
+                    if known and known['prompt_version'] == prompt_version:
+                        current += 1
+                        continue
+                cached = self.scrape_cache.get(record)
+                if not cached:
+                    missing += 1
+                    continue
+
+                print(f"\nRe-scoring output row {position}")
+                analysis = self.inference.analyze_candidate(
+                    profile_data=cached['linkedin_data'],
+                    company_data=cached['company_research'],
+                    email=record.get('email') or cached['email'],
+                    linkedin_url=record.get('linkedin') or cached['linkedin']
+                )
+                updates[position] = analysis
+                rescored += 1
+
+                if len(updates) >= write_every:
+                    self._write_rescored(updates, prompt_version, config.model)
+                    updates = {}
+
+        except KeyboardInterrupt:
+            print("\nRe-scoring interrupted by user")
+        finally:
+            if updates:
+                self._write_rescored(updates, prompt_version, config.model)
+
+        print(f"\nRe-scored {rescored} rows with prompt "
+              f"'{self.control_panel.config['inference_controls']['active_prompt']}'")
+        if missing:
+            print(f"Skipped {missing} rows with no cached scrape")
+        if current:
+            print(f"Skipped {current} rows already scored with this prompt")
+
+    def _write_rescored(self, updates: Dict[int, Dict], prompt_version: str, model: str):
+        """Update re-scored output rows, then record the new decisions."""
+        self.sheets.update_output_rows(self.sheet_id, updates)
+        if self.state is not None:
+            for analysis in updates.values():
+                state_id = self.state.resolve(analysis)
+                self.state.record_decision(state_id, analysis, prompt_version, model)
+                self.state.record_saved(state_id, published=self.storage == "sheets")
+
+    def publish(self):
+        """Push a local backend's results to the output sheet."""
+        if self.storage == "sheets":
+            print("Results are already in Sheets")
+            return
+        if not self.sheet_id:
+            raise ValueError("SHEET_ID environment variable is required to publish")
+        from storage import publish_to_sheets
+        publish_to_sheets(self.sheets, self.sheet_id, state=self.state)
 
 def list_prompts():
     """List available prompts in the system."""
@@ -297,15 +878,117 @@ def toggle_highlighting():
     control_panel.update_config("sheet_controls", "highlight_processed_rows", not current)
     print(f"Row highlighting: {'enabled' if not current else 'disabled'}")
 
+def show_status(limit: int = 20):
+    """Print how many applicants are in each lifecycle stage, the latest failures and today's spend."""
+    from state_store import CandidateState, FAILED
+    from budget import BudgetGovernor
+    control_panel = ControlPanel()
+    budget_path = control_panel.config.get("budget_controls", {}).get("path", "budget.db")
+    if os.path.exists(budget_path):
+        budget = BudgetGovernor(control_panel)
+        if budget.enabled:
+            print("\nBudget:")
+            CandidateProcessor._print_budget(budget)
+        budget.close()
+
+    controls = control_panel.config.get("state_controls", {})
+    path = controls.get("path", "candidate_state.db")
+    if not os.path.exists(path):
+        print(f"No state store at {path}")
+        return
+    state = CandidateState(path)
+    print("\nApplicants by stage:")
+    for status, count in sorted(state.counts().items()):
+        print(f"- {status}: {count}")
+    failures = list(state.iter_status(FAILED, limit=limit))
+    if failures:
+        print("\nFailed:")
+        for record in failures:
+            print(f"- {record['email'] or record['linkedin']}: {record['error']}")
+    state.close()
+
+def show_dead_letters(limit: int = 20):
+    """Summarise the dead-letter backlog by status and failure class."""
+    from dead_letter import DeadLetterQueue
+    path = ControlPanel().config.get("dead_letter_controls", {}).get("path", "dead_letter.db")
+    if not os.path.exists(path):
+        print(f"No dead-letter queue at {path}")
+        return
+    dead_letters = DeadLetterQueue(path)
+    summary = dead_letters.summary()
+    if not summary:
+        print("Dead-letter queue is empty")
+    for status, classes in sorted(summary.items()):
+        print(f"\n{status}: {sum(classes.values())}")
+        for failure_class, count in sorted(classes.items(), key=lambda item: -item[1]):
+            print(f"  - {failure_class}: {count}")
+    next_due = dead_letters.next_due()
+    if next_due:
+        print(f"\nNext retry due: {time.strftime('%Y-%m-%d %H:%M', time.localtime(next_due))}")
+    entries = list(dead_letters.iter_entries(limit=limit))
+    if entries:
+        print("\nLatest failures:")
+        for entry in entries:
+            print(f"- {entry['identity']} [{entry['failure_class']}, {entry['status']}, "
+                  f"attempt {entry['attempts']}]: {entry['error']}")
+    dead_letters.close()
+
+def open_ingest_queue(control_panel: Optional[ControlPanel] = None):
+    """Open the signup queue without loading the scoring pipeline."""
+    from ingest_queue import IngestQueue
+    controls = (control_panel or ControlPanel()).config.get("ingest_controls", {})
+    return IngestQueue(controls.get("queue_path", "ingest_queue.db"), claim_timeout=controls.get("claim_timeout", 600))
+
+def enqueue_file(path: str):
+    """Queue signups from a CSV export or a JSON-lines file, as the webhook would."""
+    import csv
+    import json
+    queue = open_ingest_queue()
+    statuses = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        records = (json.loads(line) for line in f if line.strip()) if path.endswith(('.jsonl', '.json')) \
+            else csv.DictReader(f)
+        for record in records:
+            status = queue.enqueue(record)['status']
+            statuses[status] = statuses.get(status, 0) + 1
+    print(f"Queued from {path}: {statuses}")
+    print(f"Signup queue: {queue.counts()}")
+    queue.close()
+
 def main():
     """Main entry point with argument handling."""
     import argparse
     parser = argparse.ArgumentParser(description='Process candidates from spreadsheet')
     parser.add_argument('--batch', type=int, help='Number of candidates to process')
-    parser.add_argument('--delay', type=float, default=2.0, help='Delay between candidates')
+    parser.add_argument('--delay', type=float,
+                        help='Delay between candidates (default 2s, or none with adaptive concurrency)')
     parser.add_argument('--list-prompts', action='store_true', help='List available prompts')
     parser.add_argument('--prompt', type=str, help='Change active prompt')
     parser.add_argument('--toggle-highlighting', action='store_true', help='Toggle row highlighting')
+    parser.add_argument('--storage', choices=['sheets', 'csv', 'sqlite', 'parquet'], default='sheets',
+                        help='Candidate storage backend')
+    parser.add_argument('--input', type=str, help='Input file for local storage backends')
+    parser.add_argument('--output', type=str, help='Output file, database or directory for local storage backends')
+    parser.add_argument('--publish', action='store_true', help='Push local results to the output sheet when done')
+    parser.add_argument('--rescore', action='store_true',
+                        help='Re-score existing output rows from cached scrapes with the active prompt')
+    parser.add_argument('--evaluate', nargs='+', metavar='PROMPT',
+                        help='Compare prompts over cached scrapes (use --batch to limit the corpus)')
+    parser.add_argument('--models', nargs='+', help='Models to compare with --evaluate')
+    parser.add_argument('--workers', type=int, help='Concurrent model calls for --evaluate')
+    parser.add_argument('--serve', action='store_true', help='Run the HTTP scoring service')
+    parser.add_argument('--host', type=str, help='Scoring service host (default from server_controls)')
+    parser.add_argument('--port', type=int, help='Scoring service port (default from server_controls)')
+    parser.add_argument('--status', action='store_true', help='Show applicants by lifecycle stage')
+    parser.add_argument('--dead-letters', action='store_true', help='Summarise failed candidates awaiting retry')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Retry dead-lettered candidates whose backoff has elapsed')
+    parser.add_argument('--ingest', action='store_true', help='Run only the signup webhook that fills the queue')
+    parser.add_argument('--enqueue', type=str, metavar='FILE',
+                        help='Queue signups from a CSV or JSON-lines file instead of the webhook')
+    parser.add_argument('--from-queue', action='store_true',
+                        help='Process signups from the ingestion queue instead of reading the input sheet')
+    parser.add_argument('--follow', action='store_true', help='With --from-queue, keep waiting for new signups')
     
     args = parser.parse_args()
     
@@ -315,16 +998,63 @@ def main():
         
     if args.prompt:
         change_prompt(args.prompt)
-        return
+        if not args.rescore:
+            return
         
     if args.toggle_highlighting:
         toggle_highlighting()
         return
 
+    if args.status:
+        show_status()
+        return
+
+    if args.dead_letters:
+        show_dead_letters()
+        return
+
+    if args.enqueue:
+        enqueue_file(args.enqueue)
+        return
+
+    if args.ingest:
+        from server import serve_ingest
+        serve_ingest(open_ingest_queue(), args.host, args.port)
+        return
+
+    if args.evaluate:
+        from evaluate import evaluate, print_report
+        print_report(evaluate(args.evaluate, args.models, limit=args.batch, workers=args.workers))
+        return
+
     print("\n=== Cerebras Candidate Processor ===")
     try:
-        processor = CandidateProcessor()
-        processor.process_all(batch_size=args.batch, delay=args.delay)
+        processor = CandidateProcessor(args.storage, args.input, args.output)
+        if args.serve:
+            from server import serve
+            serve(processor, args.host, args.port)
+        elif args.rescore:
+            processor.rescore(batch_size=args.batch)
+        elif args.retry_failed:
+            processor.retry_dead_letters(limit=args.batch, delay=args.delay)
+        elif args.from_queue:
+            processor.process_queue(batch_size=args.batch, delay=args.delay, follow=args.follow)
+        else:
+            processor.process_all(batch_size=args.batch, delay=args.delay)
+        if args.publish:
+            processor.publish()
+        processor.sheets.close()
+        if processor.scrape_cache is not None:
+            processor.scrape_cache.close()
+        if processor.ingest_queue is not None:
+            processor.ingest_queue.close()
+        if processor.state is not None:
+            processor.state.close()
+        if processor.dead_letters is not None:
+            processor.dead_letters.close()
+        processor.budget.close()
+        if processor.prefetcher is not None:
+            processor.prefetcher.close()
     except Exception as e:
         print(f"\nError: {e}")
 
@@ -0,0 +1,52 @@
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+class ResponseCache:
+    """SQLite cache of chat completions keyed by model, temperature and messages.
+
+    Identical requests (same prompt text, model and inputs) are answered from
+    disk, so re-running an evaluation only pays for what changed.
+    """
+
+    def __init__(self, db_path: str = "response_cache.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, content TEXT NOT NULL, "
+            "prompt_tokens INTEGER, completion_tokens INTEGER, created_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(model: str, temperature: float, messages: List[Dict]) -> str:
+        """Hash a request into a cache key."""
+        payload = json.dumps([model, temperature, messages], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, int, int]]:
+        """Get cached content with its prompt and completion token counts."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT content, prompt_tokens, completion_tokens FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1] or 0, row[2] or 0) if row else None
+
+    def put(self, key: str, model: str, content: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        """Store a response."""
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, prompt_tokens, completion_tokens, time.time())
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,109 @@
+import re
+import heapq
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from typing import Dict, Iterable, Iterator, Optional
+from control_panel import ControlPanel
+from domain_index import get_domain_index
+
+# Timestamp formats of form exports, tried on the first cells of a row
+TIMESTAMP_FORMATS = ("%m/%d/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S", "%m/%d/%Y")
+
+class PriorityScheduler:
+    """Orders the candidate backlog so likely accepts are scraped and scored first.
+
+    The priority is a cheap score from the input rows alone: title and role
+    keywords, the email domain class, whether a LinkedIn URL was given, and
+    how recently the form was submitted. The first initial_fill candidates
+    are read into a heap before anything is handed out; after that each
+    hand-out reads up to two more, so the lookahead grows towards
+    max_pending without delaying the first candidate. Candidates are handed
+    out highest first. To keep low scorers from starving behind a steady
+    stream of new ones, a waiting candidate gains aging_per_candidate for
+    every candidate handed out after it arrived.
+
+    Form timestamps without an offset are read in the configured timezone
+    (an IANA name such as "America/Los_Angeles"), or in the machine's local
+    time when none is set.
+    """
+
+    def __init__(self, control_panel: Optional[ControlPanel] = None):
+        control_panel = control_panel or ControlPanel()
+        controls = control_panel.config.get("scheduling_controls", {})
+        self.domains = get_domain_index(control_panel)
+        self.max_pending = max(controls.get("max_pending", 20000), 1)
+        read_chunk_size = control_panel.config.get("sheet_controls", {}).get("read_chunk_size", 2000)
+        self.initial_fill = min(max(controls.get("initial_fill", read_chunk_size), 1), self.max_pending)
+        self.timezone = ZoneInfo(controls["timezone"]) if controls.get("timezone") else None
+        self.aging = controls.get("aging_per_candidate", 0.01)
+        self.weights = controls.get("weights", {})
+        self.half_life_days = controls.get("recency_half_life_days", 7)
+        self._keywords = [
+            (re.compile(rf"\b{re.escape(keyword.lower())}\b"), weight)
+            for keyword, weight in controls.get("title_keywords", {}).items()
+        ]
+        self.stats = {"scheduled": 0, "reordered": 0}
+
+    def _submitted_at(self, row_data: list) -> Optional[float]:
+        for cell in row_data[:3]:
+            for timestamp_format in TIMESTAMP_FORMATS:
+                try:
+                    submitted = datetime.strptime(cell.strip(), timestamp_format)
+                except ValueError:
+                    continue
+                if submitted.tzinfo is None and self.timezone is not None:
+                    submitted = submitted.replace(tzinfo=self.timezone)
+                # Naive times left over are taken as local time
+                return submitted.timestamp()
+        return None
+
+    def score(self, candidate: Dict) -> float:
+        """Estimate how much an applicant is worth scoring early; higher goes first."""
+        rows = [candidate] + candidate.get('duplicates', [])
+        text = ' '.join(cell for row in rows for cell in row.get('row_data', [])).lower()
+        score = sum(weight for pattern, weight in self._keywords if pattern.search(text))
+
+        if any(row.get('linkedin') for row in rows):
+            score += self.weights.get("linkedin", 0)
+        email = next((row['email'] for row in rows if row.get('email')), '')
+        domain_class = self.domains.classify(email.split('@')[1] if '@' in email else None)
+        score += self.weights.get(domain_class.value, 0)
+
+        submitted_at = self._submitted_at(candidate.get('row_data', []))
+        if submitted_at is not None and self.half_life_days:
+            age_days = max(time.time() - submitted_at, 0) / 86400
+            score += self.weights.get("recency", 0) * 0.5 ** (age_days / self.half_life_days)
+        return score
+
+    def order(self, candidates: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield candidates highest priority first, reading ahead up to max_pending."""
+        heap = []
+        source = iter(candidates)
+        arrivals = 0
+        handed_out = 0
+        exhausted = False
+        fill = self.initial_fill
+        while True:
+            for _ in range(fill):
+                if exhausted or len(heap) >= self.max_pending:
+                    break
+                candidate = next(source, None)
+                if candidate is None:
+                    exhausted = True
+                    break
+                candidate['priority_score'] = round(self.score(candidate), 2)
+                # Gaining aging per later hand-out is the same as losing it per earlier one,
+                # so each entry's heap key is fixed when it arrives
+                key = -(candidate['priority_score'] - self.aging * handed_out)
+                heapq.heappush(heap, (key, arrivals, candidate))
+                arrivals += 1
+            if not heap:
+                return
+            _, arrival, candidate = heapq.heappop(heap)
+            self.stats["scheduled"] += 1
+            if arrival != handed_out:
+                self.stats["reordered"] += 1
+            handed_out += 1
+            fill = 2
+            yield candidate
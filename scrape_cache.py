@@ -0,0 +1,116 @@
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional
+from compaction import profile_results
+from identity import identity_keys
+
+class ScrapeCache:
+    """Local SQLite copy of scrape results, keyed by applicant identity.
+
+    Each scrape is stored once and linked from every canonical email and
+    LinkedIn key of the applicant, so rows that share either key find it.
+    Profiles are stored as flattened Exa results, which compaction and the
+    prompt builder read the same way as live responses. One connection is
+    shared across threads behind a lock.
+    """
+
+    def __init__(self, db_path: str = "scrape_cache.db", commit_every: int = 50):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self._pending_writes = 0
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrapes ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT, linkedin TEXT, "
+            "profile TEXT, company_research TEXT, category TEXT, scraped_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrape_keys ("
+            "identity TEXT PRIMARY KEY, scrape_id INTEGER NOT NULL REFERENCES scrapes(id))"
+        )
+        self.conn.commit()
+
+    def put(self, candidate: Dict, scrape_result: Dict, rows: Optional[List[Dict]] = None):
+        """Store a scrape under the identity keys of the candidate and its duplicate rows."""
+        keys = []
+        for row in [candidate] + (rows or []):
+            keys.extend(key for key in identity_keys(row) if key not in keys)
+        if not keys:
+            return
+
+        profile = json.dumps(profile_results(scrape_result.get('linkedin_data')))
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT INTO scrapes (email, linkedin, profile, company_research, category, scraped_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    candidate.get('email', ''),
+                    candidate.get('linkedin', ''),
+                    profile,
+                    scrape_result.get('company_research') or '',
+                    scrape_result.get('category') or '',
+                    time.time()
+                )
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO scrape_keys (identity, scrape_id) VALUES (?, ?)",
+                ((key, cursor.lastrowid) for key in keys)
+            )
+            self._pending_writes += 1
+            if self._pending_writes >= self.commit_every:
+                self.flush()
+
+    def _to_scrape_result(self, row: tuple) -> Dict:
+        email, linkedin, profile, company_research, category = row
+        result = {
+            'email': email,
+            'linkedin': linkedin,
+            'linkedin_data': {'results': json.loads(profile)} if profile else None,
+            'company_research': company_research or None
+        }
+        if category:
+            result['category'] = category
+        return result
+
+    def get(self, candidate: Dict) -> Optional[Dict]:
+        """Get the latest scrape stored for any identity key of a candidate."""
+        for key in identity_keys(candidate):
+            with self._lock:
+                row = self.conn.execute(
+                    "SELECT s.email, s.linkedin, s.profile, s.company_research, s.category "
+                    "FROM scrape_keys k JOIN scrapes s ON s.id = k.scrape_id WHERE k.identity = ?",
+                    (key,)
+                ).fetchone()
+            if row:
+                return self._to_scrape_result(row)
+        return None
+
+    def iter_scrapes(self, limit: Optional[int] = None) -> Iterator[Dict]:
+        """Yield the current scrape of each applicant, oldest first."""
+        query = (
+            "SELECT email, linkedin, profile, company_research, category FROM scrapes "
+            "WHERE id IN (SELECT DISTINCT scrape_id FROM scrape_keys) ORDER BY id"
+        )
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        for row in self.conn.execute(query):
+            yield self._to_scrape_result(row)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(DISTINCT scrape_id) FROM scrape_keys").fetchone()[0]
+
+    def flush(self):
+        """Commit pending writes."""
+        with self._lock:
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def close(self):
+        """Commit and close the database."""
+        self.flush()
+        self.conn.close()
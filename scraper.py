@@ -1,9 +1,16 @@
-from typing import Dict, Optional, TypedDict
+from typing import Dict, Optional, Tuple, TypedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 import re
 import os
-from exa_py import Exa
+import time
+import threading
 from dotenv import load_dotenv
-from cerebras.cloud.sdk import Cerebras
+from compaction import profile_results, extract_sections
+from control_panel import ControlPanel
+from domain_index import DomainClass, get_domain_index
+from deadline import Deadline, DeadlineExceeded, LatencyTracker, call_with_timeout
+from concurrency import get_concurrency
+from budget import get_budget
 
 load_dotenv()
 
@@ -11,58 +18,256 @@ class ScrapedData(TypedDict, total=False):
     """Container for scraped data"""
     linkedin_data: Optional[str]
     company_research: Optional[str]
+    domain_class: str
+    partial: bool
     errors: list[str]
 
 class DataScraper:
-    def __init__(self):
+    def __init__(self, control_panel: Optional[ControlPanel] = None):
+        self.controls = control_panel or ControlPanel()
+        deadline_controls = self.controls.config.get("deadline_controls", {})
         try:
+            # SDKs are imported on first use to keep config-only commands fast
+            from exa_py import Exa
+            from cerebras.cloud.sdk import Cerebras
+            # The Exa SDK takes no timeout; every call goes through _exa_call, which
+            # bounds it by the candidate's deadline and exa_timeout
             self.exa = Exa(api_key=os.getenv('EXA_KEY'))
-            self.cerebras = Cerebras(api_key=os.getenv("CEREBRAS_KEY"))
+            self.cerebras = Cerebras(
+                api_key=os.getenv("CEREBRAS_KEY"),
+                timeout=deadline_controls.get("cerebras_timeout", 30)
+            )
         except Exception as e:
             print(f"Warning: Failed to initialize APIs: {e}")
             self.exa = None
             self.cerebras = None
             
-        self.common_domains = {
-            'gmail.com', 'yahoo.com', 'hotmail.com', 
-            'outlook.com', 'aol.com', 'icloud.com'
+        # Free-mail, academic and known company domains
+        self.domains = get_domain_index(self.controls)
+
+        # Counters are updated from the candidate and prefetch pools
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "company_parsed": 0,
+            "company_llm_fallback": 0,
+            "speculative_hits": 0,
+            "speculative_misses": 0,
+            "exa_timeouts": 0,
+            "exa_hedged": 0,
+            "partial_scrapes": 0,
+            "research_shed": 0
         }
 
-    def _extract_company_from_linkedin(self, profile_data: str) -> Optional[str]:
-        """Extract company name from LinkedIn profile data."""
+        # Exa calls run on their own pool so a hung request can be abandoned
+        self.latency = {"get_contents": LatencyTracker(), "search": LatencyTracker()}
+
+        # Per-upstream in-flight limits shared with Inference; the pool leaves room for hedges
+        self.concurrency = get_concurrency(self.controls)
+        self.budget = get_budget(self.controls)
+        exa_workers = 8
+        if self.concurrency.enabled:
+            exa_workers = max(exa_workers, self.concurrency.limiter("exa").max_limit * 2)
+        self._exa_executor = ThreadPoolExecutor(max_workers=exa_workers)
+
+        # Email-domain research started in parallel with the LinkedIn fetch
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, self.concurrency.max_candidates) if self.concurrency.enabled else 4
+        )
+
+    # Timeouts, hedging and parsing settings follow config reloads; pool sizes
+    # and client timeouts are fixed when the scraper is built
+    def _setting(self, section: str, key: str, default):
+        return self.controls.snapshot().sections.get(section, {}).get(key, default)
+
+    @property
+    def min_parse_confidence(self) -> float:
+        """Heuristic company parsing; the LLM is only used below this confidence."""
+        return self._setting("scraping_controls", "company_parse_min_confidence", 0.7)
+
+    @property
+    def speculative_research(self) -> bool:
+        return self._setting("scraping_controls", "speculative_research", True)
+
+    @property
+    def exa_timeout(self) -> float:
+        return self._setting("deadline_controls", "exa_timeout", 20)
+
+    @property
+    def hedge_exa(self) -> bool:
+        return self._setting("deadline_controls", "hedge_exa", False)
+
+    @property
+    def hedge_percentile(self) -> float:
+        return self._setting("deadline_controls", "hedge_percentile", 0.95)
+
+    @property
+    def hedge_min_samples(self) -> int:
+        return self._setting("deadline_controls", "hedge_min_samples", 20)
+
+    def _parse_company_from_profile(self, profile_data) -> Tuple[Optional[str], float]:
+        """Read the current company from the Exa title and Experience section.
+
+        Returns:
+            Tuple of company name (or None) and a confidence between 0 and 1
+        """
+        title_company, title_confidence = None, 0.0
+        experience_company, experience_confidence = None, 0.0
+
+        for result in profile_results(profile_data):
+            # LinkedIn titles look like "Name - Role - Company | LinkedIn"
+            title = re.sub(r'\s*\|\s*LinkedIn\s*$', '', result['title'], flags=re.IGNORECASE)
+            parts = [part.strip() for part in re.split(r'\s+[-–—]\s+', title) if part.strip()]
+            if len(parts) >= 3:
+                title_company, title_confidence = parts[-1], 0.85
+            elif len(parts) == 2:
+                # Could be a role or a company; "Role at Company" settles it
+                at_match = re.search(r'\bat\s+(.+)$', parts[1])
+                if at_match:
+                    title_company, title_confidence = at_match.group(1).strip(), 0.85
+                else:
+                    title_company, title_confidence = parts[1], 0.5
+
+            sections = extract_sections(result['text'])
+            if not title_company:
+                intro = sections.get('headline', '')
+                at_match = re.search(r'\b(?:at|@)\s+([^|\n,]+)', intro)
+                if at_match:
+                    title_company, title_confidence = at_match.group(1).strip(), 0.75
+
+            # First Experience entry: role line, then "Company · Employment type"
+            entry = sections.get('experience', '').split('\n')[:4]
+            for line in entry[1:]:
+                if re.search(r'\d{4}|present', line, re.IGNORECASE):
+                    break
+                company = line.split('·')[0].strip()
+                if company:
+                    current = any(re.search(r'present', l, re.IGNORECASE) for l in entry)
+                    experience_company = company
+                    experience_confidence = 0.8 if current else 0.6
+                    break
+
+            if title_company or experience_company:
+                break
+
+        if title_company and experience_company:
+            if title_company.lower() == experience_company.lower():
+                return title_company, 0.95
+            # Disagreement; trust the stronger source but flag it as uncertain
+            if title_confidence >= experience_confidence:
+                return title_company, min(title_confidence, 0.6)
+            return experience_company, min(experience_confidence, 0.6)
+        if title_company:
+            return title_company, title_confidence
+        if experience_company:
+            return experience_company, experience_confidence
+        return None, 0.0
+
+    def _get_company_from_linkedin(self, profile_data, deadline: Optional[Deadline] = None) -> Optional[str]:
+        """Get current company, falling back to the LLM when parsing is unsure."""
+        company, confidence = self._parse_company_from_profile(profile_data)
+        if company and company.lower() not in ('self-employed', 'none') \
+                and confidence >= self.min_parse_confidence:
+            with self._stats_lock:
+                self.stats["company_parsed"] += 1
+            print(f"Parsed company without LLM (confidence {confidence:.2f})")
+            return company
+
+        with self._stats_lock:
+            self.stats["company_llm_fallback"] += 1
+        return self._extract_company_from_linkedin(profile_data, deadline)
+
+    def _extract_company_from_linkedin(self, profile_data: str, deadline: Optional[Deadline] = None) -> Optional[str]:
+        """Extract company name from LinkedIn profile data.
+
+        Raises:
+            DeadlineExceeded: if the LinkedIn stage runs out of time
+        """
+        options = {}
+        if deadline is not None:
+            if deadline.expired():
+                raise DeadlineExceeded("no time left for company extraction")
+            options["timeout"] = deadline.budget("linkedin")
         try:
             prompt = """Extract the current company name from this LinkedIn profile text. 
             If multiple companies are listed, return only the most recent/current one.
             Return ONLY the company name, nothing else."""
             
-            response = self.cerebras.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You extract company names from text. Return only the company name."},
-                    {"role": "user", "content": f"{prompt}\n\nProfile:\n{profile_data}"}
-                ],
-                model="llama3.3-70b",
-                temperature=0
-            )
+            with self.concurrency.slot("cerebras", options.get("timeout")):
+                response = self.cerebras.chat.completions.create(
+                    messages=[
+                        {"role": "system", "content": "You extract company names from text. Return only the company name."},
+                        {"role": "user", "content": f"{prompt}\n\nProfile:\n{profile_data}"}
+                    ],
+                    model="llama3.3-70b",
+                    temperature=0,
+                    **options
+                )
             
+            usage = getattr(response, "usage", None)
+            self.budget.record("llm_tokens", (getattr(usage, "prompt_tokens", 0) or 0) +
+                               (getattr(usage, "completion_tokens", 0) or 0))
             company = response.choices[0].message.content.strip()
             return company if company and company.lower() != "none" else None
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded(f"company extraction timed out: {e}") from e
             print(f"Error extracting company from LinkedIn: {e}")
             return None
 
-    def _research_company(self, company_name: str) -> Optional[str]:
-        """Research company using Exa search."""
+    def _exa_call(self, operation: str, fn, *args, timeout: Optional[float] = None, **kwargs):
+        """Call Exa with a timeout, hedging calls slower than the tracked percentile."""
+        timeout = min(timeout, self.exa_timeout) if timeout is not None else self.exa_timeout
+        tracker = self.latency[operation]
+        hedge_after = None
+        if self.hedge_exa and len(tracker) >= self.hedge_min_samples:
+            hedge_after = tracker.percentile(self.hedge_percentile)
+
+        def metered(*call_args, **call_kwargs):
+            # Every request is billed, including hedges and ones the caller stopped waiting for
+            response = fn(*call_args, **call_kwargs)
+            self.budget.record_exa(response)
+            return response
+
+        start = time.monotonic()
+        try:
+            # The slot is taken on the pool thread so queueing for it counts against the timeout
+            result = call_with_timeout(
+                self._exa_executor, timeout, self.concurrency.wrap("exa", metered, timeout), *args,
+                hedge_after=hedge_after, on_hedge=self._count_hedge, **kwargs
+            )
+        except DeadlineExceeded:
+            with self._stats_lock:
+                self.stats["exa_timeouts"] += 1
+            raise
+        tracker.record(time.monotonic() - start)
+        return result
+
+    def _count_hedge(self):
+        with self._stats_lock:
+            self.stats["exa_hedged"] += 1
+
+    def _research_company(self, company_name: str, timeout: Optional[float] = None) -> Optional[str]:
+        """Research company using Exa search.
+
+        Raises:
+            DeadlineExceeded: if the search does not finish within timeout
+        """
         if not self.exa or not company_name:
             return None
             
         try:
             print(f"Researching company: {company_name}")
             search_query = f'"{company_name}" startup company AI "machine learning"'
-            results = self.exa.search_and_contents(
+            results = self._exa_call(
+                "search",
+                self.exa.search_and_contents,
                 search_query,
                 num_results=3,
-                text=True
+                text=True,
+                timeout=timeout
             )
             
             if not results or not results.results:
@@ -75,6 +280,8 @@ class DataScraper:
             
             return "\n\n".join(summaries) if summaries else None
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Company research error: {str(e)}")
             return None
@@ -88,38 +295,119 @@ class DataScraper:
         except:
             return None
 
-    def scrape(self, linkedin_url: Optional[str] = None, email: Optional[str] = None) -> ScrapedData:
-        """Enhanced scrape with company research."""
+    def _company_matches_domain(self, company_name: str, domain: str) -> bool:
+        """Check whether a company name plausibly owns an email domain."""
+        labels = domain.lower().split('.')
+        if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in {'co', 'com', 'ac', 'org', 'net', 'gov', 'edu'}:
+            stem = labels[-3]  # acme.co.uk
+        else:
+            stem = labels[-2] if len(labels) >= 2 else labels[0]
+
+        stem = re.sub(r'[^a-z0-9]', '', stem)
+        company = re.sub(r'[^a-z0-9]', '', company_name.lower())
+        if not company or not stem:
+            return False
+        initials = ''.join(word[0] for word in re.findall(r'[a-z0-9]+', company_name.lower()))
+        return stem in company or company in stem or stem == initials
+
+    def speculation_hit_rate(self) -> float:
+        """Share of speculative domain research that was kept."""
+        with self._stats_lock:
+            hits, misses = self.stats["speculative_hits"], self.stats["speculative_misses"]
+        return hits / (hits + misses) if hits + misses else 0.0
+
+    def scrape(self, linkedin_url: Optional[str] = None, email: Optional[str] = None,
+               deadline: Optional[Deadline] = None) -> ScrapedData:
+        """Enhanced scrape with company research.
+
+        Stages share the candidate's deadline. If one runs out of time the
+        data gathered so far is returned with partial set.
+        """
+        deadline = deadline or Deadline.from_config(self.controls)
         result: ScrapedData = {"errors": []}
         company_name = None
+        research = None
+        domain = self._extract_domain_from_email(email) if email else None
+        domain_class = self.domains.classify(domain)
+        result["domain_class"] = domain_class.value
+
+        # Free-mail and academic domains say nothing about an employer, so skip researching them
+        company_domain = domain if domain and domain_class not in (DomainClass.FREE_MAIL, DomainClass.ACADEMIC) else None
+
+        # Company research is the first work dropped as the budget runs out
+        research_allowed = self.budget.allows("company_research")
+        if not research_allowed:
+            with self._stats_lock:
+                self.stats["research_shed"] += 1
+
+        # Research the email domain alongside the LinkedIn fetch; kept only if it matches
+        speculative = None
+        if research_allowed and self.speculative_research and linkedin_url and company_domain:
+            speculative = self._executor.submit(
+                self._research_company, company_domain, deadline.budget("linkedin", "research")
+            )
 
         # First try to get company from LinkedIn
         if linkedin_url:
             try:
                 print("Getting LinkedIn data...")
-                profile_content = self.exa.get_contents([linkedin_url], text=True)
+                profile_content = self._exa_call(
+                    "get_contents",
+                    self.exa.get_contents,
+                    [linkedin_url],
+                    text=True,
+                    timeout=deadline.budget("linkedin")
+                )
                 if profile_content:
                     result["linkedin_data"] = profile_content
-                    company_name = self._extract_company_from_linkedin(profile_content)
+                    company_name = self._get_company_from_linkedin(profile_content, deadline)
                     if company_name:
                         print(f"Found company from LinkedIn: {company_name}")
+            except DeadlineExceeded as e:
+                result["partial"] = True
+                result["errors"].append(f"LinkedIn fetch timed out: {e}")
             except Exception as e:
                 result["errors"].append(f"LinkedIn processing failed: {str(e)}")
 
         # If no company from LinkedIn, try email domain
-        if not company_name and email:
-            domain = self._extract_domain_from_email(email)
-            if domain and domain not in self.common_domains:
-                company_name = domain
-                print(f"Using email domain as company: {domain}")
+        if not company_name and company_domain:
+            company_name = company_domain
+            print(f"Using email domain as company: {company_domain}")
+
+        speculation_used = False
+        if speculative:
+            if company_name and self._company_matches_domain(company_name, company_domain):
+                with self._stats_lock:
+                    self.stats["speculative_hits"] += 1
+                speculation_used = True
+                print(f"Using speculative research for {company_domain}")
+                try:
+                    research = speculative.result(timeout=deadline.budget("research"))
+                except (DeadlineExceeded, TimeoutError):
+                    result["partial"] = True
+                    result["errors"].append(f"Research timed out for company: {company_name}")
+            else:
+                with self._stats_lock:
+                    self.stats["speculative_misses"] += 1
+                speculative.cancel()
 
         # Do company research if we found a company name
-        if company_name:
-            research = self._research_company(company_name)
+        if company_name and not research_allowed:
+            print(f"Skipping company research for {company_name} - budget")
+        elif company_name:
+            if not speculation_used:
+                try:
+                    research = self._research_company(company_name, timeout=deadline.budget("research"))
+                except DeadlineExceeded:
+                    result["partial"] = True
+                    result["errors"].append(f"Research timed out for company: {company_name}")
             if research:
                 result["company_research"] = research
                 print("✓ Added company research")
-            else:
+            elif not result.get("partial"):
                 result["errors"].append(f"No research found for company: {company_name}")
 
-        return result
\ No newline at end of file
+        if result.get("partial"):
+            with self._stats_lock:
+                self.stats["partial_scrapes"] += 1
+        return result
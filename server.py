@@ -0,0 +1,347 @@
+import os
+import hmac
+import json
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from budget import BudgetExhausted
+
+class InvalidRequest(ValueError):
+    """The request body is not a usable candidate."""
+
+class CandidateDeferred(Exception):
+    """Scoring failed and the candidate was dead-lettered for a later retry."""
+
+    def __init__(self, entry: Dict, error: Exception):
+        super().__init__(str(error))
+        self.entry = entry
+
+class BatchedResultWriter:
+    """Saves scored results to storage from one background thread.
+
+    Request threads only enqueue results. The writer sends them as one batch
+    when batch_size results are waiting or the oldest has waited max_delay
+    seconds, and is the only thread that touches the storage client. An
+    entry without a result only marks its input row processed.
+    """
+
+    def __init__(self, store, target: str, batch_size: int = 50, max_delay: float = 2.0,
+                 state=None, published: bool = False):
+        self.store = store
+        self.target = target
+        self.batch_size = max(batch_size, 1)
+        self.max_delay = max_delay
+        self.state = state
+        self.published = published
+        self._queue: "queue.Queue[Optional[Tuple[Dict, Optional[int], Optional[int]]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._stats_lock = threading.Lock()
+        self.stats = {"queued": 0, "written": 0, "marked": 0, "batches": 0}
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, data: Optional[Dict], input_row_number: Optional[int] = None, state_id: Optional[int] = None):
+        """Queue one result for the next batch, or with no data just its input row."""
+        with self._stats_lock:
+            self.stats["queued"] += 1
+        self._queue.put((data, input_row_number, state_id))
+
+    def snapshot(self) -> Dict:
+        with self._stats_lock:
+            return dict(self.stats, pending=self.pending())
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            flush_at = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(flush_at - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: List[Tuple[Optional[Dict], Optional[int], Optional[int]]]):
+        try:
+            results = [(data, row_number) for data, row_number, _ in batch if data is not None]
+            marks = [row_number for data, row_number, _ in batch if data is None and row_number]
+            self.store.save_analyses(self.target, results)
+            # Sheets rows are only marked when highlighting is on, as save_analyses does
+            if not self.published or self.store.controls.snapshot().highlight_rows:
+                for row_number in marks:
+                    self.store.mark_row_processed(self.target, row_number)
+            self.store.flush(self.target)
+            with self._stats_lock:
+                self.stats["written"] += len(results)
+                self.stats["marked"] += len(marks)
+                self.stats["batches"] += 1
+            if self.state is not None:
+                for data, _, state_id in batch:
+                    if data is not None:
+                        self.state.record_saved(state_id, published=self.published)
+        except Exception as e:
+            print(f"Error writing {len(batch)} results: {e}")
+
+    def close(self):
+        """Write everything queued so far and stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+class ScoringService:
+    """Scores single candidates synchronously on a shared CandidateProcessor.
+
+    All requests share the processor's Exa and Cerebras clients, its scrape,
+    response and near-duplicate caches, and its decisions by identity, so a
+    repeat applicant is answered without new API calls. Concurrent requests
+    for the same applicant wait on one scoring call instead of each making
+    their own. Only a new decision is appended to the output; repeats just
+    mark their input row processed.
+    """
+
+    def __init__(self, processor, writer: BatchedResultWriter):
+        self.processor = processor
+        self.writer = writer
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "scored": 0, "reused": 0, "coalesced": 0, "deferred": 0, "errors": 0}
+
+    def count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def score(self, payload: Dict) -> Dict:
+        """Score a candidate and queue the result for the sheet.
+
+        Raises:
+            InvalidRequest: if neither an email nor a LinkedIn URL is given
+        """
+        from identity import identity_keys
+        candidate = {
+            'email': str(payload.get('email') or '').strip(),
+            'linkedin': str(payload.get('linkedin') or '').strip()
+        }
+        if not candidate['email'] and not candidate['linkedin']:
+            raise InvalidRequest("email or linkedin is required")
+        row_number = payload.get('row_number')
+        start = time.perf_counter()
+        self.count("requests")
+        state = self.processor.state
+        already_saved = False
+
+        analysis = self.processor.find_decision(candidate)
+        source = "reused"
+        if analysis is None:
+            keys = identity_keys(candidate)
+            with self._lock:
+                future = next((self._inflight[key] for key in keys if key in self._inflight), None)
+                owner = future is None
+                if owner:
+                    future = Future()
+                    for key in keys:
+                        self._inflight[key] = future
+            if owner:
+                # Saved by an earlier run: score again for the caller, but keep one output row
+                already_saved = state is not None and state.is_done(candidate)
+                try:
+                    self.processor.budget.check("scoring")
+                    if state is not None and not already_saved:
+                        candidate['state_id'] = state.start(candidate)
+                    analysis = self.processor.score_candidate(candidate)
+                    self.processor.remember_decision(candidate, analysis)
+                    future.set_result(analysis)
+                except BudgetExhausted as e:
+                    future.set_exception(e)
+                    raise
+                except Exception as e:
+                    if state is not None:
+                        state.record_failure(candidate.get('state_id'), str(e))
+                    if self.processor.dead_letters is not None:
+                        e = CandidateDeferred(self.processor.dead_letters.add(candidate, e), e)
+                    future.set_exception(e)
+                    raise e
+                finally:
+                    with self._lock:
+                        for key in keys:
+                            self._inflight.pop(key, None)
+                source = "scored"
+            else:
+                analysis = future.result()
+                source = "coalesced"
+        self.count(source)
+
+        result = dict(analysis)
+        result['email'] = candidate['email'] or analysis.get('email', '')
+        result['linkedin'] = candidate['linkedin'] or analysis.get('linkedin', '')
+        row_number = row_number if isinstance(row_number, int) else None
+        if source == "scored" and not already_saved:
+            state_id = None
+            if state is not None:
+                state_id = candidate.get('state_id') or state.resolve(candidate)
+            self.writer.submit(result, row_number, state_id)
+        elif row_number:
+            # The applicant already has an output row, or its owner request is writing one
+            self.writer.submit(None, row_number)
+        return {
+            "decision": result.get('priority', ''),
+            "source": source,
+            "partial": bool(result.get('partial')),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+            "result": result
+        }
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def health(self) -> Dict:
+        return {
+            "status": "ok",
+            "prompt": self.processor.control_panel.snapshot().prompt.name,
+            "service": self.snapshot(),
+            "writer": self.writer.snapshot(),
+            "concurrency": self.processor.concurrency.stats(),
+            "budget": self.processor.budget.stats()
+        }
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: Optional[ScoringService] = None,
+                 max_body_bytes: int = 65536, ingest_queue=None):
+        super().__init__(address, ScoringHandler)
+        self.service = service
+        self.max_body_bytes = max_body_bytes
+        self.ingest_queue = ingest_queue
+        # Shared secret form providers send with each webhook; unchecked when unset
+        self.ingest_token = os.getenv('INGEST_TOKEN')
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """POST /score with {"email", "linkedin"} JSON to score now; POST /signup
+    with a form submission to queue it; GET /health for stats."""
+
+    def do_GET(self):
+        if self.path.rstrip('/') != '/health':
+            self._send(404, {"error": "not found"})
+            return
+        body = self.server.service.health() if self.server.service else {"status": "ok"}
+        if self.server.ingest_queue:
+            body["queue"] = self.server.ingest_queue.counts()
+        self._send(200, body)
+
+    def do_POST(self):
+        path = self.path.split('?', 1)[0].rstrip('/')
+        handlers = {'/score': self.server.service, '/signup': self.server.ingest_queue}
+        if handlers.get(path) is None:
+            self._send(404, {"error": "not found"})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > self.server.max_body_bytes:
+            self._send(413, {"error": "request body too large"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(payload, dict):
+                raise InvalidRequest("body must be a JSON object")
+            if path == '/signup':
+                self._signup(payload)
+            else:
+                self._send(200, self.server.service.score(payload))
+        except (InvalidRequest, json.JSONDecodeError) as e:
+            self._send(400, {"error": str(e)})
+        except CandidateDeferred as e:
+            self.server.service.count("deferred")
+            self._send(503, {"error": str(e), **e.entry})
+        except BudgetExhausted as e:
+            self._send(429, {"error": str(e)})
+        except Exception as e:
+            if path == '/score':
+                self.server.service.count("errors")
+            print(f"Error handling {path}: {e}")
+            self._send(500, {"error": "request failed"})
+
+    def _signup(self, payload: Dict):
+        token = self.server.ingest_token
+        if token and not hmac.compare_digest(self.headers.get('X-Webhook-Token', ''), token):
+            self._send(401, {"error": "invalid webhook token"})
+            return
+        # Acknowledged only once the submission is committed to the queue
+        self._send(202, self.server.ingest_queue.enqueue(payload))
+
+    def _send(self, status: int, body: Dict):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} - {format % args}")
+
+def serve(processor, host: Optional[str] = None, port: Optional[int] = None):
+    """Run the scoring service until interrupted, then write any queued results."""
+    controls = processor.control_panel.config.get("server_controls", {})
+    host = host or controls.get("host", "127.0.0.1")
+    port = port or controls.get("port", 8080)
+    writer = BatchedResultWriter(
+        processor.sheets,
+        processor.sheet_id,
+        batch_size=controls.get("write_batch_size", 50),
+        max_delay=controls.get("write_max_delay", 2.0),
+        state=processor.state,
+        published=processor.storage == "sheets"
+    )
+    service = ScoringService(processor, writer)
+    server = ScoringServer((host, port), service, controls.get("max_body_bytes", 65536),
+                           ingest_queue=processor.open_ingest_queue())
+
+    writer.start()
+    if processor.config_watcher:
+        processor.config_watcher.start()
+    print(f"\nScoring service listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down scoring service")
+    finally:
+        server.server_close()
+        writer.close()
+        if processor.config_watcher:
+            processor.config_watcher.stop()
+        processor.inference.save_state()
+        print(f"Requests: {service.stats['requests']}, scored: {service.stats['scored']}, "
+              f"reused: {service.stats['reused']}, coalesced: {service.stats['coalesced']}")
+        print(f"Results written: {writer.stats['written']} in {writer.stats['batches']} batches")
+
+def serve_ingest(ingest_queue, host: Optional[str] = None, port: Optional[int] = None,
+                 control_panel=None):
+    """Run only the signup webhook, without loading the scoring pipeline."""
+    from control_panel import ControlPanel
+    controls = (control_panel or ControlPanel()).config.get("server_controls", {})
+    host = host or controls.get("host", "127.0.0.1")
+    port = port or controls.get("port", 8080)
+    server = ScoringServer((host, port), max_body_bytes=controls.get("max_body_bytes", 65536),
+                           ingest_queue=ingest_queue)
+    print(f"\nSignup webhook listening on http://{host}:{server.server_address[1]}/signup")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down signup webhook")
+    finally:
+        server.server_close()
+        print(f"Signup queue: {ingest_queue.counts()}")
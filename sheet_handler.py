@@ -266,25 +266,66 @@
 import os
 import re
 import json
-from typing import List, Dict, Set, Optional
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Set, Optional, Tuple, Iterator
 from dotenv import load_dotenv
 from control_panel import ControlPanel
+from storage import CandidateStore
 
 load_dotenv()
 
-class SheetHandler:
+def coalesce_row_ranges(rows) -> List[Tuple[int, int]]:
+    """Merge 1-based row numbers into contiguous (start, end) ranges, inclusive."""
+    ranges = []
+    for row in sorted(set(rows)):
+        if ranges and row == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], row)
+        else:
+            ranges.append((row, row))
+    return ranges
+
+def column_letter(index: int) -> str:
+    """Convert a 1-based column index to its A1 letter (1 -> A, 27 -> AA)."""
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters or "A"
+
+class SheetHandler(CandidateStore):
+    accepts_input_rows = True
+    updates_in_place = True
+
     def __init__(self, control_panel: Optional[ControlPanel] = None):
-        self.controls = control_panel or ControlPanel()
+        super().__init__(control_panel)
+        from budget import get_budget
+        self.budget = get_budget(self.controls)
         self.service = self._setup_sheets_service()
-        self.EMAIL_PATTERN = r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+"
-        self.LINKEDIN_PATTERN = r"https?://(?:www\.)?linkedin\.com/in/[a-zA-Z0-9\-_/]+"
-        self.processed_rows = set()
+        self._reader_service = None
+
+        # Highlighting is queued per spreadsheet and flushed as one batchUpdate
+        self._pending_highlights: Dict[str, Set[int]] = {}
+
+        # Sheet metadata keyed by spreadsheet id, then sheet title
+        self._sheet_metadata: Dict[str, Dict[str, Dict]] = {}
+        self._missing_sheets: Set[Tuple[str, str]] = set()
+        self._conditional_installed: Set[str] = set()
+
+    @property
+    def highlight_batch_size(self) -> int:
+        """Rows per highlight or update request; follows config reloads."""
+        return self.controls.snapshot().sections["sheet_controls"].get("highlight_batch_size", 500)
 
     def _setup_sheets_service(self):
         """Initialize Google Sheets API service."""
         try:
+            # Google client libraries are imported on first use
+            import httplib2
+            from google.oauth2 import service_account
+            from google_auth_httplib2 import AuthorizedHttp
+            from googleapiclient.discovery import build
+            from googleapiclient.http import HttpRequest
+
             credentials_json = os.getenv('GOOGLE_SHEETS_CREDENTIALS')
             if not credentials_json:
                 raise ValueError("Missing Google Sheets credentials")
@@ -294,72 +335,96 @@ class SheetHandler:
                 credentials_info,
                 scopes=['https://www.googleapis.com/auth/spreadsheets']
             )
-            return build('sheets', 'v4', credentials=credentials)
+            # Bound every Sheets request; the default client waits forever
+            timeout = self.controls.config.get("deadline_controls", {}).get("sheets_timeout", 30)
+            http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=timeout))
+
+            # Every write request counts against the Sheets budget
+            budget = self.budget
+            class MeteredRequest(HttpRequest):
+                def execute(self, *args, **kwargs):
+                    response = super().execute(*args, **kwargs)
+                    if self.method != 'GET':
+                        budget.record("sheets_writes")
+                    return response
+
+            return build('sheets', 'v4', http=http, requestBuilder=MeteredRequest)
         except Exception as e:
             print(f"Failed to setup Google Sheets: {e}")
             raise
 
-    def _clean_cell_value(self, value: str) -> str:
-        """Clean whitespace and normalize cell value."""
-        if not value:
-            return ""
-        return ' '.join(str(value).strip().split())
-
-    def _clean_row_data(self, row: list) -> list:
-        """Clean all cells in a row."""
-        return [self._clean_cell_value(cell) for cell in row]
-
-    def get_candidates(self, spreadsheet_id: str) -> List[Dict]:
-        """Get unprocessed candidates from sheet."""
+    def _get_reader_service(self):
+        """Get a separate Sheets client for the background chunk reader."""
+        if self._reader_service is None:
+            self._reader_service = self._setup_sheets_service()
+        return self._reader_service
+
+    def _fetch_rows(self, spreadsheet_id: str, range_name: str) -> List[list]:
+        """Fetch one range of input rows on the reader client."""
+        result = self._get_reader_service().spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=range_name
+        ).execute()
+        return result.get('values', [])
+
+    def iter_candidates(self, spreadsheet_id: str) -> Iterator[Dict]:
+        """Yield unprocessed candidates, reading the input sheet in row chunks.
+
+        The next chunk is fetched in the background while the current one is
+        consumed, so at most two chunks are held in memory at a time.
+        """
+        executor = None
         try:
-            processed = self._get_processed_candidates(spreadsheet_id)
+            processed = self._get_processed_candidates(spreadsheet_id) if self.state is None else set()
             input_sheet = self.controls.config["sheet_controls"]["input_sheet_name"]
-            
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range=f"'{input_sheet}'!A:Z"
-            ).execute()
-            
-            if 'values' not in result:
-                return []
-                
-            headers = self._clean_row_data(result['values'][0])
-            candidates = []
-
-            for row_idx, raw_row in enumerate(result['values'][1:], start=2):
-                try:
-                    row = self._clean_row_data(raw_row)
-                    candidate = {
-                        'row_number': row_idx,
-                        'row_data': row
-                    }
-                    
-                    # Extract email and LinkedIn from row
-                    row_text = ' '.join(row)
-                    emails = re.findall(self.EMAIL_PATTERN, row_text)
-                    linkedin_urls = re.findall(self.LINKEDIN_PATTERN, row_text)
-                    
-                    if emails:
-                        candidate['email'] = emails[0].lower()
-                    if linkedin_urls:
-                        candidate['linkedin'] = linkedin_urls[0]
-                        
-                    # Check if unprocessed
-                    if not any(id in processed for id in [
-                        candidate.get('email', '').lower(), 
-                        candidate.get('linkedin', '').lower()
-                    ] if id):
-                        candidates.append(candidate)
-                        
-                except Exception as e:
-                    print(f"Error processing row {row_idx}: {e}")
-                    continue
-                    
-            return candidates
-            
+            chunk_size = max(self.controls.config["sheet_controls"].get("read_chunk_size", 2000), 1)
+            input_info = self._get_sheet_info(spreadsheet_id, input_sheet) or {}
+            last_column = column_letter(max(input_info.get("column_count", 0), 26))
+            row_count = input_info.get("row_count", 0)
+
+            def chunk_range(start: int) -> str:
+                return f"'{input_sheet}'!A{start}:{last_column}{start + chunk_size - 1}"
+
+            executor = ThreadPoolExecutor(max_workers=1)
+            start = 1
+            future = executor.submit(self._fetch_rows, spreadsheet_id, chunk_range(start))
+
+            while future is not None:
+                rows = future.result()
+                next_start = start + chunk_size
+
+                # Keep reading past the cached grid size while chunks come back full
+                if next_start <= row_count or len(rows) == chunk_size:
+                    future = executor.submit(self._fetch_rows, spreadsheet_id, chunk_range(next_start))
+                else:
+                    future = None
+
+                if start == 1 and rows:
+                    headers = self._clean_row_data(rows[0])
+                    while headers and not headers[-1]:
+                        headers.pop()
+                    if input_info and headers != input_info["header"]:
+                        # Header row changed since the metadata was cached
+                        input_info["header"] = headers
+
+                for row_idx, raw_row in enumerate(rows, start=start):
+                    if row_idx == 1:
+                        continue
+                    try:
+                        candidate = self._parse_row(row_idx, raw_row, processed)
+                        if candidate:
+                            yield candidate
+                    except Exception as e:
+                        print(f"Error processing row {row_idx}: {e}")
+                        continue
+
+                start = next_start
+
         except Exception as e:
             print(f"Error getting candidates: {e}")
-            return []
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
 
     def _get_processed_candidates(self, spreadsheet_id: str) -> Set[str]:
         """Get set of processed emails and LinkedIn URLs."""
@@ -368,17 +433,14 @@ class SheetHandler:
             
             result = self.service.spreadsheets().values().get(
                 spreadsheetId=spreadsheet_id,
-                range=f"'{output_sheet}'!A:L"
+                range=f"'{output_sheet}'!A:{self._output_last_column()}"
             ).execute()
             
             processed = set()
             if 'values' in result:
                 # Skip header row
                 for row in result['values'][1:]:
-                    clean_row = self._clean_row_data(row)
-                    row_text = ' '.join(clean_row)
-                    processed.update(email.lower() for email in re.findall(self.EMAIL_PATTERN, row_text))
-                    processed.update(url.lower() for url in re.findall(self.LINKEDIN_PATTERN, row_text))
+                    processed.update(self._extract_identities(row))
                     
             return processed
             
@@ -389,85 +451,475 @@ class SheetHandler:
     def save_analysis(self, spreadsheet_id: str, data: Dict, input_row_number: Optional[int] = None):
         """Save analysis results to sheet."""
         try:
+            config = self.controls.snapshot()
+
             # Mark input row if enabled
-            if input_row_number and self.controls.should_highlight_rows():
+            if input_row_number and config.highlight_rows:
                 self.mark_row_processed(spreadsheet_id, input_row_number)
 
-            # Get required fields from control panel
-            fields = self.controls.get_required_fields()
-            
             # Prepare row data
-            row = [self._clean_cell_value(str(data.get(field, ''))) for field in fields]
+            row = self._build_output_row(data)
+            self._prepare_output_sheet(spreadsheet_id, config)
 
             # Save to output sheet
-            output_sheet = self.controls.config["sheet_controls"]["output_sheet_name"]
             self.service.spreadsheets().values().append(
                 spreadsheetId=spreadsheet_id,
-                range=f"'{output_sheet}'!A:L",
+                range=f"'{config.output_sheet}'!A:{self._output_last_column()}",
                 valueInputOption='RAW',
                 insertDataOption='INSERT_ROWS',
                 body={'values': [row]}
             ).execute()
 
-            # Write headers if enabled and this is first row
-            if self.controls.config["sheet_controls"].get("write_headers"):
-                check = self.service.spreadsheets().values().get(
+        except Exception as e:
+            print(f"Error saving analysis: {e}")
+
+    def save_analyses(self, spreadsheet_id: str, results: List[Tuple[Dict, Optional[int]]]):
+        """Save several analysis results with one values().append call."""
+        if not results:
+            return
+        try:
+            config = self.controls.snapshot()
+            if config.highlight_rows:
+                for _, input_row_number in results:
+                    if input_row_number:
+                        self.mark_row_processed(spreadsheet_id, input_row_number)
+
+            rows = [self._build_output_row(data) for data, _ in results]
+            self._prepare_output_sheet(spreadsheet_id, config)
+            self.service.spreadsheets().values().append(
+                spreadsheetId=spreadsheet_id,
+                range=f"'{config.output_sheet}'!A:{self._output_last_column()}",
+                valueInputOption='RAW',
+                insertDataOption='INSERT_ROWS',
+                body={'values': rows}
+            ).execute()
+
+        except Exception as e:
+            print(f"Error saving {len(results)} analyses: {e}")
+
+    def _prepare_output_sheet(self, spreadsheet_id: str, config):
+        """Install conditional formatting and write headers to an empty output sheet, if enabled."""
+        if config.conditional_formatting:
+            self._ensure_conditional_formatting(spreadsheet_id)
+
+        if config.write_headers:
+            output_sheet = config.output_sheet
+            output_info = self._get_sheet_info(spreadsheet_id, output_sheet)
+            if output_info is not None and not output_info["header"]:
+                fields = list(config.required_fields)
+                self.service.spreadsheets().values().update(
                     spreadsheetId=spreadsheet_id,
-                    range=f"'{output_sheet}'!A1:A"
+                    range=f"'{output_sheet}'!A1",
+                    valueInputOption='RAW',
+                    body={'values': [fields]}
                 ).execute()
-                
-                if 'values' not in check:
-                    self.service.spreadsheets().values().update(
+                output_info["header"] = fields
+
+    def append_rows(self, spreadsheet_id: str, rows: List[List[str]]) -> int:
+        """Append several output rows with one values().append call."""
+        if not rows:
+            return 0
+        try:
+            output_sheet = self.controls.config["sheet_controls"]["output_sheet_name"]
+            self.service.spreadsheets().values().append(
+                spreadsheetId=spreadsheet_id,
+                range=f"'{output_sheet}'!A:{self._output_last_column()}",
+                valueInputOption='RAW',
+                insertDataOption='INSERT_ROWS',
+                body={'values': rows}
+            ).execute()
+            return len(rows)
+        except Exception as e:
+            print(f"Error appending rows: {e}")
+            return 0
+
+    def append_input_rows(self, spreadsheet_id: str, records: List[Dict[str, str]]) -> Optional[List[Optional[int]]]:
+        """Append raw submissions to the input sheet with one values().append call.
+
+        Values are placed under matching input headers (case-insensitive);
+        an empty sheet gets the first submission's keys as its header, and
+        keys the header lacks are added to it as new columns first.
+
+        Returns:
+            Input row numbers in record order, or None if the append failed
+        """
+        if not records:
+            return []
+        try:
+            input_sheet = self.controls.snapshot().input_sheet
+            input_info = self._get_sheet_info(spreadsheet_id, input_sheet)
+            header = list(input_info["header"]) if input_info else []
+            columns = [name.strip().lower() for name in header]
+            # Answers to questions the sheet has no column for get a column of their own
+            added = []
+            for record in records:
+                for key in record:
+                    if key.strip().lower() not in columns:
+                        columns.append(key.strip().lower())
+                        added.append(key.strip())
+            if added:
+                header.extend(added)
+                if input_info is not None and input_info["column_count"] < len(header):
+                    self.service.spreadsheets().batchUpdate(
                         spreadsheetId=spreadsheet_id,
-                        range=f"'{output_sheet}'!A1",
-                        valueInputOption='RAW',
-                        body={'values': [fields]}
+                        body={'requests': [{'appendDimension': {
+                            'sheetId': input_info['sheet_id'],
+                            'dimension': 'COLUMNS',
+                            'length': len(header) - input_info["column_count"]
+                        }}]}
                     ).execute()
+                self.service.spreadsheets().values().update(
+                    spreadsheetId=spreadsheet_id,
+                    range=f"'{input_sheet}'!A1",
+                    valueInputOption='RAW',
+                    body={'values': [header]}
+                ).execute()
+                if input_info is not None:
+                    input_info["header"] = list(header)
+                    input_info["column_count"] = max(input_info["column_count"], len(header))
+
+            rows = []
+            for record in records:
+                values = {key.strip().lower(): value for key, value in record.items()}
+                rows.append([self._clean_cell_value(values.get(column, '')) for column in columns])
+
+            result = self.service.spreadsheets().values().append(
+                spreadsheetId=spreadsheet_id,
+                range=f"'{input_sheet}'!A1",
+                valueInputOption='RAW',
+                insertDataOption='INSERT_ROWS',
+                body={'values': rows}
+            ).execute()
+            match = re.search(r'![A-Z]+(\d+)', result.get('updates', {}).get('updatedRange', ''))
+            if not match:
+                return [None] * len(rows)
+            first = int(match.group(1))
+            return list(range(first, first + len(rows)))
 
         except Exception as e:
-            print(f"Error saving analysis: {e}")
+            print(f"Error appending input rows: {e}")
+            return None
+
+    def iter_output_rows(self, spreadsheet_id: str) -> Iterator[Tuple[int, List[str]]]:
+        """Yield output rows with their sheet row numbers, skipping the header."""
+        output_sheet = self.controls.config["sheet_controls"]["output_sheet_name"]
+        result = self.service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=f"'{output_sheet}'!A:{self._output_last_column()}"
+        ).execute()
+        for row_number, row in enumerate(result.get('values', [])[1:], start=2):
+            yield row_number, row
+
+    def iter_results(self, spreadsheet_id: Optional[str] = None) -> Iterator[List[str]]:
+        """Yield output rows, from SHEET_ID unless a spreadsheet is given."""
+        for _, row in self.iter_output_rows(spreadsheet_id or os.getenv('SHEET_ID')):
+            yield row
+
+    def update_output_rows(self, spreadsheet_id: str, updates: Dict[int, Dict]) -> int:
+        """Overwrite output rows in place with one values().batchUpdate per batch.
+
+        Consecutive rows are sent as a single range.
+        """
+        if not updates:
+            return 0
+        output_sheet = self.controls.config["sheet_controls"]["output_sheet_name"]
+        last_column = self._output_last_column()
+        data = [{
+            'range': f"'{output_sheet}'!A{start}:{last_column}{end}",
+            'values': [self._build_output_row(updates[row]) for row in range(start, end + 1)]
+        } for start, end in coalesce_row_ranges(updates)]
+
+        updated = 0
+        for i in range(0, len(data), self.highlight_batch_size):
+            batch = data[i:i + self.highlight_batch_size]
+            try:
+                self.service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=spreadsheet_id,
+                    body={'valueInputOption': 'RAW', 'data': batch}
+                ).execute()
+                updated += sum(len(entry['values']) for entry in batch)
+            except Exception as e:
+                print(f"Error updating output rows: {e}")
+        return updated
+
+    def flush(self, spreadsheet_id: Optional[str] = None):
+        """Send queued highlights."""
+        self.flush_highlights(spreadsheet_id)
 
     def mark_row_processed(self, spreadsheet_id: str, row_number: int):
-        """Mark input row as processed with highlighting."""
+        """Queue input row for highlighting; flushed in batches."""
         if row_number in self.processed_rows:
             return
-            
+
+        self.processed_rows.add(row_number)
+        pending = self._pending_highlights.setdefault(spreadsheet_id, set())
+        pending.add(row_number)
+
+        if len(pending) >= self.highlight_batch_size:
+            self.flush_highlights(spreadsheet_id)
+
+    def _get_sheet_metadata(self, spreadsheet_id: str, refresh: bool = False) -> Dict[str, Dict]:
+        """Get sheetIds, grid sizes and header rows, cached until refreshed."""
+        if not refresh and spreadsheet_id in self._sheet_metadata:
+            return self._sheet_metadata[spreadsheet_id]
+
+        input_sheet, output_sheet = self.controls.get_sheet_names()
+        properties = 'properties(sheetId,title,gridProperties(rowCount,columnCount)),' \
+                     'conditionalFormats(booleanRule(condition(values(userEnteredValue))))'
         try:
-            input_sheet = self.controls.config["sheet_controls"]["input_sheet_name"]
-            color = self.controls.get_highlight_color()
-            
-            # Get sheet width
-            result = self.service.spreadsheets().values().get(
+            # One fields-masked call returns properties plus both header rows
+            result = self.service.spreadsheets().get(
                 spreadsheetId=spreadsheet_id,
-                range=f"'{input_sheet}'!A1:Z1"
+                ranges=[f"'{input_sheet}'!1:1", f"'{output_sheet}'!1:1"],
+                includeGridData=True,
+                fields=f'sheets({properties},data(rowData(values(formattedValue))))'
             ).execute()
-            width = len(result.get('values', [[]])[0]) if 'values' in result else 10
-
-            # Apply highlighting
-            request = {
-                'repeatCell': {
-                    'range': {
-                        'sheetId': 0,
-                        'startRowIndex': row_number - 1,
-                        'endRowIndex': row_number,
+        except Exception as e:
+            # A missing sheet name invalidates the ranges; fall back to properties only
+            print(f"Error getting sheet headers, retrying without them: {e}")
+            try:
+                result = self.service.spreadsheets().get(
+                    spreadsheetId=spreadsheet_id,
+                    fields=f'sheets({properties})'
+                ).execute()
+            except Exception as e:
+                print(f"Error getting sheet metadata: {e}")
+                return self._sheet_metadata.get(spreadsheet_id, {})
+
+        metadata = {}
+        for sheet in result.get('sheets', []):
+            props = sheet.get('properties', {})
+            grid = props.get('gridProperties', {})
+            header = []
+            for data in sheet.get('data', []):
+                row_data = data.get('rowData', [])
+                if row_data:
+                    header = self._clean_row_data(
+                        [cell.get('formattedValue', '') for cell in row_data[0].get('values', [])]
+                    )
+                    while header and not header[-1]:
+                        header.pop()
+            rule_formulas = set()
+            for rule in sheet.get('conditionalFormats', []):
+                for value in rule.get('booleanRule', {}).get('condition', {}).get('values', []):
+                    rule_formulas.add(value.get('userEnteredValue', ''))
+            metadata[props.get('title', '')] = {
+                'sheet_id': props.get('sheetId', 0),
+                'row_count': grid.get('rowCount', 0),
+                'column_count': grid.get('columnCount', 0),
+                'header': header,
+                'rule_formulas': rule_formulas
+            }
+
+        self._sheet_metadata[spreadsheet_id] = metadata
+        return metadata
+
+    def _get_sheet_info(self, spreadsheet_id: str, sheet_name: str) -> Optional[Dict]:
+        """Get cached metadata for one sheet, refreshing once if it is missing."""
+        info = self._get_sheet_metadata(spreadsheet_id).get(sheet_name)
+        if info is None and (spreadsheet_id, sheet_name) not in self._missing_sheets:
+            info = self._get_sheet_metadata(spreadsheet_id, refresh=True).get(sheet_name)
+            if info is None:
+                print(f"Sheet '{sheet_name}' not found in spreadsheet")
+                self._missing_sheets.add((spreadsheet_id, sheet_name))
+        return info
+
+    def _invalidate_sheet_metadata(self, spreadsheet_id: str):
+        """Drop cached metadata so the next lookup refetches it."""
+        self._sheet_metadata.pop(spreadsheet_id, None)
+        self._missing_sheets = {key for key in self._missing_sheets if key[0] != spreadsheet_id}
+
+    def _get_input_width(self, spreadsheet_id: str) -> int:
+        """Get input sheet header width from cached metadata."""
+        input_sheet = self.controls.config["sheet_controls"]["input_sheet_name"]
+        info = self._get_sheet_info(spreadsheet_id, input_sheet)
+        if not info:
+            return 26
+        return len(info["header"]) or info["column_count"] or 26
+
+    def _output_last_column(self) -> str:
+        """Get last output column letter from the configured fields."""
+        return column_letter(max(len(self.controls.snapshot().required_fields), 1))
+
+    def _marker_column_index(self, input_info: Dict) -> int:
+        """Get 0-based index of the processed-marker column in the input sheet.
+
+        Without a marker header this is the first column past the grid: the
+        cached header drops trailing blank cells, so the column after it may
+        still hold unlabeled data.
+        """
+        marker = self.controls.config["sheet_controls"].get("processed_marker_header", "processed")
+        header = input_info["header"]
+        if marker in header:
+            return header.index(marker)
+        return max(len(header), input_info["column_count"])
+
+    def _conditional_rule_request(self, sheet_id: int, width: int, formula: str, color: Dict) -> Dict:
+        """Build an addConditionalFormatRule request covering all data rows."""
+        return {
+            'addConditionalFormatRule': {
+                'rule': {
+                    'ranges': [{
+                        'sheetId': sheet_id,
+                        'startRowIndex': 1,
                         'startColumnIndex': 0,
                         'endColumnIndex': width
-                    },
-                    'cell': {
-                        'userEnteredFormat': {
-                            'backgroundColor': color
-                        }
-                    },
-                    'fields': 'userEnteredFormat.backgroundColor'
-                }
+                    }],
+                    'booleanRule': {
+                        'condition': {
+                            'type': 'CUSTOM_FORMULA',
+                            'values': [{'userEnteredValue': formula}]
+                        },
+                        'format': {'backgroundColor': color}
+                    }
+                },
+                'index': 0
             }
+        }
+
+    def _ensure_conditional_formatting(self, spreadsheet_id: str):
+        """Install priority and processed-marker colour rules once per run."""
+        if spreadsheet_id in self._conditional_installed:
+            return
+        self._conditional_installed.add(spreadsheet_id)
+
+        try:
+            input_sheet, output_sheet = self.controls.get_sheet_names()
+            requests = []
+
+            # Output rows are coloured by the value of their priority cell
+            fields = self.controls.get_required_fields()
+            output_info = self._get_sheet_info(spreadsheet_id, output_sheet)
+            if output_info is not None and 'priority' in fields:
+                priority_column = column_letter(fields.index('priority') + 1)
+                for priority, color in self.controls.get_priority_colors().items():
+                    formula = f'=LOWER(${priority_column}2)="{priority}"'
+                    if formula not in output_info['rule_formulas']:
+                        requests.append(self._conditional_rule_request(
+                            output_info['sheet_id'], len(fields), formula, color
+                        ))
+                        output_info['rule_formulas'].add(formula)
+
+            # Input rows are coloured once their marker cell is non-empty
+            marker_header = None
+            input_info = self._get_sheet_info(spreadsheet_id, input_sheet)
+            if input_info is not None:
+                marker_index = self._marker_column_index(input_info)
+                if marker_index >= len(input_info['header']):
+                    marker_header = self.controls.config["sheet_controls"].get("processed_marker_header", "processed")
+                if input_info['column_count'] <= marker_index:
+                    requests.append({
+                        'appendDimension': {
+                            'sheetId': input_info['sheet_id'],
+                            'dimension': 'COLUMNS',
+                            'length': marker_index + 1 - input_info['column_count']
+                        }
+                    })
+                    input_info['column_count'] = marker_index + 1
+
+                formula = f'=${column_letter(marker_index + 1)}2<>""'
+                if formula not in input_info['rule_formulas']:
+                    requests.append(self._conditional_rule_request(
+                        input_info['sheet_id'], marker_index + 1, formula,
+                        self.controls.get_highlight_color()
+                    ))
+                    input_info['rule_formulas'].add(formula)
+
+            if requests:
+                self.service.spreadsheets().batchUpdate(
+                    spreadsheetId=spreadsheet_id,
+                    body={'requests': requests}
+                ).execute()
+                print(f"Installed {len(requests)} conditional formatting requests")
+
+            if marker_header:
+                self.service.spreadsheets().values().update(
+                    spreadsheetId=spreadsheet_id,
+                    range=f"'{input_sheet}'!{column_letter(marker_index + 1)}1",
+                    valueInputOption='RAW',
+                    body={'values': [[marker_header]]}
+                ).execute()
+                # Keep the cached header aligned with the grid so the marker's index is its column
+                header = input_info['header']
+                header.extend([''] * (marker_index - len(header)))
+                header.append(marker_header)
 
-            self.service.spreadsheets().batchUpdate(
-                spreadsheetId=spreadsheet_id,
-                body={'requests': [request]}
-            ).execute()
-            
-            self.processed_rows.add(row_number)
-            
         except Exception as e:
-            print(f"Error marking row as processed: {e}")
\ No newline at end of file
+            print(f"Error installing conditional formatting: {e}")
+            self._conditional_installed.discard(spreadsheet_id)
+            self._invalidate_sheet_metadata(spreadsheet_id)
+
+    def flush_highlights(self, spreadsheet_id: Optional[str] = None):
+        """Send queued highlights as one batched call over coalesced row ranges."""
+        spreadsheet_ids = [spreadsheet_id] if spreadsheet_id else list(self._pending_highlights)
+
+        for sheet_id in spreadsheet_ids:
+            rows = self._pending_highlights.pop(sheet_id, None)
+            if not rows:
+                continue
+
+            try:
+                input_sheet = self.controls.config["sheet_controls"]["input_sheet_name"]
+                info = self._get_sheet_info(sheet_id, input_sheet)
+                if info is None:
+                    raise ValueError(f"Input sheet '{input_sheet}' not found")
+
+                if self.controls.use_conditional_formatting():
+                    self._write_processed_markers(sheet_id, input_sheet, info, rows)
+                else:
+                    self._write_highlight_ranges(sheet_id, info, rows)
+
+            except Exception as e:
+                print(f"Error marking rows as processed: {e}")
+                # Stale sheetIds are the usual cause; refetch metadata and retry next flush
+                self._invalidate_sheet_metadata(sheet_id)
+                self._pending_highlights.setdefault(sheet_id, set()).update(rows)
+
+    def _write_highlight_ranges(self, spreadsheet_id: str, input_info: Dict, rows: Set[int]):
+        """Colour rows directly with one repeatCell per contiguous range."""
+        color = self.controls.get_highlight_color()
+        width = self._get_input_width(spreadsheet_id)
+
+        requests = [{
+            'repeatCell': {
+                'range': {
+                    'sheetId': input_info['sheet_id'],
+                    'startRowIndex': start - 1,
+                    'endRowIndex': end,
+                    'startColumnIndex': 0,
+                    'endColumnIndex': width
+                },
+                'cell': {
+                    'userEnteredFormat': {
+                        'backgroundColor': color
+                    }
+                },
+                'fields': 'userEnteredFormat.backgroundColor'
+            }
+        } for start, end in coalesce_row_ranges(rows)]
+
+        self.service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={'requests': requests}
+        ).execute()
+        print(f"Highlighted {len(rows)} rows in {len(requests)} ranges")
+
+    def _write_processed_markers(self, spreadsheet_id: str, input_sheet: str, input_info: Dict, rows: Set[int]):
+        """Fill the marker column; conditional format rules do the colouring."""
+        self._ensure_conditional_formatting(spreadsheet_id)
+        marker = self.controls.config["sheet_controls"].get("processed_marker_header", "processed")
+        if marker not in input_info['header']:
+            # Never write markers into a column that was not labelled for them
+            raise ValueError(f"Input sheet has no '{marker}' column")
+        column = column_letter(self._marker_column_index(input_info) + 1)
+
+        data = [{
+            'range': f"'{input_sheet}'!{column}{start}:{column}{end}",
+            'values': [[marker]] * (end - start + 1)
+        } for start, end in coalesce_row_ranges(rows)]
+
+        self.service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={'valueInputOption': 'RAW', 'data': data}
+        ).execute()
+        print(f"Marked {len(rows)} rows processed in {len(data)} ranges")
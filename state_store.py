@@ -0,0 +1,215 @@
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from identity import identity_keys
+
+# Lifecycle stages, in order; saved/published candidates are never picked up again
+PENDING = 'pending'
+SCRAPED = 'scraped'
+SCORED = 'scored'
+SAVED = 'saved'
+PUBLISHED = 'published'
+FAILED = 'failed'
+DONE = (SAVED, PUBLISHED)
+
+def scrape_hash(scrape_result: Dict) -> str:
+    """Fingerprint the scraped inputs so a re-scrape can be compared with the last one."""
+    from compaction import profile_results
+    payload = [profile_results(scrape_result.get('linkedin_data')), scrape_result.get('company_research') or '']
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+class CandidateState:
+    """SQLite record of where each applicant is in the pipeline.
+
+    One row per applicant, found through any canonical email or LinkedIn
+    key of any of its input rows. It holds the stage status and timestamps,
+    the scrape fingerprint, the decision with the prompt version that made
+    it, and the email draft status. Input row numbers are kept so processed
+    rows survive a restart; they refer to the one input the store is used
+    with.
+    """
+
+    def __init__(self, db_path: str = "candidate_state.db"):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, identity TEXT NOT NULL, email TEXT, linkedin TEXT, "
+            "status TEXT NOT NULL, scrape_hash TEXT, decision TEXT, prompt_version TEXT, model TEXT, "
+            "email_status TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "scraped_at REAL, scored_at REAL, saved_at REAL, published_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS candidates_status ON candidates (status, updated_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS candidates_identity ON candidates (identity)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS candidate_keys ("
+            "identity TEXT PRIMARY KEY, candidate_id INTEGER NOT NULL REFERENCES candidates(id))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS candidate_rows ("
+            "row_number INTEGER PRIMARY KEY, candidate_id INTEGER NOT NULL REFERENCES candidates(id))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS candidate_rows_candidate ON candidate_rows (candidate_id)")
+        self.conn.commit()
+
+    def _rows_of(self, candidate: Dict) -> List[Dict]:
+        return [candidate] + candidate.get('duplicates', [])
+
+    def _keys_of(self, candidate: Dict) -> List[str]:
+        keys = []
+        for row in self._rows_of(candidate):
+            keys.extend(key for key in identity_keys(row) if key not in keys)
+        return keys
+
+    def _find(self, keys: List[str]) -> Optional[int]:
+        if not keys:
+            return None
+        placeholders = ','.join('?' * len(keys))
+        row = self.conn.execute(
+            f"SELECT candidate_id FROM candidate_keys WHERE identity IN ({placeholders}) LIMIT 1", keys
+        ).fetchone()
+        return row[0] if row else None
+
+    def resolve(self, candidate: Dict, status: str = PENDING) -> Optional[int]:
+        """Get the applicant's id, creating its record if new; None without an identity."""
+        keys = self._keys_of(candidate)
+        if not keys:
+            return None
+        now = time.time()
+        with self._lock:
+            candidate_id = self._find(keys)
+            if candidate_id is None:
+                candidate_id = self.conn.execute(
+                    "INSERT INTO candidates (identity, email, linkedin, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (keys[0], candidate.get('email', ''), candidate.get('linkedin', ''), status, now, now)
+                ).lastrowid
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO candidate_keys (identity, candidate_id) VALUES (?, ?)",
+                ((key, candidate_id) for key in keys)
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO candidate_rows (row_number, candidate_id) VALUES (?, ?)",
+                ((row['row_number'], candidate_id) for row in self._rows_of(candidate) if row.get('row_number'))
+            )
+            self.conn.commit()
+        return candidate_id
+
+    def _update(self, candidate_id: Optional[int], **values):
+        if candidate_id is None:
+            return
+        values['updated_at'] = time.time()
+        columns = ', '.join(f"{name} = ?" for name in values)
+        with self._lock:
+            self.conn.execute(f"UPDATE candidates SET {columns} WHERE id = ?", (*values.values(), candidate_id))
+            self.conn.commit()
+
+    def start(self, candidate: Dict, rescore: bool = False) -> Optional[int]:
+        """Record that work on an applicant has begun.
+
+        An applicant whose decision was already saved keeps that status
+        unless this is an explicit re-score.
+        """
+        candidate_id = self.resolve(candidate)
+        if candidate_id is None:
+            return None
+        statuses = () if rescore else DONE
+        with self._lock:
+            self.conn.execute(
+                f"UPDATE candidates SET status = ?, error = NULL, updated_at = ? "
+                f"WHERE id = ? AND status NOT IN ({','.join('?' * len(statuses))})",
+                (PENDING, time.time(), candidate_id, *statuses)
+            )
+            self.conn.commit()
+        return candidate_id
+
+    def record_scrape(self, candidate_id: Optional[int], scrape_result: Dict):
+        self._update(candidate_id, status=SCRAPED, scrape_hash=scrape_hash(scrape_result), scraped_at=time.time())
+
+    def record_decision(self, candidate_id: Optional[int], analysis: Dict, prompt_version: str, model: str):
+        self._update(
+            candidate_id,
+            status=SCORED,
+            decision=analysis.get('priority', ''),
+            prompt_version=prompt_version,
+            model=model,
+            email_status='drafted' if analysis.get('email_draft') else 'none',
+            scored_at=time.time()
+        )
+
+    def record_saved(self, candidate_id: Optional[int], published: bool = False):
+        """Record that the decision reached the output; published when that output is the sheet."""
+        now = time.time()
+        if published:
+            self._update(candidate_id, status=PUBLISHED, saved_at=now, published_at=now)
+        else:
+            self._update(candidate_id, status=SAVED, saved_at=now)
+
+    def record_failure(self, candidate_id: Optional[int], error: str):
+        self._update(candidate_id, status=FAILED, error=error[:500])
+
+    def get(self, candidate: Dict) -> Optional[Dict]:
+        """Get an applicant's record by any of its identity keys."""
+        with self._lock:
+            candidate_id = self._find(self._keys_of(candidate))
+            if candidate_id is None:
+                return None
+            cursor = self.conn.execute("SELECT * FROM candidates WHERE id = ?", (candidate_id,))
+            row = cursor.fetchone()
+            return dict(zip([column[0] for column in cursor.description], row))
+
+    def is_done(self, candidate: Dict) -> bool:
+        """Check whether an applicant's decision has already been saved."""
+        record = self.get(candidate)
+        return record is not None and record['status'] in DONE
+
+    def processed_rows(self) -> Set[int]:
+        """Get input rows whose applicant is done."""
+        placeholders = ','.join('?' * len(DONE))
+        with self._lock:
+            return {row_number for (row_number,) in self.conn.execute(
+                "SELECT r.row_number FROM candidate_rows r JOIN candidates c ON c.id = r.candidate_id "
+                f"WHERE c.status IN ({placeholders})", DONE
+            )}
+
+    def iter_status(self, *statuses: str, limit: Optional[int] = None) -> Iterator[Dict]:
+        """Yield applicants in the given stages, least recently updated first."""
+        placeholders = ','.join('?' * len(statuses))
+        query = (
+            "SELECT id, email, linkedin, status, error FROM candidates "
+            f"WHERE status IN ({placeholders}) ORDER BY updated_at"
+        )
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self.conn.execute(query, statuses).fetchall()
+        for candidate_id, email, linkedin, status, error in rows:
+            yield {'state_id': candidate_id, 'email': email or '', 'linkedin': linkedin or '',
+                   'status': status, 'error': error}
+
+    def import_results(self, records: Iterable[Dict], published: bool) -> int:
+        """Seed the store from an existing output so finished applicants are not redone."""
+        imported = 0
+        for record in records:
+            candidate_id = self.resolve(record, status=PUBLISHED if published else SAVED)
+            if candidate_id is not None:
+                self._update(candidate_id, decision=record.get('priority', ''))
+                imported += 1
+        return imported
+
+    def counts(self) -> Dict[str, int]:
+        """Get the number of applicants in each stage."""
+        with self._lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM candidates GROUP BY status").fetchall())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
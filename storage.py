@@ -0,0 +1,470 @@
+import os
+import re
+import csv
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from control_panel import ControlPanel
+from identity import iter_grouped
+
+class CandidateStore(ABC):
+    """Common surface shared by SheetHandler and the local storage backends.
+
+    Appending input rows and updating output rows in place are optional;
+    backends that support them set accepts_input_rows and updates_in_place.
+    """
+
+    EMAIL_PATTERN = r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+"
+    LINKEDIN_PATTERN = r"https?://(?:www\.)?linkedin\.com/in/[a-zA-Z0-9\-_/]+"
+
+    accepts_input_rows = False
+    updates_in_place = False
+
+    def __init__(self, control_panel: Optional[ControlPanel] = None):
+        self.controls = control_panel or ControlPanel()
+        self.processed_rows = set()
+        self.state = None
+
+    def _clean_cell_value(self, value: str) -> str:
+        """Clean whitespace and normalize cell value."""
+        if not value:
+            return ""
+        return ' '.join(str(value).strip().split())
+
+    def _clean_row_data(self, row: list) -> list:
+        """Clean all cells in a row."""
+        return [self._clean_cell_value(cell) for cell in row]
+
+    def _extract_identities(self, row: list) -> Set[str]:
+        """Get lowercased emails and LinkedIn URLs found in a row."""
+        row_text = ' '.join(self._clean_row_data(row))
+        identities = {email.lower() for email in re.findall(self.EMAIL_PATTERN, row_text)}
+        identities.update(url.lower() for url in re.findall(self.LINKEDIN_PATTERN, row_text))
+        return identities
+
+    def _parse_row(self, row_idx: int, raw_row: list, processed: Set[str]) -> Optional[Dict]:
+        """Build a candidate dict from an input row, or None if already processed."""
+        if row_idx in self.processed_rows:
+            return None
+
+        row = self._clean_row_data(raw_row)
+        candidate = {
+            'row_number': row_idx,
+            'row_data': row
+        }
+
+        # Extract email and LinkedIn from row
+        row_text = ' '.join(row)
+        emails = re.findall(self.EMAIL_PATTERN, row_text)
+        linkedin_urls = re.findall(self.LINKEDIN_PATTERN, row_text)
+
+        if emails:
+            candidate['email'] = emails[0].lower()
+        if linkedin_urls:
+            candidate['linkedin'] = linkedin_urls[0]
+
+        # Check if unprocessed
+        if self.state is not None:
+            return None if self.state.is_done(candidate) else candidate
+        if any(id in processed for id in [
+            candidate.get('email', '').lower(),
+            candidate.get('linkedin', '').lower()
+        ] if id):
+            return None
+        return candidate
+
+    def attach_state(self, state):
+        """Take processed rows and applicants from a CandidateState instead of re-reading the output."""
+        self.state = state
+        self.processed_rows.update(state.processed_rows())
+
+    def _build_output_row(self, data: Dict) -> List[str]:
+        """Order analysis values by the configured output fields."""
+        return [self._clean_cell_value(str(data.get(field, ''))) for field in self.controls.snapshot().required_fields]
+
+    @abstractmethod
+    def iter_candidates(self, target: str) -> Iterator[Dict]:
+        """Yield unprocessed candidates."""
+
+    def get_candidates(self, target: str) -> List[Dict]:
+        """Get unprocessed candidates."""
+        return list(self.iter_candidates(target))
+
+    def iter_grouped_candidates(self, target: str) -> Iterator[Dict]:
+        """Yield candidates with rows of the same applicant merged."""
+        window = self.controls.config["sheet_controls"].get("read_chunk_size", 2000)
+        yield from iter_grouped(self.iter_candidates(target), window)
+
+    @abstractmethod
+    def save_analysis(self, target: str, data: Dict, input_row_number: Optional[int] = None):
+        """Save analysis results."""
+
+    def save_analyses(self, target: str, results: List[Tuple[Dict, Optional[int]]]):
+        """Save several (analysis, input row number) results; backends may write them in one call."""
+        for data, input_row_number in results:
+            self.save_analysis(target, data, input_row_number)
+
+    def mark_row_processed(self, target: str, row_number: int):
+        """Mark input row as processed."""
+        self.processed_rows.add(row_number)
+
+    @abstractmethod
+    def iter_results(self) -> Iterator[List[str]]:
+        """Yield saved output rows in configured field order."""
+
+    def append_input_rows(self, target: str, records: List[Dict[str, str]]) -> List[Optional[int]]:
+        """Append raw {column: value} submissions to the input; returns their row numbers.
+
+        Only called on backends with accepts_input_rows.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not accept new input rows")
+
+    def iter_output_rows(self, target: str) -> Iterator[Tuple[int, List[str]]]:
+        """Yield saved output rows with the position used to update them; needs updates_in_place."""
+        raise NotImplementedError(f"{type(self).__name__} does not support in-place updates")
+
+    def update_output_rows(self, target: str, updates: Dict[int, Dict]) -> int:
+        """Overwrite saved output rows by position with new analysis results; needs updates_in_place."""
+        raise NotImplementedError(f"{type(self).__name__} does not support in-place updates")
+
+    def flush(self, target: Optional[str] = None):
+        """Push any buffered writes."""
+        pass
+
+    def close(self):
+        """Flush and release resources."""
+        self.flush()
+
+class CSVStore(CandidateStore):
+    """Streams candidates from a CSV file and appends results to another CSV."""
+
+    def __init__(self, input_path: str, output_path: str, control_panel: Optional[ControlPanel] = None):
+        super().__init__(control_panel)
+        self.input_path = input_path
+        self.output_path = output_path
+        self._output_file = None
+        self._writer = None
+
+    def _iter_input_rows(self) -> Iterator[list]:
+        """Yield raw input rows, header included."""
+        with open(self.input_path, newline='', encoding='utf-8') as f:
+            yield from csv.reader(f)
+
+    def _get_processed_candidates(self) -> Set[str]:
+        """Get identities already present in the output."""
+        processed = set()
+        for row in self.iter_results():
+            processed.update(self._extract_identities(row))
+        return processed
+
+    def iter_candidates(self, target: str = None) -> Iterator[Dict]:
+        """Yield unprocessed candidates as rows are read."""
+        self.flush()
+        processed = self._get_processed_candidates() if self.state is None else set()
+        rows = self._iter_input_rows()
+        next(rows, None)  # Skip header
+
+        for row_idx, raw_row in enumerate(rows, start=2):
+            try:
+                candidate = self._parse_row(row_idx, raw_row, processed)
+                if candidate:
+                    yield candidate
+            except Exception as e:
+                print(f"Error processing row {row_idx}: {e}")
+
+    def save_analysis(self, target: str, data: Dict, input_row_number: Optional[int] = None):
+        """Append analysis results to the output CSV."""
+        try:
+            if input_row_number:
+                self.mark_row_processed(target, input_row_number)
+
+            if self._writer is None:
+                write_header = not os.path.exists(self.output_path) or os.path.getsize(self.output_path) == 0
+                self._output_file = open(self.output_path, 'a', newline='', encoding='utf-8')
+                self._writer = csv.writer(self._output_file)
+                if write_header and self.controls.config["sheet_controls"].get("write_headers"):
+                    self._writer.writerow(self.controls.get_required_fields())
+
+            self._writer.writerow(self._build_output_row(data))
+        except Exception as e:
+            print(f"Error saving analysis: {e}")
+
+    def iter_results(self) -> Iterator[List[str]]:
+        """Yield output rows, skipping the header."""
+        if not os.path.exists(self.output_path):
+            return
+        header = self.controls.get_required_fields()
+        with open(self.output_path, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                if row and row != header:
+                    yield row
+
+    def flush(self, target: Optional[str] = None):
+        """Flush buffered output rows to disk."""
+        if self._output_file:
+            self._output_file.flush()
+
+    def close(self):
+        """Close the output file."""
+        if self._output_file:
+            self._output_file.close()
+            self._output_file = None
+            self._writer = None
+
+class SQLiteStore(CandidateStore):
+    """Keeps input rows and results in a local SQLite database."""
+
+    updates_in_place = True
+
+    def __init__(self, db_path: str, input_path: Optional[str] = None,
+                 control_panel: Optional[ControlPanel] = None, commit_every: int = 500):
+        super().__init__(control_panel)
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self._pending_writes = 0
+        # The scoring service writes from its own thread; it is the only writer
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS input_rows ("
+            "row_number INTEGER PRIMARY KEY, row_data TEXT NOT NULL, processed INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, input_row_number INTEGER, row_data TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+        if input_path:
+            self.import_csv(input_path)
+
+    def import_csv(self, path: str):
+        """Load input rows from a CSV export, keeping existing processed flags."""
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = csv.reader(f)
+            next(rows, None)  # Skip header
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO input_rows (row_number, row_data) VALUES (?, ?)",
+                ((row_idx, json.dumps(row)) for row_idx, row in enumerate(rows, start=2))
+            )
+        self.conn.commit()
+
+    def _get_processed_candidates(self) -> Set[str]:
+        """Get identities already present in the results table."""
+        processed = set()
+        for row in self.iter_results():
+            processed.update(self._extract_identities(row))
+        return processed
+
+    def iter_candidates(self, target: str = None) -> Iterator[Dict]:
+        """Yield unprocessed candidates straight from a cursor."""
+        self.flush()
+        processed = self._get_processed_candidates() if self.state is None else set()
+        cursor = self.conn.execute(
+            "SELECT row_number, row_data FROM input_rows WHERE processed = 0 ORDER BY row_number"
+        )
+        for row_idx, row_data in cursor:
+            try:
+                candidate = self._parse_row(row_idx, json.loads(row_data), processed)
+                if candidate:
+                    yield candidate
+            except Exception as e:
+                print(f"Error processing row {row_idx}: {e}")
+
+    def save_analysis(self, target: str, data: Dict, input_row_number: Optional[int] = None):
+        """Insert analysis results, committing in batches."""
+        try:
+            self.conn.execute(
+                "INSERT INTO results (input_row_number, row_data) VALUES (?, ?)",
+                (input_row_number, json.dumps(self._build_output_row(data)))
+            )
+            if input_row_number:
+                self.mark_row_processed(target, input_row_number)
+            else:
+                self._count_write()
+        except Exception as e:
+            print(f"Error saving analysis: {e}")
+
+    def mark_row_processed(self, target: str, row_number: int):
+        """Flag input row as processed."""
+        super().mark_row_processed(target, row_number)
+        self.conn.execute("UPDATE input_rows SET processed = 1 WHERE row_number = ?", (row_number,))
+        self._count_write()
+
+    def _count_write(self):
+        """Commit once enough writes have accumulated."""
+        self._pending_writes += 1
+        if self._pending_writes >= self.commit_every:
+            self.flush()
+
+    def iter_results(self) -> Iterator[List[str]]:
+        """Yield result rows in insertion order."""
+        for (row_data,) in self.conn.execute("SELECT row_data FROM results ORDER BY id"):
+            yield json.loads(row_data)
+
+    def iter_output_rows(self, target: str = None) -> Iterator[Tuple[int, List[str]]]:
+        """Yield result rows with their ids."""
+        for result_id, row_data in self.conn.execute("SELECT id, row_data FROM results ORDER BY id").fetchall():
+            yield result_id, json.loads(row_data)
+
+    def update_output_rows(self, target: str, updates: Dict[int, Dict]) -> int:
+        """Overwrite result rows by id in one transaction."""
+        self.conn.executemany(
+            "UPDATE results SET row_data = ? WHERE id = ?",
+            ((json.dumps(self._build_output_row(data)), result_id) for result_id, data in updates.items())
+        )
+        self.flush()
+        return len(updates)
+
+    def flush(self, target: Optional[str] = None):
+        """Commit pending writes."""
+        self.conn.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        """Commit and close the database."""
+        self.flush()
+        self.conn.close()
+
+class ParquetStore(CSVStore):
+    """Reads CSV or Parquet input and writes results as columnar Parquet parts."""
+
+    def __init__(self, input_path: str, output_dir: str,
+                 control_panel: Optional[ControlPanel] = None, row_group_size: int = 5000):
+        from importlib.util import find_spec
+        if find_spec("pyarrow") is None:
+            raise ImportError("Parquet storage requires pyarrow (pip install pyarrow)")
+
+        super().__init__(input_path, output_dir, control_panel)
+        self.row_group_size = row_group_size
+        self._buffer: List[List[str]] = []
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _iter_input_rows(self) -> Iterator[list]:
+        """Yield raw input rows from Parquet batches, or fall back to CSV."""
+        if not self.input_path.endswith('.parquet'):
+            yield from super()._iter_input_rows()
+            return
+
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(self.input_path)
+        yield parquet_file.schema_arrow.names
+        for batch in parquet_file.iter_batches(batch_size=self.row_group_size):
+            columns = [column.to_pylist() for column in batch.columns]
+            for values in zip(*columns):
+                yield ['' if value is None else str(value) for value in values]
+
+    def _part_paths(self) -> List[str]:
+        """Get output part files in write order."""
+        return sorted(
+            os.path.join(self.output_path, name)
+            for name in os.listdir(self.output_path)
+            if name.endswith('.parquet')
+        )
+
+    def save_analysis(self, target: str, data: Dict, input_row_number: Optional[int] = None):
+        """Buffer analysis results; written as a Parquet part when full."""
+        if input_row_number:
+            self.mark_row_processed(target, input_row_number)
+        self._buffer.append(self._build_output_row(data))
+        if len(self._buffer) >= self.row_group_size:
+            self.flush()
+
+    def iter_results(self) -> Iterator[List[str]]:
+        """Yield result rows from all written parts."""
+        import pyarrow.parquet as pq
+        fields = self.controls.get_required_fields()
+        for path in self._part_paths():
+            table = pq.read_table(path, columns=fields)
+            for record in table.to_pylist():
+                yield [record.get(field) or '' for field in fields]
+
+    def flush(self, target: Optional[str] = None):
+        """Write buffered rows as a new Parquet part file."""
+        if not self._buffer:
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        try:
+            fields = self.controls.get_required_fields()
+            columns = {field: [row[idx] for row in self._buffer] for idx, field in enumerate(fields)}
+            path = os.path.join(self.output_path, f"part-{len(self._part_paths()):05d}.parquet")
+            pq.write_table(pa.table(columns), path)
+            self._buffer = []
+        except Exception as e:
+            print(f"Error writing parquet output: {e}")
+
+    def close(self):
+        """Write any buffered rows."""
+        self.flush()
+
+def open_store(kind: str, input_path: Optional[str] = None, output_path: Optional[str] = None,
+               control_panel: Optional[ControlPanel] = None) -> CandidateStore:
+    """Create a storage backend by name: sheets, csv, sqlite or parquet."""
+    if kind == "sheets":
+        from sheet_handler import SheetHandler
+        return SheetHandler(control_panel)
+
+    if kind == "sqlite":
+        if not output_path:
+            raise ValueError("SQLite storage requires --output database path")
+        return SQLiteStore(output_path, input_path=input_path, control_panel=control_panel)
+
+    if not input_path or not output_path:
+        raise ValueError(f"{kind} storage requires --input and --output paths")
+    if kind == "csv":
+        return CSVStore(input_path, output_path, control_panel)
+    if kind == "parquet":
+        return ParquetStore(input_path, output_path, control_panel)
+
+    raise ValueError(f"Unknown storage backend: {kind}")
+
+def publish_to_sheets(store: CandidateStore, spreadsheet_id: str, batch_size: int = 500, state=None) -> int:
+    """Append a local backend's results to the output sheet in batches.
+
+    Applicants already in the output sheet are skipped, so publishing can
+    be repeated. With a CandidateState, rows it knows were published are
+    skipped too and newly published ones are recorded.
+    """
+    from sheet_handler import SheetHandler
+    from state_store import PUBLISHED
+    sheets = SheetHandler(store.controls)
+    store.flush()
+    fields = store.controls.get_required_fields()
+
+    published_identities = set()
+    for _, row in sheets.iter_output_rows(spreadsheet_id):
+        published_identities.update(sheets._extract_identities(row))
+
+    def send(batch: List[List[str]]) -> int:
+        sent = sheets.append_rows(spreadsheet_id, batch)
+        if state is not None and sent:
+            for row in batch:
+                state.record_saved(state.resolve(dict(zip(fields, row))), published=True)
+        return sent
+
+    published = 0
+    skipped = 0
+    batch = []
+    for row in store.iter_results():
+        identities = store._extract_identities(row)
+        if identities & published_identities:
+            skipped += 1
+            continue
+        if state is not None:
+            record = state.get(dict(zip(fields, row)))
+            if record and record['status'] == PUBLISHED:
+                skipped += 1
+                continue
+        published_identities.update(identities)
+        batch.append(row)
+        if len(batch) >= batch_size:
+            published += send(batch)
+            batch = []
+    if batch:
+        published += send(batch)
+
+    print(f"Published {published} rows to Sheets" + (f", skipped {skipped} already there" if skipped else ""))
+    return published
@@ -0,0 +1,52 @@
+import json
+import pytest
+from budget import BudgetExhausted, BudgetGovernor
+from control_panel import ControlPanel
+
+def make_governor(tmp_path, **controls):
+    config_path = tmp_path / "control_panel.json"
+    config_path.write_text(json.dumps({"budget_controls": {
+        "enabled": True, "path": str(tmp_path / "budget.db"), **controls
+    }}))
+    return BudgetGovernor(ControlPanel(str(config_path)))
+
+def test_disabled_governor_allows_everything(tmp_path):
+    config_path = tmp_path / "control_panel.json"
+    config_path.write_text(json.dumps({"budget_controls": {"enabled": False, "per_run": {"exa_calls": 1}}}))
+    governor = BudgetGovernor(ControlPanel(str(config_path)))
+    governor.record("exa_calls", 5)
+    assert governor.allows("scoring") and governor.conn is None
+
+def test_work_is_shed_in_threshold_order(tmp_path):
+    governor = make_governor(tmp_path, per_run={"exa_calls": 100},
+                             shed={"company_research": 0.8, "scoring": 0.98})
+    governor.record("exa_calls", 85)
+    assert governor.used("exa_calls") == pytest.approx(0.85)
+    assert not governor.allows("company_research")
+    assert governor.allows("scoring")
+    governor.record("exa_calls", 14)
+    with pytest.raises(BudgetExhausted):
+        governor.check("scoring")
+    governor.close()
+
+def test_daily_usage_is_shared_between_runs(tmp_path):
+    first = make_governor(tmp_path, per_day={"llm_tokens": 1000})
+    first.record("llm_tokens", 600)
+    first.close()
+    second = make_governor(tmp_path, per_day={"llm_tokens": 1000}, per_run={"llm_tokens": 10000})
+    second.record("llm_tokens", 300)
+    assert second.used("llm_tokens") == pytest.approx(0.9)
+    assert second.stats()["llm_tokens"] == {"run": 300, "run_cap": 10000, "day": 900, "day_cap": 1000}
+    second.close()
+
+def test_exa_cost_is_recorded(tmp_path):
+    class Cost:
+        total = 0.25
+    class Response:
+        cost_dollars = Cost()
+    governor = make_governor(tmp_path, per_run={"exa_dollars": 1})
+    governor.record_exa(Response())
+    governor.record_exa(object())
+    assert governor.stats()["exa_calls"]["run"] == 2
+    assert governor.used("exa_dollars") == pytest.approx(0.25)
+    governor.close()
@@ -0,0 +1,65 @@
+import json
+import pytest
+from concurrency import AdaptiveLimiter, ConcurrencyController
+from control_panel import ControlPanel
+from deadline import DeadlineExceeded
+
+def test_limit_grows_while_latency_holds():
+    limiter = AdaptiveLimiter("exa", initial=4, max_limit=32)
+    for _ in range(50):
+        limiter._update(0.1, inflight=limiter.limit)
+    assert limiter.limit > 4
+
+def test_limit_shrinks_when_latency_rises():
+    limiter = AdaptiveLimiter("exa", initial=16)
+    for _ in range(20):
+        limiter._update(0.1, inflight=16)
+    grown = limiter.limit
+    for _ in range(20):
+        limiter._update(2.0, inflight=limiter.limit)
+    assert limiter.limit < grown
+
+def test_idle_limit_does_not_grow():
+    limiter = AdaptiveLimiter("exa", initial=8)
+    for _ in range(50):
+        limiter._update(0.1, inflight=1)
+    assert limiter.limit == 8
+
+def test_failure_backs_off_to_min():
+    limiter = AdaptiveLimiter("exa", initial=10, min_limit=2, backoff_ratio=0.5)
+    with pytest.raises(RuntimeError):
+        with limiter.slot():
+            raise RuntimeError("HTTP 503")
+    assert limiter.limit == 5 and limiter.stats["drops"] == 1
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(failed=True)
+    assert limiter.limit == 2
+
+def test_acquire_times_out_when_full():
+    limiter = AdaptiveLimiter("exa", initial=1, max_limit=1)
+    limiter.acquire()
+    with pytest.raises(DeadlineExceeded):
+        limiter.acquire(timeout=0.01)
+    limiter.release(0.1)
+    assert limiter.snapshot()["inflight"] == 0
+
+def test_disabled_controller_is_a_no_op(tmp_path):
+    config_path = tmp_path / "control_panel.json"
+    config_path.write_text(json.dumps({"concurrency_controls": {"enabled": False}}))
+    controller = ConcurrencyController(ControlPanel(str(config_path)))
+    call = lambda: "ok"
+    assert controller.wrap("exa", call) is call
+    with controller.slot("exa"):
+        pass
+
+def test_controller_builds_limiters_from_upstream_settings(tmp_path):
+    config_path = tmp_path / "control_panel.json"
+    config_path.write_text(json.dumps({"concurrency_controls": {
+        "enabled": True, "upstreams": {"cerebras": {"initial": 6, "min": 2, "max": 12}}
+    }}))
+    controller = ConcurrencyController(ControlPanel(str(config_path)))
+    with controller.slot("cerebras"):
+        assert controller.stats()["cerebras"]["inflight"] == 1
+    limiter = controller.limiter("cerebras")
+    assert (limiter.limit, limiter.min_limit, limiter.max_limit) == (6, 2, 12)
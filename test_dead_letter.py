@@ -0,0 +1,83 @@
+import time
+import pytest
+from dead_letter import (
+    DeadLetterQueue, EmptyScrape, classify_failure,
+    EXHAUSTED, PARKED, RESOLVED, RETRYING, WAITING
+)
+
+@pytest.fixture
+def queue(tmp_path):
+    dead_letters = DeadLetterQueue(str(tmp_path / "dead_letter.db"), base_delay=10, max_delay=60)
+    yield dead_letters
+    dead_letters.close()
+
+def status_of(queue, entry_id):
+    return queue.conn.execute("SELECT status FROM dead_letters WHERE id = ?", (entry_id,)).fetchone()[0]
+
+def make_due(queue):
+    queue.conn.execute("UPDATE dead_letters SET next_retry_at = ?", (time.time() - 1,))
+    queue.conn.commit()
+
+def test_classify_failure():
+    assert classify_failure(TimeoutError("slow")) == "timeout"
+    assert classify_failure(RuntimeError("HTTP 429 Too Many Requests")) == "rate_limit"
+    assert classify_failure(ConnectionError("reset")) == "upstream"
+    assert classify_failure(ValueError("unusable model output: missing priority")) == "invalid_output"
+    assert classify_failure(EmptyScrape("no_data", "nothing")) == "no_data"
+
+def test_backoff_doubles_up_to_max(queue):
+    for attempts, expected in ((1, 10), (2, 20), (3, 40), (4, 60), (10, 60)):
+        delay = queue.backoff(attempts)
+        assert expected * 0.8 <= delay <= expected * 1.2
+
+def test_transient_failure_is_scheduled_until_attempts_run_out(queue):
+    queue.max_attempts["timeout"] = 2
+    candidate = {"email": "a@corp.com"}
+    first = queue.add(candidate, TimeoutError("slow"))
+    assert first["status"] == WAITING and first["attempts"] == 1
+    assert first["next_retry_at"] > time.time()
+    second = queue.add(candidate, TimeoutError("slow"))
+    assert second["status"] == WAITING and second["attempts"] == 2
+    third = queue.add(candidate, TimeoutError("slow"))
+    assert third["status"] == EXHAUSTED and third["next_retry_at"] is None
+
+def test_permanent_failure_is_parked(queue):
+    entry = queue.add({"email": "a@corp.com"}, ValueError("unusable model output"))
+    assert entry["failure_class"] == "invalid_output"
+    assert entry["status"] == PARKED
+
+def test_claim_and_resolve(queue):
+    queue.add({"email": "a@corp.com", "row_number": 2}, TimeoutError("slow"))
+    assert queue.claim_due() == []
+    make_due(queue)
+    [candidate] = queue.claim_due()
+    assert candidate["row_number"] == 2
+    assert status_of(queue, candidate["dead_letter_id"]) == RETRYING
+    queue.resolve(candidate["dead_letter_id"])
+    assert status_of(queue, candidate["dead_letter_id"]) == RESOLVED
+    assert not queue.contains({"email": "a@corp.com"})
+
+def test_requeue_does_not_count_an_attempt(queue):
+    queue.add({"email": "a@corp.com"}, TimeoutError("slow"))
+    make_due(queue)
+    [candidate] = queue.claim_due()
+    queue.requeue(candidate["dead_letter_id"])
+    [entry] = queue.iter_entries()
+    assert entry["status"] == WAITING and entry["attempts"] == 1
+
+def test_fail_claimed_counts_a_retry_that_did_not_raise(queue):
+    queue.add({"email": "a@corp.com"}, TimeoutError("slow"))
+    make_due(queue)
+    [candidate] = queue.claim_due()
+    entry = queue.fail_claimed(candidate["dead_letter_id"], candidate, EmptyScrape("no_data", "no result"))
+    assert entry["attempts"] == 2 and entry["status"] == PARKED
+    assert status_of(queue, candidate["dead_letter_id"]) == PARKED
+
+def test_fail_claimed_skips_a_failure_already_recorded(queue):
+    queue.add({"email": "a@corp.com"}, TimeoutError("slow"))
+    make_due(queue)
+    [candidate] = queue.claim_due()
+    queue.add(candidate, TimeoutError("slow again"))
+    assert queue.fail_claimed(candidate["dead_letter_id"], candidate, EmptyScrape("no_data", "x")) is None
+    [entry] = queue.iter_entries()
+    assert entry["attempts"] == 2 and entry["status"] == WAITING
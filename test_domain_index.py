@@ -0,0 +1,27 @@
+import json
+from control_panel import ControlPanel
+from domain_index import DomainClass, DomainIndex
+
+def test_longest_suffix_wins():
+    index = DomainIndex()
+    index.add("edu", DomainClass.ACADEMIC)
+    index.add("ac.uk", DomainClass.ACADEMIC)
+    index.add("lab.stanford.edu", DomainClass.COMPANY)
+    assert index.classify("cs.stanford.edu") == DomainClass.ACADEMIC
+    assert index.classify("ox.ac.uk") == DomainClass.ACADEMIC
+    assert index.classify("Lab.Stanford.EDU.") == DomainClass.COMPANY
+    assert index.classify("co.uk") == DomainClass.UNKNOWN
+    assert index.classify(None) == DomainClass.UNKNOWN
+
+def test_from_config_overrides_bundled_data(tmp_path):
+    data_path = tmp_path / "domains.json"
+    data_path.write_text(json.dumps({"free_mail": ["gmail.com"], "academic_suffixes": ["edu"]}))
+    config_path = tmp_path / "control_panel.json"
+    config_path.write_text(json.dumps({"scraping_controls": {
+        "common_domains": ["example.org"],
+        "domain_classes": {"company": ["research.mit.edu"]}
+    }}))
+    index = DomainIndex.from_config(ControlPanel(str(config_path)), data_path=str(data_path))
+    assert index.is_free_mail("gmail.com") and index.is_free_mail("example.org")
+    assert index.is_academic("mit.edu")
+    assert index.classify("research.mit.edu") == DomainClass.COMPANY
@@ -0,0 +1,36 @@
+from identity import canonical_email, canonical_linkedin, group_candidates, identity_keys, iter_grouped
+
+def test_canonical_email():
+    assert canonical_email("J.Doe+waitlist@GMail.com") == "jdoe@gmail.com"
+    assert canonical_email("jdoe@googlemail.com") == "jdoe@gmail.com"
+    assert canonical_email("jane+ai@outlook.com") == "jane@outlook.com"
+    # Elsewhere dots and plus signs may be part of the mailbox
+    assert canonical_email("j.doe+ai@corp.com") == "j.doe+ai@corp.com"
+    assert canonical_email("not an email") is None
+
+def test_canonical_linkedin():
+    assert canonical_linkedin("https://www.LinkedIn.com/in/jane-doe/?trk=x") == "linkedin.com/in/jane-doe"
+    assert canonical_linkedin("https://linkedin.com/company/acme") is None
+
+def test_identity_keys():
+    keys = identity_keys({"email": "jane@corp.com", "linkedin": "linkedin.com/in/jane"})
+    assert keys == ["email:jane@corp.com", "linkedin:linkedin.com/in/jane"]
+    assert identity_keys({}) == []
+
+def test_group_candidates_links_rows_transitively():
+    rows = [
+        {"row_number": 2, "email": "jane@corp.com", "linkedin": ""},
+        {"row_number": 3, "email": "bob@corp.com", "linkedin": ""},
+        {"row_number": 4, "email": "", "linkedin": "https://linkedin.com/in/jane"},
+        {"row_number": 5, "email": "Jane@Corp.com", "linkedin": "https://linkedin.com/in/jane"},
+    ]
+    jane, bob = group_candidates(rows)
+    assert jane["row_number"] == 2
+    assert jane["linkedin"] == "https://linkedin.com/in/jane"
+    assert [row["row_number"] for row in jane["duplicates"]] == [4, 5]
+    assert bob["row_number"] == 3 and bob["duplicates"] == []
+
+def test_iter_grouped_only_merges_within_a_window():
+    rows = [{"row_number": i, "email": "jane@corp.com"} for i in range(5)]
+    grouped = list(iter_grouped(rows, window=2))
+    assert [len(candidate["duplicates"]) for candidate in grouped] == [1, 1, 0]
@@ -0,0 +1,57 @@
+import pytest
+from ingest_queue import IngestQueue, parse_signup
+
+class FakeStore:
+    accepts_input_rows = True
+
+    def __init__(self):
+        self.appended = []
+
+    def append_input_rows(self, target, records):
+        first = len(self.appended) + 2
+        self.appended.extend(records)
+        return list(range(first, first + len(records)))
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = IngestQueue(str(tmp_path / "ingest_queue.db"))
+    yield queue
+    queue.close()
+
+def test_parse_signup():
+    signup = parse_signup({"fields": {"Email": "Jane@Corp.com ", "Profile": "https://linkedin.com/in/jane", "Age": None}})
+    assert signup == {
+        "fields": {"Email": "Jane@Corp.com", "Profile": "https://linkedin.com/in/jane", "Age": ""},
+        "email": "jane@corp.com",
+        "linkedin": "https://linkedin.com/in/jane"
+    }
+
+def test_only_the_first_signup_per_applicant_is_queued(queue):
+    assert queue.enqueue({"email": "jane@corp.com"})["status"] == "pending"
+    assert queue.enqueue({"email": "Jane@corp.com", "linkedin": "https://linkedin.com/in/jane"})["status"] == "duplicate"
+    assert queue.enqueue({"linkedin": "https://linkedin.com/in/jane"})["status"] == "duplicate"
+    assert queue.enqueue({"name": "no contact"})["status"] == "skipped"
+    assert [candidate["email"] for candidate in queue.claim(5)] == ["jane@corp.com"]
+
+def test_sync_waits_for_a_batch_unless_forced(queue):
+    store = FakeStore()
+    queue.enqueue({"email": "jane@corp.com"})
+    assert queue.sync_input(store, "sheet", batch_size=2, max_delay=60) == 0
+    assert queue.sync_input(store, "sheet", batch_size=2, max_delay=60, force=True) == 1
+    [candidate] = queue.claim()
+    assert candidate["row_number"] == 2
+
+def test_sync_marks_rows_that_will_not_be_scored_again(queue):
+    store = FakeStore()
+    marked = []
+    scored = queue.enqueue({"email": "jane@corp.com"})["signup_id"]
+    queue.enqueue({"email": "bob@corp.com"})
+    queue.enqueue({"email": "jane@corp.com"})
+    queue.enqueue({"name": "no contact"})
+    # Scored before its row reached the sheet
+    [candidate] = queue.claim()
+    assert "row_number" not in candidate
+    queue.complete(scored)
+    queue.sync_input(store, "sheet", force=True, mark_processed=marked.extend)
+    assert [row["row_number"] for row in marked] == [2, 4, 5]
+    assert queue.input_row(scored) == 2
@@ -0,0 +1,38 @@
+import pytest
+from near_duplicates import MinHashLSHIndex
+
+PROFILE = ("Senior machine learning engineer at Acme working on large language model inference, "
+           "distributed training and GPU kernels; previously research scientist at a robotics lab")
+
+@pytest.fixture
+def index():
+    index = MinHashLSHIndex(num_perm=64, bands=16)
+    index.add(PROFILE, {"priority": "HIGH", "prompt_version": "v1"})
+    index.add("Marketing coordinator planning events and social media campaigns for a retail chain",
+              {"priority": "LOW", "prompt_version": "v2"})
+    return index
+
+def test_bands_must_divide_num_perm():
+    with pytest.raises(ValueError):
+        MinHashLSHIndex(num_perm=100, bands=32)
+
+def test_short_text_has_no_signature(index):
+    assert index.signature("too short") is None
+    assert not index.add("too short", {})
+
+def test_query_finds_near_duplicate(index):
+    similarity, record = index.query(PROFILE.replace("Acme", "Acme Corp"), threshold=0.7)
+    assert record["priority"] == "HIGH"
+    assert 0.7 <= similarity < 1.0
+    assert index.query(PROFILE, threshold=0.99)[0] == 1.0
+
+def test_query_ignores_unrelated_text(index):
+    assert index.query("Chef running a bakery that sells sourdough bread and pastries daily", 0.5) is None
+
+def test_save_and_load_with_filter(index, tmp_path):
+    path = str(tmp_path / "decisions.npz")
+    index.save(path)
+    assert len(MinHashLSHIndex.load(path)) == 2
+    loaded = MinHashLSHIndex.load(path, keep=lambda record: record["prompt_version"] == "v1")
+    assert len(loaded) == 1
+    assert loaded.query(PROFILE, threshold=0.9)[1]["priority"] == "HIGH"
@@ -0,0 +1,66 @@
+import json
+import time
+import threading
+import pytest
+from control_panel import ControlPanel
+from prefetch import ScrapePrefetcher
+
+class FakeScraper:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.scraped = []
+        self.lock = threading.Lock()
+
+    def scrape(self, linkedin_url, email, deadline):
+        time.sleep(self.delay)
+        with self.lock:
+            self.scraped.append(email)
+        return {"linkedin_data": None, "company_research": f"research on {email}"}
+
+@pytest.fixture
+def control_panel(tmp_path):
+    config_path = tmp_path / "control_panel.json"
+    config_path.write_text(json.dumps({
+        "prefetch_controls": {"enabled": True, "window": 2, "workers": 2, "max_buffer_chars": 1000},
+        "deadline_controls": {"enabled": False}
+    }))
+    return ControlPanel(str(config_path))
+
+def candidates(count, prefix="a"):
+    return [{"row_number": row, "email": f"{prefix}{row}@corp.com", "linkedin": ""} for row in range(count)]
+
+def test_staged_scrapes_are_taken_in_order(control_panel):
+    prefetcher = ScrapePrefetcher(FakeScraper(), control_panel)
+    for candidate in prefetcher.stage(candidates(5)):
+        result = prefetcher.take(candidate, timeout=5)
+        # None only when the scrape was still queued and is left to the caller
+        assert result is None or result["company_research"] == f"research on {candidate['email']}"
+    stats = prefetcher.stats
+    assert stats["prefetched"] == 5
+    assert stats["ready"] + stats["waited"] + stats["not_started"] == 5
+    assert prefetcher._buffered == 0
+    prefetcher.close()
+
+def test_skipped_candidates_are_not_scraped(control_panel):
+    scraper = FakeScraper()
+    prefetcher = ScrapePrefetcher(scraper, control_panel, skip=lambda candidate: candidate["row_number"] % 2 == 0)
+    for candidate in prefetcher.stage(candidates(6)):
+        prefetcher.take(candidate, timeout=5)
+    assert set(scraper.scraped) <= {"a1@corp.com", "a3@corp.com", "a5@corp.com"}
+    assert prefetcher.stats["skipped_known"] == 3 and prefetcher.stats["prefetched"] == 3
+    prefetcher.close()
+
+def test_untaken_scrapes_are_released(control_panel):
+    prefetcher = ScrapePrefetcher(FakeScraper(delay=0.01), control_panel)
+    for candidate in prefetcher.stage(candidates(6)):
+        prefetcher.discard(candidate)
+    prefetcher._pool.shutdown(wait=True)
+    assert prefetcher._buffered == 0 and not prefetcher._staged
+
+def test_full_buffer_stops_new_prefetches(control_panel):
+    prefetcher = ScrapePrefetcher(FakeScraper(), control_panel)
+    prefetcher._buffered = prefetcher.max_chars
+    staged = list(prefetcher.stage(candidates(3)))
+    assert prefetcher.stats["skipped_for_memory"] == 3
+    assert prefetcher.take(staged[0]) is None
+    prefetcher.close()
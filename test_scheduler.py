@@ -0,0 +1,50 @@
+import json
+import pytest
+from control_panel import ControlPanel
+from scheduler import PriorityScheduler
+
+def make_scheduler(tmp_path, **controls):
+    config_path = tmp_path / "control_panel.json"
+    config_path.write_text(json.dumps({"scheduling_controls": {
+        "enabled": True,
+        "title_keywords": {"engineer": 5},
+        "weights": {"linkedin": 1, "recency": 0},
+        **controls
+    }}))
+    return PriorityScheduler(ControlPanel(str(config_path)))
+
+def candidate(row_number, title="", linkedin=""):
+    return {"row_number": row_number, "email": "", "linkedin": linkedin, "row_data": [title]}
+
+def test_score_uses_keywords_and_linkedin(tmp_path):
+    scheduler = make_scheduler(tmp_path)
+    assert scheduler.score(candidate(2, "Software Engineer", "https://linkedin.com/in/a")) == 6
+    assert scheduler.score(candidate(3, "Engineering manager")) == 0
+
+def test_higher_scores_are_handed_out_first(tmp_path):
+    scheduler = make_scheduler(tmp_path, aging_per_candidate=0)
+    rows = [candidate(2, "Sales"), candidate(3, "Engineer"), candidate(4, "Sales", "https://linkedin.com/in/b")]
+    assert [row["row_number"] for row in scheduler.order(rows)] == [3, 4, 2]
+    assert scheduler.stats == {"scheduled": 3, "reordered": 3}
+
+def test_aging_keeps_low_scorers_from_starving(tmp_path):
+    scheduler = make_scheduler(tmp_path, aging_per_candidate=1, initial_fill=1)
+    rows = [candidate(2, "Sales")] + [candidate(row, "Engineer") for row in range(3, 20)]
+    order = [row["row_number"] for row in scheduler.order(rows)]
+    assert order.index(2) < 10
+
+def test_first_candidate_waits_only_for_initial_fill(tmp_path):
+    scheduler = make_scheduler(tmp_path, initial_fill=3)
+    read = []
+    def source():
+        for row in range(2, 100):
+            read.append(row)
+            yield candidate(row)
+    next(scheduler.order(source()))
+    assert len(read) == 3
+
+@pytest.mark.parametrize("cell", ["2026-01-02 03:04:05", "01/02/2026 03:04:05"])
+def test_timestamps_are_read_in_the_configured_timezone(tmp_path, cell):
+    utc = make_scheduler(tmp_path, timezone="UTC")._submitted_at([cell])
+    pacific = make_scheduler(tmp_path, timezone="America/Los_Angeles")._submitted_at([cell])
+    assert pacific - utc == 8 * 3600
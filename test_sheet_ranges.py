@@ -0,0 +1,69 @@
+from sheet_handler import coalesce_row_ranges, column_letter
+
+def test_coalesce_row_ranges_merges_contiguous_rows():
+    assert coalesce_row_ranges([5, 2, 3, 9, 4, 10, 3]) == [(2, 5), (9, 10)]
+
+def test_coalesce_row_ranges_empty():
+    assert coalesce_row_ranges([]) == []
+
+def test_column_letter():
+    assert [column_letter(i) for i in (1, 26, 27, 52, 703)] == ["A", "Z", "AA", "AZ", "AAA"]
+
+class FakeRequest:
+    def __init__(self, result=None):
+        self.result = result or {}
+
+    def execute(self):
+        return self.result
+
+class FakeSheets:
+    """Records value writes; serves a 26-column input grid with a short header."""
+
+    def __init__(self, header):
+        self.header = header
+        self.updates = []
+        self.value_batches = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, **kwargs):
+        return FakeRequest({'sheets': [
+            {'properties': {'sheetId': 1, 'title': 'input', 'gridProperties': {'rowCount': 100, 'columnCount': 26}},
+             'data': [{'rowData': [{'values': [{'formattedValue': cell} for cell in self.header]}]}]},
+            {'properties': {'sheetId': 2, 'title': 'output', 'gridProperties': {'rowCount': 100, 'columnCount': 26}}}
+        ]})
+
+    def batchUpdate(self, spreadsheetId, body):
+        if 'data' in body:
+            self.value_batches.append(body['data'])
+        return FakeRequest()
+
+    def update(self, spreadsheetId, range, valueInputOption, body):
+        self.updates.append((range, body['values']))
+        return FakeRequest()
+
+def test_markers_go_to_the_column_past_the_grid(tmp_path, monkeypatch):
+    import json
+    from control_panel import ControlPanel
+    from sheet_handler import SheetHandler
+
+    with open('control_panel.json') as f:
+        config = json.load(f)
+    config['sheet_controls'].update(highlight_mode='conditional', highlight_processed_rows=True)
+    config_path = tmp_path / 'control_panel.json'
+    config_path.write_text(json.dumps(config))
+
+    service = FakeSheets(['Timestamp', 'Name', 'Email', 'LinkedIn', 'Title'])
+    monkeypatch.setattr(SheetHandler, '_setup_sheets_service', lambda self: service)
+    sheets = SheetHandler(ControlPanel(str(config_path)))
+    for row in (5, 6, 7):
+        sheets.mark_row_processed('sheet', row)
+    sheets.flush('sheet')
+
+    assert service.updates == [("'input'!AA1", [['processed']])]
+    [[marker_range]] = service.value_batches
+    assert marker_range['range'] == "'input'!AA5:AA7"
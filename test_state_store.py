@@ -0,0 +1,48 @@
+import pytest
+from state_store import CandidateState, FAILED, PENDING, PUBLISHED, SAVED, SCORED, SCRAPED
+
+@pytest.fixture
+def state(tmp_path):
+    state = CandidateState(str(tmp_path / "candidate_state.db"))
+    yield state
+    state.close()
+
+JANE = {"row_number": 2, "email": "jane@corp.com", "linkedin": "",
+        "duplicates": [{"row_number": 7, "email": "", "linkedin": "https://linkedin.com/in/jane"}]}
+
+def test_lifecycle(state):
+    candidate_id = state.start(JANE)
+    assert state.get(JANE)["status"] == PENDING
+    state.record_scrape(candidate_id, {"linkedin_data": None, "company_research": "Acme builds chips"})
+    assert state.get(JANE)["status"] == SCRAPED and state.get(JANE)["scrape_hash"]
+    state.record_decision(candidate_id, {"priority": "HIGH", "email_draft": "Hi"}, "v1", "llama")
+    record = state.get(JANE)
+    assert (record["status"], record["decision"], record["email_status"]) == (SCORED, "HIGH", "drafted")
+    assert not state.is_done(JANE)
+    state.record_saved(candidate_id)
+    assert state.is_done(JANE)
+    assert state.processed_rows() == {2, 7}
+
+def test_any_identity_key_finds_the_applicant(state):
+    candidate_id = state.start(JANE)
+    assert state.resolve({"email": "", "linkedin": "linkedin.com/in/jane/"}) == candidate_id
+    assert len(state) == 1
+
+def test_no_identity_is_not_tracked(state):
+    assert state.start({"row_number": 3, "email": "", "linkedin": ""}) is None
+    assert len(state) == 0
+
+def test_restart_keeps_a_saved_applicant_done(state):
+    candidate_id = state.start(JANE)
+    state.record_saved(candidate_id, published=True)
+    state.start(JANE)
+    assert state.get(JANE)["status"] == PUBLISHED
+    state.start(JANE, rescore=True)
+    assert state.get(JANE)["status"] == PENDING
+
+def test_failures_and_counts(state):
+    state.record_failure(state.start(JANE), "timeout" * 200)
+    assert len(state.get(JANE)["error"]) == 500
+    assert [row["email"] for row in state.iter_status(FAILED)] == ["jane@corp.com"]
+    state.import_results([{"email": "bob@corp.com", "priority": "LOW"}], published=False)
+    assert state.counts() == {FAILED: 1, SAVED: 1}